@@ -1,61 +1,84 @@
-import pandas as pd
-
-# carregar os dados da planilha
-caminho = 'C:/dados/base_inicial.xlsx'
-
-df1 = pd.read_excel(caminho, sheet_name='Relatório de Vendas')
-df2 = pd.read_excel(caminho, sheet_name='Relatório de Vendas1')
-
-#exibir as primeiras linhas para conferir como estao os dados
-print('----- Primeiro relatorio ------')
-print(df1.head())
-print('----- Segundo relatorio ------')
-print(df2.head())
-
-#verificar se há duplicatas nas duas tabelas
-print('Duplicatas no relatorio 1 ')
-print(df1.duplicated().sum())
-print('Duplicatas no relatorio 2 ')
-print(df2.duplicated().sum())
-
-# Agora vamos consolidar as duas tabelas
-print('Dados consolidados')
-df_consolidado = pd.concat([df1, df2],ignore_index=True)
-print(df_consolidado.head())
-
-# Exibir o numero de clientes por cidade
-clientes_por_cidade = df_consolidado.groupby('Cidade')['Cliente'].nunique().sort_values(ascending=False)
-print('Clientes por cidade')
-print(clientes_por_cidade)
-
-# numero de vendas por plano
-vendas_por_plano = df_consolidado['Plano Vendido'].value_counts()
-print('Numero de Vendas por Plano')
-print(vendas_por_plano)
-
-# exibir as 3 primeiras cidades com mais clientes
-top_3_cidades = clientes_por_cidade.head(3)
-print('Top 3 cidades')
-print(top_3_cidades)
-
-# exibir o total de clientes
-total_clientes = df_consolidado['Cliente'].nunique()
-print(f'\n Numero total de clientes: {total_clientes}')
-
-# Adicionar uma coluna de Status ( exemplo ficticio de analise)
-# Vamos classificar os planos como premium se for enterprise, caso contrario será padrão
-df_consolidado['Status'] = df_consolidado['Plano Vendido'].apply(lambda x: 'Premium' if x == 'Enterprise' else 'Padrão')
-
-# Exibir a distribuição dos status
-status_dist = df_consolidado['Status'].value_counts()
-print('\n Distribuição dos status:')
-print(status_dist)
-
-# Salvar a tabela em um arquivo
-#Primeiro em Excel
-df_consolidado.to_excel('dados_consolidados_planilha.xlsx', index=False)
-#Depois em CSV
-df_consolidado.to_csv('dados_consolidados_texto.csv', index=False)
-
-#Exibir Mensagem FInal!
-print('\n Arquivos Gerados com sucesso!')
\ No newline at end of file
+import sys
+import config
+import consolidacao
+import saida
+
+# arquivo de saida de cada formato (config.SAIDA_FORMATOS escolhe quais são gravados).
+# Os colunares têm o mesmo nome do CSV: saida.carregar('dados_consolidados_texto.csv') acha
+# e prefere o parquet sem precisar saber dele
+SAIDAS = {
+    'parquet': 'dados_consolidados_texto.parquet',
+    'feather': 'dados_consolidados_texto.feather',
+    'arrow': 'dados_consolidados_texto.arrow',
+    'csv': 'dados_consolidados_texto.csv',
+    'xlsx': 'dados_consolidados_planilha.xlsx',
+}
+# colunas com poucos valores distintos: vão como dictionary nos formatos colunares
+CATEGORICAS = ['Cidade', 'Plano Vendido', 'Status']
+
+# O pool de processos da consolidação reimporta este arquivo no Windows: o script todo
+# fica dentro do if abaixo
+if __name__ == '__main__':
+    # carregar os dados das planilhas: um glob de arquivos e os padrões das abas, por exemplo
+    #   python 02_importacao.py 'C:/dados/regionais/*.xlsx' 'Relatório de Vendas*'
+    # sem argumentos, as duas abas da planilha de sempre
+    caminho = sys.argv[1] if len(sys.argv) > 1 else 'C:/dados/base_inicial.xlsx'
+    abas = sys.argv[2:] or ['Relatório de Vendas', 'Relatório de Vendas1']
+
+    # cada planilha é lida num processo separado e as que não mudaram vêm do cache em parquet.
+    # O esquema 'vendas' alinha as abas pelo cabeçalho e já devolve Cidade e Plano Vendido como
+    # category. A segunda aba da planilha de sempre não tem cabeçalho: as colunas dela vão pela posição
+    df_todas = consolidacao.consolidar(caminho, abas, esquema='vendas', abas_sem_cabecalho=['Relatório de Vendas1'])
+    origem = [consolidacao.COLUNA_ARQUIVO, consolidacao.COLUNA_ABA]
+    relatorios = df_todas.groupby(origem, sort=False)
+
+    #exibir as primeiras linhas para conferir como estao os dados
+    for (arquivo, aba), df in relatorios:
+        print(f'----- {arquivo} / {aba} ------')
+        print(df.drop(columns=origem).head())
+
+    #verificar se há duplicatas nas tabelas
+    for (arquivo, aba), df in relatorios:
+        print(f'Duplicatas em {arquivo} / {aba} ')
+        print(df.drop(columns=origem).duplicated().sum())
+
+    # Agora vamos consolidar as tabelas
+    print('Dados consolidados')
+    df_consolidado = df_todas.drop(columns=origem)
+    print(df_consolidado.head())
+
+    # Exibir o numero de clientes por cidade
+    clientes_por_cidade = df_consolidado.groupby('Cidade')['Cliente'].nunique().sort_values(ascending=False)
+    print('Clientes por cidade')
+    print(clientes_por_cidade)
+
+    # numero de vendas por plano
+    vendas_por_plano = df_consolidado['Plano Vendido'].value_counts()
+    print('Numero de Vendas por Plano')
+    print(vendas_por_plano)
+
+    # exibir as 3 primeiras cidades com mais clientes
+    top_3_cidades = clientes_por_cidade.head(3)
+    print('Top 3 cidades')
+    print(top_3_cidades)
+
+    # exibir o total de clientes
+    total_clientes = df_consolidado['Cliente'].nunique()
+    print(f'\n Numero total de clientes: {total_clientes}')
+
+    # Adicionar uma coluna de Status ( exemplo ficticio de analise)
+    # Vamos classificar os planos como premium se for enterprise, caso contrario será padrão
+    df_consolidado['Status'] = df_consolidado['Plano Vendido'].apply(lambda x: 'Premium' if x == 'Enterprise' else 'Padrão')
+
+    # Exibir a distribuição dos status
+    status_dist = df_consolidado['Status'].value_counts()
+    print('\n Distribuição dos status:')
+    print(status_dist)
+
+    # Salvar a tabela nos formatos configurados (o Excel, quando pedido, é gravado em streaming).
+    # Para ler depois: saida.carregar('dados_consolidados_texto.csv') pega o parquet se ele
+    # estiver atualizado
+    saida.gravar_varios(df_consolidado, [SAIDAS[formato] for formato in config.SAIDA_FORMATOS], CATEGORICAS)
+
+    #Exibir Mensagem FInal!
+    print('\n Arquivos Gerados com sucesso!')
\ No newline at end of file
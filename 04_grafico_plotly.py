@@ -1,9 +1,15 @@
 from flask import Flask, render_template_string
 import plotly.express as px
 import pandas as pd
+import estaticos
+import metricas
 
 #iniciar o Flask
 app = Flask(__name__)
+# serve o plotly.min.js local (/vendor/plotly-<hash>.min.js) em vez de embutir o bundle em cada resposta
+app.register_blueprint(estaticos.estaticos)
+# /metrics com o tempo das rotas
+metricas.instrumentar(app)
 
 # Gerar o dataframe
 df_consolidado = pd.DataFrame({
@@ -36,8 +42,9 @@ def grafico_pizza():
         title = 'Distribuição de Status'
     )
     # Converter o grafico para HTML (isso já gera um html pronto com <DIV>, <STYLE>, e {} )
-
-    grafico_html = fig.to_html(full_html=False)
+    # o plotly.js não vai junto: o html só aponta para o arquivo servido pelo blueprint de estaticos
+    with metricas.etapa('render'):
+        grafico_html = fig.to_html(full_html=False, include_plotlyjs=estaticos.url_plotly())
 
     html = '''
             <html>
@@ -0,0 +1,147 @@
+from extracao import obter_extrator
+
+BASE_SITE = "https://www.adorocinema.com"
+BASE_URL = BASE_SITE + "/filmes/melhores/"
+
+
+def url_listagem(pagina, base_url=BASE_URL):
+    return f"{base_url}?page={pagina}"
+
+
+# Extrai titulo, nota e link de cada card da pagina de listagem
+def extrair_cards(conteudo, base_site=BASE_SITE, extrator=None, encoding=None):
+    return (extrator or obter_extrator()).cards(conteudo, base_site, encoding)
+
+
+# Extrai diretor, categoria e ano da pagina de detalhes do filme
+def extrair_detalhes(conteudo, extrator=None, encoding=None):
+    return (extrator or obter_extrator()).detalhes(conteudo, encoding)
+
+
+# Só repassa o encoding quando o servidor informou o charset; senão o parser detecta pelo <meta>
+def encoding_declarado(response):
+    return response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+
+
+def montar_filme(card, detalhes):
+    return {
+        "Titulo": card["Titulo"],
+        "Direção": detalhes.get("Direção", "N/A"),
+        "Nota": card["Nota"],
+        "Link": card["Link"],
+        "Ano": detalhes.get("Ano", "N/A"),
+        "Categoria": detalhes.get("Categoria", "N/A")
+    }
+
+
+# Verificar se todos os dados foram coletados corretamente
+def filme_valido(filme):
+    return filme["Titulo"] != "N/A" and filme["Link"] and filme["Nota"] != "N/A"
+
+
+# Pagina que não mudou desde a ultima coleta (304) reaproveita os dados já extraídos do cache
+def detalhes_do_filme(crawler, link, filme_response, extrator=None):
+    if crawler.cache and filme_response.do_cache:
+        dados = crawler.cache.obter_dados(link)
+        if dados:
+            return dados
+    dados = extrair_detalhes(filme_response.content, extrator, encoding_declarado(filme_response))
+    if crawler.cache:
+        crawler.cache.salvar_dados(link, dados)
+    return dados
+
+
+# Baixa uma pagina da listagem e devolve os cards (None se a pagina não carregou).
+# O HTML é parseado direto dos bytes (response.content), sem a copia em str de response.text
+def coletar_listagem(crawler, url, base_site=BASE_SITE, extrator=None):
+    response = crawler.buscar(url)
+
+    # Checa se a página foi carregada com sucesso
+    if response.status_code != 200:
+        print(f"Erro ao carregar a página {url}. Status code: {response.status_code}")
+        return None
+    return extrair_cards(response.content, base_site, extrator, encoding_declarado(response))
+
+
+# Visita as paginas dos filmes em paralelo pelo crawler e devolve {link: detalhes}
+# só dos filmes que deram certo
+def coletar_detalhes(crawler, links, extrator=None):
+    detalhes = {}
+    for link, filme_response, erro in crawler.buscar_varios(links):
+        if erro is not None:
+            print(f"Erro ao acessar {link}. Erro: {erro}")
+            continue
+        if filme_response.status_code != 200:
+            print(f"Erro ao carregar {link}. Status code: {filme_response.status_code}")
+            continue
+        try:
+            detalhes[link] = detalhes_do_filme(crawler, link, filme_response, extrator)
+        except Exception as e:
+            print(f"Erro ao processar o filme {link}. Erro: {e}")
+    return detalhes
+
+
+# Junta cards e detalhes, descartando os filmes incompletos
+def montar_filmes(cards, detalhes):
+    filmes = []
+    for card in cards:
+        filme = montar_filme(card, detalhes.get(card["Link"], {}))
+        if filme_valido(filme):
+            filmes.append(filme)
+        else:
+            print(f"Filme incompleto ou erro na coleta de dados: {filme['Titulo']}")
+    return filmes
+
+
+# Coleta uma pagina da listagem inteira, com os detalhes de cada filme
+def coletar_pagina(crawler, pagina, base_url=BASE_URL, base_site=BASE_SITE, extrator=None):
+    extrator = extrator or obter_extrator()
+    url = url_listagem(pagina, base_url)
+    print(f"Coletando dados da pagina {pagina}: {url}")
+    cards = coletar_listagem(crawler, url, base_site, extrator)
+    if cards is None:
+        return []
+    links = [card["Link"] for card in cards if card["Link"]]
+    return montar_filmes(cards, coletar_detalhes(crawler, links, extrator))
+
+
+# Coleta guiada pela fronteira persistente: cada listagem e cada filme passa por
+# pendente -> em_andamento -> concluida. É um gerador que entrega os filmes em lotes
+# de até `tamanho_lote`; o lote só é marcado como concluido quando quem consome pede
+# o proximo, ou seja, depois de gravado. Se o processo cair, basta rodar de novo
+# com a mesma fronteira que a coleta continua de onde parou.
+def iterar_com_fronteira(crawler, fronteira, base_site=BASE_SITE, extrator=None, tamanho_lote=30):
+    extrator = extrator or obter_extrator()
+    while True:
+        # primeiro termina os filmes já enfileirados, depois abre a proxima listagem
+        lote = fronteira.pegar('filme', tamanho_lote)
+        if lote:
+            cards = dict(lote)
+            detalhes = coletar_detalhes(crawler, list(cards), extrator)
+            filmes = [montar_filme(cards[url], dados) for url, dados in detalhes.items()]
+            yield filmes
+            # o que falhou volta para a fila (ou vira erro depois de algumas tentativas)
+            fronteira.concluir_varios(list(detalhes))
+            for url in cards.keys() - detalhes.keys():
+                fronteira.falhar(url)
+            print(f"Checkpoint: {len(filmes)} filmes | {fronteira.resumo()}")
+            continue
+
+        listagens = fronteira.pegar('listagem', 1)
+        if not listagens:
+            break
+        url, _ = listagens[0]
+        print(f"Coletando dados da listagem: {url}")
+        try:
+            cards = coletar_listagem(crawler, url, base_site, extrator)
+        except Exception as e:
+            print(f"Erro ao acessar {url}. Erro: {e}")
+            cards = None
+        if cards is None:
+            fronteira.falhar(url)
+            continue
+        for card in cards:
+            if not card["Link"]:
+                print(f"Filme incompleto ou erro na coleta de dados: {card['Titulo']}")
+        fronteira.adicionar('filme', [(card["Link"], card) for card in cards if card["Link"]])
+        fronteira.concluir(url)
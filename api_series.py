@@ -0,0 +1,99 @@
+from flask import Blueprint, jsonify, request
+
+import banco
+import cache_dados
+
+# API JSON das series economicas, para os graficos serem desenhados no navegador.
+# GET /api/series?name=selic&from=2023-01&to=2024-06         -> serie no intervalo
+# GET /api/series?name=selic&since=12                         -> só os meses alterados depois da versão 12
+# A resposta é colunar ({"mes": [...], "valor": [...]}) e traz a versão atual dos dados,
+# que o cliente manda de volta em `since` na proxima consulta.
+# Resposta sem `since` é a serie inteira e substitui o que o cliente tem: é o que volta
+# também quando `since` é maior que a versão atual (banco recriado), para o cliente ressincronizar.
+
+api = Blueprint('api', __name__, url_prefix='/api')
+
+# nome na API -> (tabela, coluna do valor)
+SERIES = {
+    'inadimplencia': ('inadimplencia', 'inadimplencia'),
+    'selic': ('selic', 'selic_diaria'),
+}
+
+
+@api.route('/series')
+def series():
+    nome = request.args.get('name')
+    if nome not in SERIES:
+        return jsonify({'Erro': f"Serie invalida. Opções: {', '.join(SERIES)}"}), 400
+    tabela, coluna = SERIES[nome]
+    inicio = request.args.get('from', '0000-00')
+    fim = request.args.get('to', '9999-99')
+    since = request.args.get('since', type=int)
+
+    with banco.conectar() as conn:
+        versao = cache_dados.versao_atual(conn)
+        # since=0 é um delta desde a versão 0; since de uma versão que não existe cai na serie inteira
+        delta = since is not None and since <= versao
+        # o filtro de intervalo (e de versão, no delta) é feito pelo proprio SQLite
+        if delta:
+            linhas = conn.execute(f'''
+                SELECT t.mes, t.{coluna} FROM {tabela} t
+                JOIN meses_alterados a ON a.serie = ? AND a.mes = t.mes
+                WHERE a.versao > ? AND t.mes BETWEEN ? AND ?
+                ORDER BY t.mes
+            ''', (nome, since, inicio, fim)).fetchall()
+            removidos = [mes for (mes,) in conn.execute('''
+                SELECT mes FROM meses_alterados
+                WHERE serie = ? AND versao > ? AND removido = 1 AND mes BETWEEN ? AND ?
+                ORDER BY mes
+            ''', (nome, since, inicio, fim))]
+        else:
+            linhas = conn.execute(
+                f'SELECT mes, {coluna} FROM {tabela} WHERE mes BETWEEN ? AND ? ORDER BY mes', (inicio, fim)
+            ).fetchall()
+
+    resposta = {
+        'name': nome,
+        'version': versao,
+        'mes': [mes for mes, _ in linhas],
+        'valor': [valor for _, valor in linhas],
+    }
+    if delta:
+        resposta['since'] = since
+        resposta['removidos'] = removidos
+
+    response = jsonify(resposta)
+    # mesma versão e mesmos parametros = mesma resposta
+    response.set_etag(f"{nome}-{versao}-{since if delta else 'tudo'}-{inicio}-{fim}")
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+# GET /api/correlacao?janela=24&defasagem_max=24
+# Correlação da Selic adiantada k meses com a inadimplencia: da serie inteira (defasada) e
+# em janelas moveis (movel[k][j] = janela que termina em mes[j]); null onde não dá para calcular
+@api.route('/correlacao')
+def correlacao():
+    # numpy só é carregado na primeira chamada (o main.py sobe sem ele)
+    import correlacoes
+
+    with banco.conectar() as conn:
+        versao = cache_dados.versao_atual(conn)
+        merged = cache_dados.dados_mensais(conn).merged
+    janela, defasagens, erro = correlacoes.ler_parametros(request.args, len(merged))
+    if erro:
+        return jsonify({'Erro': erro}), 400
+    analise = correlacoes.analisar(merged, janela, defasagens)
+
+    response = jsonify({
+        'version': versao,
+        'janela': janela,
+        'defasagens': defasagens,
+        'melhor_defasagem': analise['melhor_defasagem'],
+        'defasada': correlacoes.para_lista(analise['defasada']),
+        'mes': analise['mes'],
+        'movel': [correlacoes.para_lista(linha) for linha in analise['movel']],
+    })
+    response.set_etag(f'correlacao-{versao}-{janela}-{defasagens[-1]}')
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
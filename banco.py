@@ -0,0 +1,139 @@
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import config
+
+# Conexões com o SQLite compartilhadas pelos apps Flask (main.py, super_bugs.py, ...).
+# Em vez de um sqlite3.connect por requisição, as conexões ficam num pool e são reaproveitadas,
+# junto com o cache de statements preparados de cada uma. O banco roda em modo WAL, então
+# as leituras não esperam as escritas, e todas as escritas do processo passam por uma fila
+# atendida por uma thread só, sem threads disputando o lock de escrita do SQLite.
+#
+# Leitura:  with banco.conectar() as conn: ...
+# Escrita:  banco.escrever(funcao, *args)  -> funcao(conn, *args) numa transação, devolve o resultado
+
+
+def _abrir(caminho):
+    conn = sqlite3.connect(
+        caminho,
+        timeout=30,
+        check_same_thread=False,
+        cached_statements=config.SQLITE_STATEMENTS_EM_CACHE
+    )
+    conn.execute('PRAGMA journal_mode=WAL')
+    # em WAL o NORMAL só sincroniza no checkpoint: continua consistente, perde no maximo
+    # as ultimas transações se a maquina cair
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute(f'PRAGMA mmap_size={config.SQLITE_MMAP_SIZE}')
+    conn.execute(f'PRAGMA cache_size=-{config.SQLITE_CACHE_KB}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+
+class Pool:
+    def __init__(self, caminho, tamanho=config.SQLITE_POOL_TAMANHO):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        # LIFO: a conexão devolvida por ultimo (com cache quente) é a proxima a sair
+        self._livres = queue.LifoQueue()
+        self._fila_escrita = queue.Queue()
+        self._escritor = None
+        self._lock = threading.Lock()
+
+    def emprestar(self):
+        try:
+            return self._livres.get_nowait()
+        except queue.Empty:
+            return _abrir(self.caminho)
+
+    def devolver(self, conn):
+        # leitura não deveria deixar transação aberta; se deixou, descarta
+        if conn.in_transaction:
+            conn.rollback()
+        if self._livres.qsize() >= self.tamanho:
+            conn.close()
+        else:
+            self._livres.put(conn)
+
+    def escrever(self, funcao, args):
+        # funcao que já roda na thread de escrita (escrita dentro de escrita) usa a mesma transação
+        if threading.current_thread() is self._escritor:
+            return funcao(self._conn_escrita, *args)
+        futuro = Future()
+        self._fila_escrita.put((futuro, funcao, args))
+        self._iniciar_escritor()
+        return futuro.result()
+
+    def _iniciar_escritor(self):
+        with self._lock:
+            if self._escritor is None:
+                self._escritor = threading.Thread(target=self._atender_escritas, name='sqlite-escritor', daemon=True)
+                self._escritor.start()
+
+    def _atender_escritas(self):
+        self._conn_escrita = _abrir(self.caminho)
+        while True:
+            futuro, funcao, args = self._fila_escrita.get()
+            if not futuro.set_running_or_notify_cancel():
+                continue
+            try:
+                # IMMEDIATE pega o lock de escrita já no inicio (outro processo pode estar escrevendo)
+                self._conn_escrita.execute('BEGIN IMMEDIATE')
+                with self._conn_escrita:
+                    resultado = funcao(self._conn_escrita, *args)
+            except BaseException as e:
+                futuro.set_exception(e)
+            else:
+                futuro.set_result(resultado)
+
+    def fechar(self):
+        while True:
+            try:
+                self._livres.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pools = {}
+_lock = threading.Lock()
+
+
+def pool(caminho=None):
+    caminho = caminho or config.DB_PATH
+    with _lock:
+        if caminho not in _pools:
+            _pools[caminho] = Pool(caminho)
+        return _pools[caminho]
+
+
+# Conexão do pool para leitura; volta para o pool no fim do with
+@contextmanager
+def conectar(caminho=None):
+    p = pool(caminho)
+    conn = p.emprestar()
+    try:
+        yield conn
+    finally:
+        p.devolver(conn)
+
+
+# Roda funcao(conn, *args) na thread de escrita, numa transação (commit no fim, rollback se der erro)
+def escrever(funcao, *args, caminho=None):
+    return pool(caminho).escrever(funcao, args)
+
+
+def fechar():
+    with _lock:
+        for p in _pools.values():
+            p.fechar()
+        _pools.clear()
+
+
+# conexões do SQLite não podem ser usadas depois de um fork (servidor pre-fork):
+# o processo filho começa com pools novos
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_pools.clear)
@@ -0,0 +1,120 @@
+# Teste de carga de leitura/escrita concorrentes no SQLite: um sqlite3.connect por operação
+# (como as rotas faziam) contra o pool do banco.py (WAL + fila de escrita)
+# Uso: python -m benchmarks.bench_banco --leitores 8 --escritores 2 --segundos 5
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+import banco
+import cache_dados
+
+
+def criar_banco(caminho, meses=240):
+    with sqlite3.connect(caminho) as conn:
+        conn.execute('CREATE TABLE selic(mes TEXT PRIMARY KEY, selic_diaria REAL)')
+        conn.executemany('INSERT INTO selic VALUES (?, ?)',
+                         [(f'{2000 + i // 12}-{i % 12 + 1:02d}', 0.05) for i in range(meses)])
+        cache_dados.preparar(conn)
+    return [f'{2000 + i // 12}-{i % 12 + 1:02d}' for i in range(meses)]
+
+
+# o que uma rota de leitura faz: versão dos dados + a serie inteira
+def ler(conn):
+    cache_dados.versao_atual(conn)
+    return conn.execute('SELECT mes, selic_diaria FROM selic ORDER BY mes').fetchall()
+
+
+# o que o /editar_selic faz
+def escrever(conn, mes, valor):
+    conn.execute('UPDATE selic SET selic_diaria = ? WHERE mes = ?', (valor, mes))
+    cache_dados.nova_versao(conn)
+    cache_dados.registrar_alteracoes(conn, 'selic', [mes])
+
+
+def por_requisicao(caminho):
+    def leitura():
+        with sqlite3.connect(caminho) as conn:
+            ler(conn)
+        # o with do sqlite3 não fecha a conexão; as rotas deixavam o gc fechar
+        conn.close()
+
+    def escrita(mes, valor):
+        with sqlite3.connect(caminho) as conn:
+            escrever(conn, mes, valor)
+        conn.close()
+    return leitura, escrita
+
+
+def com_pool(caminho):
+    def leitura():
+        with banco.conectar(caminho) as conn:
+            ler(conn)
+
+    def escrita(mes, valor):
+        banco.escrever(escrever, mes, valor, caminho=caminho)
+    return leitura, escrita
+
+
+def carga(leitura, escrita, meses, leitores, escritores, segundos):
+    fim = time.perf_counter() + segundos
+    latencias = [[] for _ in range(leitores)]
+    contagem = {'escritas': 0, 'erros': 0}
+    lock = threading.Lock()
+
+    def leitor(i):
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            try:
+                leitura()
+            except sqlite3.OperationalError:
+                with lock:
+                    contagem['erros'] += 1
+                continue
+            latencias[i].append(time.perf_counter() - inicio)
+
+    def escritor(i):
+        gerador = np.random.default_rng(i)
+        while time.perf_counter() < fim:
+            try:
+                escrita(meses[gerador.integers(len(meses))], float(gerador.uniform(0.01, 0.06)))
+            except sqlite3.OperationalError:
+                with lock:
+                    contagem['erros'] += 1
+                continue
+            with lock:
+                contagem['escritas'] += 1
+
+    threads = [threading.Thread(target=leitor, args=(i,)) for i in range(leitores)]
+    threads += [threading.Thread(target=escritor, args=(i,)) for i in range(escritores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    todas = np.concatenate([np.array(lista) for lista in latencias]) * 1000
+    return len(todas) / segundos, contagem['escritas'] / segundos, contagem['erros'], np.percentile(todas, [50, 95])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Carga concorrente de leitura/escrita no SQLite')
+    parser.add_argument('--leitores', type=int, default=8)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--segundos', type=float, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f'{"modo":<16} {"leituras/s":>11} {"escritas/s":>11} {"erros":>6} {"p50 ms":>7} {"p95 ms":>7}')
+        resultados = {}
+        for nome, montar in (('por requisição', por_requisicao), ('pool + WAL', com_pool)):
+            caminho = os.path.join(pasta, f'{nome.split()[0]}.db')
+            meses = criar_banco(caminho)
+            leitura, escrita = montar(caminho)
+            leituras, escritas, erros, (p50, p95) = carga(leitura, escrita, meses, args.leitores, args.escritores, args.segundos)
+            resultados[nome] = leituras + escritas
+            print(f'{nome:<16} {leituras:>11.0f} {escritas:>11.0f} {erros:>6} {p50:>7.2f} {p95:>7.2f}')
+        print(f'ganho de vazão total: {resultados["pool + WAL"] / resultados["por requisição"]:.1f}x')
+        banco.fechar()
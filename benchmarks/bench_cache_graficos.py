@@ -0,0 +1,57 @@
+# Benchmark das rotas de graficos do main.py com e sem o cache de respostas renderizadas
+# Uso: python -m benchmarks.bench_cache_graficos --requisicoes 30
+import argparse
+import os
+import tempfile
+import time
+
+import config
+
+
+def preparar_app(pasta):
+    config.DB_PATH = os.path.join(pasta, 'dados.db')
+    import main
+    main.DB_PATH = config.DB_PATH
+    main.init_db()
+    cliente = main.criar_app(aquecer=False).test_client()
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(raiz, 'inadimplencia.csv'), 'rb') as inad, open(os.path.join(raiz, 'taxa_selic.csv'), 'rb') as selic:
+        cliente.post('/upload', data={'campo_inadimplencia': (inad, 'inadimplencia.csv'),
+                                      'campo_selic': (selic, 'taxa_selic.csv'), 'esperar': '1'})
+    return cliente
+
+
+def medir(funcao, requisicoes):
+    inicio = time.perf_counter()
+    for _ in range(requisicoes):
+        response = funcao()
+    duracao = time.perf_counter() - inicio
+    return requisicoes / duracao, response
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark do cache de graficos renderizados')
+    parser.add_argument('--requisicoes', type=int, default=30)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        cliente = preparar_app(pasta)
+        import cache_dados
+        import cache_respostas
+
+        def frio(rota):
+            cache_respostas.limpar()
+            cache_dados.cache.limpar()
+            return cliente.get(rota)
+
+        print(f'{"rota":<24} {"frio req/s":>11} {"quente req/s":>13} {"gzip bytes":>11} {"304 req/s":>10} {"speedup":>8}')
+        # o insights_3d roda na fila de tarefas; esperar=1 devolve o grafico em vez da pagina de "processando"
+        for rota in ('/graficos', '/correlacao', '/insights_3d?esperar=1'):
+            rps_frio, _ = medir(lambda: frio(rota), args.requisicoes)
+            rps_quente, response = medir(lambda: cliente.get(rota, headers={'Accept-Encoding': 'gzip'}), args.requisicoes)
+            etag = response.headers['ETag']
+            rps_304, condicional = medir(lambda: cliente.get(rota, headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag}),
+                                         args.requisicoes)
+            assert condicional.status_code == 304
+            print(f'{rota:<24} {rps_frio:>11.1f} {rps_quente:>13.1f} {len(response.data):>11} {rps_304:>10.1f} '
+                  f'{rps_quente / rps_frio:>7.0f}x')
@@ -0,0 +1,67 @@
+# Consolidação de varias planilhas: leitura serial (como o 02_importacao.py fazia) x consolidacao.py
+# em processos, com o cache de parquet frio e quente, e depois de alterar uma planilha só.
+# Uso: python -m benchmarks.bench_consolidacao [planilhas] [linhas por aba]
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import config
+import consolidacao
+
+ABAS = ('Relatório de Vendas', 'Relatório de Vendas1')
+CIDADES = ['São Paulo', 'Rio de Janeiro', 'Curitiba', 'Porto Alegre', 'Belo Horizonte']
+PLANOS = ['Basic', 'Pro', 'Enterprise']
+
+
+def gerar_planilhas(pasta, quantidade, linhas, semente=1):
+    gerador = np.random.default_rng(semente)
+    for i in range(quantidade):
+        with pd.ExcelWriter(os.path.join(pasta, f'regional_{i:03d}.xlsx')) as writer:
+            for aba in ABAS:
+                pd.DataFrame({
+                    'Posição': np.arange(1, linhas + 1),
+                    'Cliente': [f'Cliente {i}-{n}' for n in gerador.integers(0, linhas * 2, linhas)],
+                    'Cidade': gerador.choice(CIDADES, linhas),
+                    'Plano Vendido': gerador.choice(PLANOS, linhas),
+                }).to_excel(writer, sheet_name=aba, index=False)
+
+
+def serial(padrao):
+    partes = []
+    for caminho in consolidacao.listar_arquivos(padrao):
+        for aba in ABAS:
+            partes.append(pd.read_excel(caminho, sheet_name=aba))
+    return pd.concat(partes, ignore_index=True)
+
+
+def medir(descricao, funcao, base=None):
+    inicio = time.perf_counter()
+    df = funcao()
+    segundos = time.perf_counter() - inicio
+    resumo = df.attrs.get('consolidacao', {})
+    detalhe = f"lidos {resumo['lidos']}, do cache {resumo['do_cache']}, {resumo['processos']} proc" if resumo else ''
+    print(f'{descricao:<34} {segundos:>8.2f}s {len(df) / segundos:>12,.0f} {base / segundos if base else 1:>8.1f}x  {detalhe}')
+    return segundos
+
+
+if __name__ == '__main__':
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    linhas = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    nucleos = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count()
+    with tempfile.TemporaryDirectory() as pasta:
+        config.CONSOLIDACAO_CACHE_DIR = os.path.join(pasta, 'cache')
+        gerar_planilhas(pasta, quantidade, linhas)
+        padrao = os.path.join(pasta, '*.xlsx')
+        print(f'{quantidade} planilhas x {len(ABAS)} abas x {linhas} linhas, {nucleos} nucleo(s)')
+        print(f'{"":<34} {"tempo":>9} {"linhas/s":>12} {"speedup":>9}')
+        base = medir('serial (pd.read_excel por aba)', lambda: serial(padrao))
+        medir('consolidar sem cache, 1 processo', lambda: consolidacao.consolidar(padrao, ABAS, processos=1, usar_cache=False), base)
+        medir(f'consolidar sem cache, {nucleos} processo(s)', lambda: consolidacao.consolidar(padrao, ABAS, usar_cache=False), base)
+        medir('consolidar, cache frio', lambda: consolidacao.consolidar(padrao, ABAS), base)
+        medir('consolidar, cache quente', lambda: consolidacao.consolidar(padrao, ABAS), base)
+        gerar_planilhas(pasta, 1, linhas, semente=2)
+        medir('consolidar, 1 planilha alterada', lambda: consolidacao.consolidar(padrao, ABAS), base)
@@ -0,0 +1,69 @@
+# Benchmark do motor de correlações moveis/defasadas numa serie mensal sintetica de 50 anos
+# Uso: python -m benchmarks.bench_correlacoes --meses 600 --janela 24 --defasagem-max 24
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import correlacoes
+
+
+def series_sinteticas(meses, defasagem=9, semente=42):
+    gerador = np.random.default_rng(semente)
+    selic = np.clip(0.035 + np.cumsum(gerador.normal(0, 0.0008, meses + defasagem)), 0.005, 0.1)
+    # a inadimplencia responde à selic `defasagem` meses depois
+    inadimplencia = 3 + 15 * selic[:meses] + gerador.normal(0, 0.05, meses)
+    return selic[defasagem:], inadimplencia
+
+
+# Um .corr() do pandas por janela e por defasagem
+def laco_pandas(x, y, janela, defasagens):
+    x, y = pd.Series(x), pd.Series(y)
+    matriz = np.full((len(defasagens), len(x) - janela + 1), np.nan)
+    for i, k in enumerate(defasagens):
+        xk = x.shift(k)
+        for j in range(k, len(x) - janela + 1):
+            matriz[i, j] = xk.iloc[j:j + janela].corr(y.iloc[j:j + janela])
+    return matriz
+
+
+# rolling().corr() do pandas por defasagem
+def rolling_pandas(x, y, janela, defasagens):
+    x, y = pd.Series(x), pd.Series(y)
+    return np.array([x.shift(k).rolling(janela).corr(y).to_numpy()[janela - 1:] for k in defasagens])
+
+
+def cronometrar(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000, resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Correlações moveis e defasadas: somas acumuladas x pandas')
+    parser.add_argument('--meses', type=int, default=600)
+    parser.add_argument('--janela', type=int, default=24)
+    parser.add_argument('--defasagem-max', type=int, default=24)
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--sem-laco', action='store_true', help='pula o laço de .corr() (lento em series longas)')
+    args = parser.parse_args()
+
+    x, y = series_sinteticas(args.meses)
+    defasagens = list(range(args.defasagem_max + 1))
+    ms_motor, matriz = cronometrar(lambda: correlacoes.correlacao_movel_defasada(x, y, args.janela, defasagens),
+                                   args.repeticoes)
+    print(f'{args.meses} meses, janela {args.janela}, defasagens 0-{args.defasagem_max} '
+          f'({len(defasagens) * (args.meses - args.janela + 1)} correlações)')
+    print(f'{"metodo":<24} {"ms":>10} {"speedup":>8} {"dif. max":>9}')
+    print(f'{"somas acumuladas":<24} {ms_motor:>10.2f} {"1x":>8} {"-":>9}')
+    comparacoes = [('pandas rolling().corr()', rolling_pandas)]
+    if not args.sem_laco:
+        comparacoes.append(('laço de .corr()', laco_pandas))
+    for nome, funcao in comparacoes:
+        ms, referencia = cronometrar(lambda: funcao(x, y, args.janela, defasagens), 1 if funcao is laco_pandas else args.repeticoes)
+        diferenca = np.nanmax(np.abs(matriz - referencia))
+        print(f'{nome:<24} {ms:>10.2f} {ms / ms_motor:>7.0f}x {diferenca:>9.1e}')
+    melhor = correlacoes.correlacao_defasada(x, y, defasagens)
+    print(f'defasagem com maior correlação: {int(np.nanargmax(np.abs(melhor)))} meses (gerada com 9)')
@@ -0,0 +1,74 @@
+# Benchmark do crawler contra um servidor HTTP local com paginas de fixture
+# Uso: python -m benchmarks.bench_crawler --paginas 2 --latencia 0.05
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import requests
+
+import adorocinema
+from cache_http import CacheHTTP
+from crawler import Crawler, HEADERS
+from extracao import ExtratorBS4
+from benchmarks.fixtures_adorocinema import ServidorFixture
+
+
+# Caminho antigo: requests.get solto (uma conexão nova por requisição), um filme por vez
+def coletar_sequencial(servidor, paginas):
+    extrator = ExtratorBS4()
+    total = 0
+    for pagina in range(1, paginas + 1):
+        response = requests.get(adorocinema.url_listagem(pagina, servidor.base_url), headers=HEADERS)
+        total += 1
+        for card in adorocinema.extrair_cards(response.text, servidor.base_site, extrator):
+            filme_response = requests.get(card['Link'], headers=HEADERS)
+            adorocinema.extrair_detalhes(filme_response.text, extrator)
+            total += 1
+    return total
+
+
+def coletar_crawler(servidor, paginas, concorrencia, taxa, cache=None):
+    total = 0
+    with Crawler(concorrencia_por_host=concorrencia, requisicoes_por_segundo=taxa, cache=cache) as crawler:
+        for pagina in range(1, paginas + 1):
+            filmes = adorocinema.coletar_pagina(crawler, pagina, servidor.base_url, servidor.base_site)
+            total += 1 + len(filmes)
+    return total
+
+
+def medir(nome, funcao):
+    inicio = time.perf_counter()
+    # os prints de progresso do scraper não entram na medição
+    with contextlib.redirect_stdout(io.StringIO()):
+        total = funcao()
+    duracao = time.perf_counter() - inicio
+    print(f'{nome:<30} {total:>5} paginas  {duracao:>7.2f}s  {total / duracao:>8.1f} paginas/s')
+    return total / duracao
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark do crawler do AdoroCinema')
+    parser.add_argument('--paginas', type=int, default=2)
+    parser.add_argument('--latencia', type=float, default=0.05, help='latencia simulada por resposta (s)')
+    parser.add_argument('--concorrencia', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--taxa', type=float, default=0, help='requisições por segundo (0 = sem limite)')
+    args = parser.parse_args()
+
+    with ServidorFixture(latencia=args.latencia) as servidor:
+        base = medir('sequencial (requests.get)', lambda: coletar_sequencial(servidor, args.paginas))
+        for concorrencia in args.concorrencia:
+            vazao = medir(f'crawler concorrencia={concorrencia}',
+                          lambda: coletar_crawler(servidor, args.paginas, concorrencia, args.taxa))
+            print(f'{"":<30} speedup {vazao / base:.1f}x')
+
+        # Segunda coleta com cache: tudo volta 304 e só a listagem é parseada
+        concorrencia = max(args.concorrencia)
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = CacheHTTP(caminho=os.path.join(pasta, 'cache.db'))
+            medir('cache frio', lambda: coletar_crawler(servidor, args.paginas, concorrencia, args.taxa, cache))
+            vazao = medir('cache quente (304)', lambda: coletar_crawler(servidor, args.paginas, concorrencia, args.taxa, cache))
+            print(f'{"":<30} speedup {vazao / base:.1f}x  {cache.estatisticas}')
+            cache.fechar()
@@ -0,0 +1,58 @@
+# Tamanho do HTML e tempo de montagem dos graficos do /graficos com e sem a redução de pontos
+# Uso: python -m benchmarks.bench_decimacao --pontos 18262 200000 --largura 1000
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objs as go
+
+import config
+import decimacao
+
+
+# Serie diaria sintetica com cara de Selic (passeio aleatorio com degraus)
+def serie_diaria(pontos, semente=42):
+    gerador = np.random.default_rng(semente)
+    datas = pd.date_range('1975-01-01', periods=pontos, freq='D').strftime('%Y-%m-%d')
+    valores = np.clip(0.04 + np.cumsum(gerador.normal(0, 0.0002, pontos)), 0.001, 0.2)
+    return datas.to_numpy(), valores
+
+
+def antes(x, y, largura):
+    fig = go.Figure(go.Scatter(x=x, y=y, mode='lines+markers', name='Selic'))
+    return fig.to_html(full_html=False, include_plotlyjs='cdn'), len(y), 'Scatter'
+
+
+def depois(x, y, largura):
+    trace = decimacao.trace_serie(x, y, 'Selic', largura)
+    fig = go.Figure(trace)
+    return fig.to_html(full_html=False, include_plotlyjs='cdn'), len(trace.y), type(trace).__name__
+
+
+def medir(funcao, x, y, largura, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        html, pontos, tipo = funcao(x, y, largura)
+    return (time.perf_counter() - inicio) / repeticoes * 1000, len(html.encode('utf-8')), pontos, tipo
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Payload do grafico com e sem decimação')
+    parser.add_argument('--pontos', type=int, nargs='+', default=[18262, 200000])
+    parser.add_argument('--largura', type=int, default=config.GRAFICOS_LARGURA_PX)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f'{"pontos":>8} {"versão":<20} {"trace":<10} {"enviados":>9} {"HTML KB":>9} {"montagem ms":>12}')
+    for pontos in args.pontos:
+        x, y = serie_diaria(pontos)
+        for nome, funcao, largura in (('antes', antes, 0),
+                                      (f'lttb {args.largura}px', depois, args.largura),
+                                      ('sem redução (0px)', depois, 0)):
+            ms, tamanho, enviados, tipo = medir(funcao, x, y, largura, args.repeticoes)
+            print(f'{pontos:>8} {nome:<20} {tipo:<10} {enviados:>9} {tamanho / 1024:>9.0f} {ms:>12.1f}')
+        config.GRAFICOS_DECIMACAO = 'minmax'
+        ms, tamanho, enviados, tipo = medir(depois, x, y, args.largura, args.repeticoes)
+        config.GRAFICOS_DECIMACAO = 'lttb'
+        print(f'{pontos:>8} {f"minmax {args.largura}px":<20} {tipo:<10} {enviados:>9} {tamanho / 1024:>9.0f} {ms:>12.1f}')
@@ -0,0 +1,40 @@
+# Bytes por resposta das paginas de grafico com o plotly.js embutido x servido pelo estaticos.py
+# Uso: python -m benchmarks.bench_estaticos
+import gzip
+import importlib
+import os
+import tempfile
+import time
+
+import plotly.express as px
+
+import config
+import estaticos
+
+
+def kb(n):
+    return f'{n / 1024:,.1f}'
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as pasta:
+        config.ESTATICOS_DIR = os.path.join(pasta, 'estaticos')
+        inicio = time.perf_counter()
+        estaticos.url_plotly()
+        print(f'publicação do bundle (hash + .gz/.br, só na primeira vez): {time.perf_counter() - inicio:.1f}s')
+
+        grafico = importlib.import_module('04_grafico_plotly')
+        cliente = grafico.app.test_client()
+        fig = px.pie(values=[5, 3, 2], names=['Ativo', 'Inativo', 'Cancelado'])
+        embutido = fig.to_html(full_html=False).encode('utf-8')
+
+        pagina = cliente.get('/')
+        bundle = cliente.get(estaticos.url_plotly())
+        bundle_gzip = cliente.get(estaticos.url_plotly(), headers={'Accept-Encoding': 'gzip'})
+        revalidado = cliente.get(estaticos.url_plotly(), headers={'If-None-Match': bundle.headers['ETag']})
+
+        print(f'{"":<40} {"KB":>10} {"KB gzip":>10}')
+        print(f'{"pagina com plotly.js embutido (antes)":<40} {kb(len(embutido)):>10} {kb(len(gzip.compress(embutido))):>10}')
+        print(f'{"pagina com <script src> (depois)":<40} {kb(len(pagina.data)):>10} {kb(len(gzip.compress(pagina.data))):>10}')
+        print(f'{"plotly.min.js (uma vez por navegador)":<40} {kb(len(bundle.data)):>10} {kb(len(bundle_gzip.data)):>10}')
+        print(f'Cache-Control: {bundle.headers["Cache-Control"]}; revalidação: {revalidado.status_code}')
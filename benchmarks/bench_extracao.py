@@ -0,0 +1,40 @@
+# Micro-benchmark dos extratores de HTML sobre as paginas de fixture
+# (coloque paginas reais salvas em benchmarks/fixtures/listagem.html e filme.html para usar elas)
+# Uso: python -m benchmarks.bench_extracao --repeticoes 50
+import argparse
+import time
+
+import adorocinema
+from extracao import EXTRATORES
+from benchmarks.fixtures_adorocinema import carregar_fixture, html_filme, html_listagem
+
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes, resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark dos extratores de HTML')
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    listagem = carregar_fixture('listagem.html', lambda: html_listagem(1))
+    filme = carregar_fixture('filme.html', lambda: html_filme(1))
+    print(f'listagem: {len(listagem) / 1024:.0f} KB   filme: {len(filme) / 1024:.0f} KB')
+
+    # o html.parser com a arvore inteira (response.text) é o caminho antigo do scraper
+    base_cards = medir(lambda: EXTRATORES['bs4']().cards(listagem.decode('utf-8'), adorocinema.BASE_SITE), args.repeticoes)
+    base_detalhes = medir(lambda: EXTRATORES['bs4']().detalhes(filme.decode('utf-8')), args.repeticoes)
+
+    print(f'{"extrator":<10} {"listagem (ms)":>14} {"filme (ms)":>11} {"speedup":>8}  resultado')
+    for nome, classe in EXTRATORES.items():
+        extrator = classe()
+        t_cards, cards = medir(lambda: extrator.cards(listagem, adorocinema.BASE_SITE), args.repeticoes)
+        t_detalhes, detalhes = medir(lambda: extrator.detalhes(filme), args.repeticoes)
+        speedup = (base_cards[0] + base_detalhes[0]) / (t_cards + t_detalhes)
+        igual = cards == base_cards[1] and detalhes == base_detalhes[1]
+        print(f'{nome:<10} {t_cards * 1000:>14.2f} {t_detalhes * 1000:>11.2f} {speedup:>7.1f}x  '
+              f'{"igual ao bs4" if igual else "DIFERENTE do bs4"}')
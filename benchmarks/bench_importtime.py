@@ -0,0 +1,86 @@
+# Tempo de subida do main.py: imports adiados (criar_app) x tudo carregado no import, como antes
+# Uso: python -m benchmarks.bench_importtime [repetições]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# o que o main.py importava no topo antes do criar_app (inclusive o dash, que nem era usado)
+ANTES = 'import main, numpy, pandas, plotly.graph_objs, sklearn.cluster, sklearn.preprocessing, dash, ' \
+        'correlacoes, decimacao, ingestao, modelos; main.criar_app(aquecer=False)'
+DEPOIS = 'import main; main.criar_app(aquecer=False)'
+
+# primeira requisição de grafico depois de subir, sem e com o pre-aquecimento
+PRIMEIRA_REQUISICAO = '''
+import os, sys, threading, time
+import config
+config.DB_PATH = os.path.join(sys.argv[1], 'dados.db')
+import main
+main.init_db()
+inicio = time.perf_counter()
+app = main.criar_app(aquecer=sys.argv[2] == '1')
+for thread in threading.enumerate():
+    if thread.name == 'pre_aquecer':
+        thread.join()
+pronto = time.perf_counter() - inicio
+cliente = app.test_client()
+inicio = time.perf_counter()
+cliente.get('/correlacao')
+print(pronto, time.perf_counter() - inicio)
+'''
+
+
+def rodar(*argumentos):
+    saida = subprocess.run(
+        [sys.executable, *argumentos], cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+    return saida.stdout, saida.stderr
+
+
+def tempo_subida(codigo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        saida, _ = rodar('-c', f'import time; t = time.perf_counter(); {codigo}; print(time.perf_counter() - t)')
+        tempos.append(float(saida.split()[-1]))
+    return statistics.median(tempos)
+
+
+# Soma o tempo acumulado (-X importtime) dos imports feitos direto pelo codigo, por pacote
+def importtime(codigo):
+    _, erros = rodar('-X', 'importtime', '-c', codigo)
+    pacotes = {}
+    for linha in erros.splitlines():
+        if not linha.startswith('import time:') or 'cumulative' in linha:
+            continue
+        _, acumulado, nome = linha.split('|')
+        # só o primeiro nivel (os filhos já estão no acumulado do pai)
+        if len(nome) - len(nome.lstrip()) > 1:
+            continue
+        pacote = nome.strip().split('.')[0]
+        pacotes[pacote] = pacotes.get(pacote, 0) + int(acumulado) / 1e6
+    return pacotes
+
+
+if __name__ == '__main__':
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    antes = tempo_subida(ANTES, repeticoes)
+    depois = tempo_subida(DEPOIS, repeticoes)
+    print(f'subida do main.py (mediana de {repeticoes}): antes {antes:.2f}s  depois {depois:.2f}s  ({antes / depois:.1f}x)')
+
+    pacotes_antes = importtime(ANTES)
+    pacotes_depois = importtime(DEPOIS)
+    print(f'\n-X importtime por pacote (s, acumulado)\n{"pacote":<24} {"antes":>8} {"depois":>8}')
+    for nome in sorted(pacotes_antes, key=pacotes_antes.get, reverse=True):
+        if pacotes_antes[nome] < 0.005:
+            break
+        print(f'{nome:<24} {pacotes_antes[nome]:>8.3f} {pacotes_depois.get(nome, 0):>8.3f}')
+
+    print()
+    with tempfile.TemporaryDirectory() as pasta:
+        for aquecer, descricao in (('0', 'sem pre-aquecimento'), ('1', 'com pre-aquecimento')):
+            saida, _ = rodar('-c', PRIMEIRA_REQUISICAO, pasta, aquecer)
+            pronto, primeira = map(float, saida.split()[-2:])
+            print(f'{descricao}: modulos prontos em {pronto:.2f}s, primeira requisição /correlacao {primeira * 1000:.0f}ms')
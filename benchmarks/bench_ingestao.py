@@ -0,0 +1,69 @@
+# Benchmark da ingestão dos CSVs de serie diaria do /upload com um arquivo sintetico
+# Uso: python -m benchmarks.bench_ingestao --linhas 10000000
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import ingestao
+
+
+# Gera um CSV data;valor no formato do BCB com `linhas` linhas diarias
+def gerar_arquivo(caminho, linhas, bloco=1_000_000):
+    dias = pd.date_range('1990-01-01', '2024-12-31', freq='D').strftime('%d/%m/%Y').to_numpy()
+    gerador = np.random.default_rng(42)
+    with open(caminho, 'w') as arquivo:
+        arquivo.write('data;valor\n')
+        for inicio in range(0, linhas, bloco):
+            n = min(bloco, linhas - inicio)
+            datas = dias[np.sort(gerador.integers(0, len(dias), n))]
+            valores = np.round(gerador.uniform(0.01, 0.06, n), 6)
+            pd.DataFrame({'data': datas, 'valor': valores}).to_csv(arquivo, sep=';', header=False, index=False)
+
+
+# O caminho antigo do /upload: le tudo, pd.to_datetime e uma string de mês por linha
+def caminho_antigo(caminho):
+    df = pd.read_csv(caminho, sep=';', names=['data', 'selic_diaria'], header=0)
+    df['data'] = pd.to_datetime(df['data'], format="%d/%m/%Y")
+    df['mes'] = df['data'].dt.to_period('M').astype(str)
+    return df.groupby('mes')['selic_diaria'].mean().reset_index()
+
+
+def medir(nome, funcao, linhas, memoria):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    duracao = time.perf_counter() - inicio
+    texto = f'{nome:<10} {duracao:>7.2f}s  {linhas / duracao:>12,.0f} linhas/s'
+    # o tracemalloc deixa tudo bem mais lento, então o pico é medido numa segunda execução
+    if memoria:
+        tracemalloc.start()
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        texto += f'  pico {pico / 1024 / 1024:>8.1f} MB'
+    print(texto)
+    return resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark da ingestão em pedaços do /upload')
+    parser.add_argument('--linhas', type=int, default=10_000_000)
+    parser.add_argument('--chunk', type=int, default=ingestao.TAMANHO_CHUNK)
+    parser.add_argument('--memoria', action='store_true', help='mede também o pico de memoria (tracemalloc)')
+    parser.add_argument('--sem-antigo', action='store_true', help='não roda o caminho antigo (usa muita memoria)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, 'selic.csv')
+        gerar_arquivo(caminho, args.linhas)
+        print(f'arquivo: {args.linhas:,} linhas, {os.path.getsize(caminho) / 1024 / 1024:.0f} MB')
+
+        novo = medir('chunks', lambda: ingestao.media_mensal(caminho, 'selic_diaria', args.chunk), args.linhas, args.memoria)
+        if not args.sem_antigo:
+            antigo = medir('antigo', lambda: caminho_antigo(caminho), args.linhas, args.memoria)
+            assert np.allclose(antigo['selic_diaria'].to_numpy(), novo['selic_diaria'].to_numpy())
+            assert list(antigo['mes']) == list(novo['mes'])
@@ -0,0 +1,53 @@
+# Benchmark do modelo do /insights_3d: ajuste completo contra incorporar um mês novo ao modelo salvo
+# Uso: python -m benchmarks.bench_modelos --meses 120 1200 12000
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+import modelos
+
+
+def serie_sintetica(meses, semente=42):
+    gerador = np.random.default_rng(semente)
+    selic = np.clip(0.035 + np.cumsum(gerador.normal(0, 0.0005, meses)), 0.005, 0.08)
+    inadimplencia = 3 + 20 * (selic - 0.035) + gerador.normal(0, 0.1, meses)
+    return pd.DataFrame({
+        'mes': [f'{1900 + i // 12:04d}-{i % 12 + 1:02d}' for i in range(meses)],
+        'mes_idx': range(meses),
+        'selic_diaria': selic,
+        'inadimplencia': inadimplencia
+    })
+
+
+def cronometrar(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000, resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Ajuste completo x incremental do modelo de insights')
+    parser.add_argument('--meses', type=int, nargs='+', default=[120, 1200, 12000])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f'{"meses":>7} {"completo ms":>12} {"incremental ms":>15} {"speedup":>8} {"dif. coef.":>11}')
+    for meses in args.meses:
+        merged = serie_sintetica(meses)
+        salvo = json.dumps(modelos.ModeloInsights.ajustar(merged.iloc[:-1]).estado)
+
+        def incremental():
+            # inclui o custo de ler o estado salvo, como no /insights_3d
+            modelo = modelos.ModeloInsights(json.loads(salvo))
+            modelo.incorporar(merged.iloc[-1:])
+            modelo.rotulos(merged)
+            return modelo
+
+        ms_completo, completo = cronometrar(lambda: modelos.ModeloInsights.ajustar(merged), args.repeticoes)
+        ms_incremental, modelo = cronometrar(incremental, args.repeticoes)
+        diferenca = np.abs(modelo.coeficientes() - completo.coeficientes()).max()
+        print(f'{meses:>7} {ms_completo:>12.1f} {ms_incremental:>15.2f} {ms_completo / ms_incremental:>7.0f}x {diferenca:>11.1e}')
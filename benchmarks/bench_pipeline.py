@@ -0,0 +1,49 @@
+# Mede o pico de memoria do pipeline de coleta em streaming para quantidades
+# diferentes de paginas; com o pipeline em lotes o pico não deve crescer com as paginas
+# Uso: python -m benchmarks.bench_pipeline --paginas 2 8 16
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import adorocinema
+import pipeline_filmes
+from crawler import Crawler
+from fronteira import Fronteira
+from benchmarks.fixtures_adorocinema import ServidorFixture
+
+
+def coletar(servidor, pasta, paginas, lote):
+    fronteira = Fronteira(os.path.join(pasta, 'fronteira.db'))
+    fronteira.reiniciar()
+    fronteira.adicionar('listagem', [(adorocinema.url_listagem(p, servidor.base_url), {'pagina': p})
+                                     for p in range(1, paginas + 1)])
+    sinks = [pipeline_filmes.SinkCSV(os.path.join(pasta, 'filmes.csv')),
+             pipeline_filmes.SinkSQLite(os.path.join(pasta, 'filmes.db'))]
+    with Crawler(concorrencia_por_host=8, requisicoes_por_segundo=0) as crawler:
+        lotes = adorocinema.iterar_com_fronteira(crawler, fronteira, servidor.base_site, tamanho_lote=lote)
+        total = pipeline_filmes.executar(pipeline_filmes.validar(lotes), sinks)
+    fronteira.fechar()
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pico de memoria do pipeline de coleta')
+    parser.add_argument('--paginas', type=int, nargs='+', default=[2, 8, 16])
+    parser.add_argument('--lote', type=int, default=30)
+    args = parser.parse_args()
+
+    with ServidorFixture(latencia=0) as servidor:
+        for paginas in args.paginas:
+            with tempfile.TemporaryDirectory() as pasta:
+                tracemalloc.start()
+                inicio = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    total = coletar(servidor, pasta, paginas, args.lote)
+                duracao = time.perf_counter() - inicio
+                _, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            print(f'{paginas:>4} paginas  {total:>5} filmes  {duracao:>6.2f}s  pico {pico / 1024 / 1024:>6.1f} MB')
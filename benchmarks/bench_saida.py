@@ -0,0 +1,71 @@
+# Gravação e leitura da tabela consolidada de vendas em cada formato do saida.py
+# (e o to_excel do pandas como referencia), com tamanho do arquivo e pico de memoria do Excel.
+# Uso: python -m benchmarks.bench_saida [linhas]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import saida
+
+CIDADES = ['São Paulo', 'Rio de Janeiro', 'Curitiba', 'Porto Alegre', 'Belo Horizonte', 'Recife', 'Salvador']
+PLANOS = ['Basic', 'Pro', 'Enterprise']
+CATEGORICAS = ['Cidade', 'Plano Vendido', 'Status']
+
+
+def tabela_vendas(linhas, semente=1):
+    gerador = np.random.default_rng(semente)
+    df = pd.DataFrame({
+        'Posição': np.arange(1, linhas + 1, dtype=float),
+        'Cliente': [f'Cliente {n}' for n in gerador.integers(0, linhas, linhas)],
+        'Cidade': gerador.choice(CIDADES, linhas),
+        'Plano Vendido': gerador.choice(PLANOS, linhas),
+    })
+    df['Status'] = np.where(df['Plano Vendido'] == 'Enterprise', 'Premium', 'Padrão')
+    return df
+
+
+def medir(funcao):
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def pico_mb(funcao):
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico / 1024 / 1024
+
+
+if __name__ == '__main__':
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    df = tabela_vendas(linhas)
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f'{linhas:,} linhas')
+        print(f'{"formato":<26} {"gravar s":>9} {"ler s":>8} {"MB":>8}')
+        caminho = os.path.join(pasta, 'referencia.xlsx')
+        gravar = medir(lambda: df.to_excel(caminho, index=False))
+        ler = medir(lambda: pd.read_excel(caminho))
+        print(f'{"xlsx (pandas.to_excel)":<26} {gravar:>9.2f} {ler:>8.2f} {os.path.getsize(caminho) / 1e6:>8.2f}')
+        for extensao in ('.xlsx', '.csv', '.parquet', '.feather', '.arrow'):
+            caminho = os.path.join(pasta, f'dados{extensao}')
+            gravar = medir(lambda: saida.gravar(df, caminho, CATEGORICAS))
+            ler = medir(lambda: saida.carregar(caminho))
+            print(f'{extensao[1:] + " (saida.py)":<26} {gravar:>9.2f} {ler:>8.2f} {os.path.getsize(caminho) / 1e6:>8.2f}')
+
+        # o carregar('.csv') com o parquet do lado atualizado le o parquet
+        saida.gravar_varios(df, [os.path.join(pasta, 'vendas.csv'), os.path.join(pasta, 'vendas.parquet')], CATEGORICAS)
+        ler_csv = medir(lambda: pd.read_csv(os.path.join(pasta, 'vendas.csv')))
+        ler_preferido = medir(lambda: saida.carregar(os.path.join(pasta, 'vendas.csv')))
+        print(f'\ncarregar("vendas.csv"): {ler_preferido:.3f}s lendo o parquet, {ler_csv:.3f}s no read_csv')
+
+        menor = df.head(min(linhas, 50_000))
+        print(f'\npico de memoria gravando {len(menor):,} linhas em Excel (tracemalloc):')
+        print(f'  pandas.to_excel    {pico_mb(lambda: menor.to_excel(os.path.join(pasta, "a.xlsx"), index=False)):>7.1f} MB')
+        print(f'  saida.gravar       {pico_mb(lambda: saida.gravar(menor, os.path.join(pasta, "b.xlsx"))):>7.1f} MB')
@@ -0,0 +1,100 @@
+# Vazão do main.py no servidor de desenvolvimento (python main.py) x servidor.py (gunicorn pre-fork)
+# Mesma carga HTTP concorrente da suite, com os dados do repositorio, e memoria (PSS) dos processos.
+# Uso: python -m benchmarks.bench_servidor [--duracao 10] [--concorrencia 8]
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.suite import RAIZ, carga_http, rotas
+
+
+def porta_livre():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def esperar_porta(porta, processo, limite=120):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError(f'servidor terminou com código {processo.returncode}')
+        try:
+            requests.get(f'http://127.0.0.1:{porta}/', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError('servidor não respondeu')
+
+
+# PSS soma a memoria compartilhada dividida entre os processos que a usam (copy-on-write incluso)
+def memoria_mb(pid):
+    pids = [pid]
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as arquivo:
+            pids += [int(filho) for filho in arquivo.read().split()]
+    except OSError:
+        pass
+    total = {'rss': 0, 'pss': 0}
+    for processo in pids:
+        try:
+            with open(f'/proc/{processo}/smaps_rollup') as arquivo:
+                for linha in arquivo:
+                    campo, valor = linha.split(':')[0].lower(), linha.split()[1:2]
+                    if campo in total:
+                        total[campo] += int(valor[0]) / 1024
+        except OSError:
+            pass
+    return len(pids), round(total['rss'], 1), round(total['pss'], 1)
+
+
+def medir(nome, comando, ambiente, pasta, args):
+    processo = subprocess.Popen(comando, cwd=pasta, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        inicio = time.perf_counter()
+        esperar_porta(ambiente['PORTA'], processo)
+        subida = time.perf_counter() - inicio
+        base = f"http://127.0.0.1:{ambiente['PORTA']}"
+        with open(os.path.join(RAIZ, 'inadimplencia.csv'), 'rb') as inad, open(os.path.join(RAIZ, 'taxa_selic.csv'), 'rb') as selic:
+            requests.post(f'{base}/upload', files={'campo_inadimplencia': inad, 'campo_selic': selic},
+                          data={'esperar': '1'}, timeout=120).raise_for_status()
+        alvos = [rota for rota in rotas('main') if rota[4]]
+        # uma passada para os caches de cada processo, depois a carga medida
+        carga_http(int(ambiente['PORTA']), alvos, args.concorrencia, 2)
+        resultado = carga_http(int(ambiente['PORTA']), alvos, args.concorrencia, args.duracao)
+        processos, rss, pss = memoria_mb(processo.pid)
+    finally:
+        processo.send_signal(signal.SIGTERM)
+        processo.wait()
+    print(f"{nome:<28} {subida:>7.1f}s {resultado['req_s']:>9.1f} {resultado['p50_ms']:>8.1f} {resultado['p95_ms']:>8.1f} "
+          f"{resultado['p99_ms']:>8.1f} {resultado['erros']:>6} {processos:>5} {rss:>8.0f} {pss:>8.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duracao', type=float, default=10)
+    parser.add_argument('--concorrencia', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f'{"servidor":<28} {"subida":>8} {"req/s":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"erros":>6} '
+          f'{"proc":>5} {"RSS MB":>8} {"PSS MB":>8}')
+    with tempfile.TemporaryDirectory() as pasta:
+        porta = str(porta_livre())
+        comum = dict(
+            os.environ, PYTHONPATH=RAIZ, PORTA=porta, DB_PATH=os.path.join(pasta, 'dados.db'),
+            ESTATICOS_DIR=os.path.join(pasta, 'estaticos'),
+        )
+        medir('app.run (python main.py)', [sys.executable, os.path.join(RAIZ, 'main.py')],
+              dict(comum, FLASK_PORT=porta), pasta, args)
+        for sufixo in ('', '-wal', '-shm'):
+            if os.path.exists(os.path.join(pasta, 'dados.db' + sufixo)):
+                os.remove(os.path.join(pasta, 'dados.db' + sufixo))
+        medir('servidor.py (gunicorn)', [sys.executable, os.path.join(RAIZ, 'servidor.py'), 'main'],
+              dict(comum, SERVIDOR_HOST='127.0.0.1', SERVIDOR_PORTA=porta), pasta, args)
@@ -0,0 +1,125 @@
+import hashlib
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Paginas falsas no mesmo formato do AdoroCinema, usadas pelos benchmarks
+PASTA_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+FILMES_POR_PAGINA = 15
+
+
+def html_listagem(pagina, filmes_por_pagina=FILMES_POR_PAGINA):
+    cards = []
+    for i in range(filmes_por_pagina):
+        filme_id = (pagina - 1) * filmes_por_pagina + i + 1
+        cards.append(f'''
+        <li class="mdl">
+          <div class="card entity-card entity-card-list cf">
+            <figure class="thumbnail"><img class="thumbnail-img" src="/img/{filme_id}.jpg" alt="Filme {filme_id}"></figure>
+            <div class="meta">
+              <h2 class="meta-title"><a class="meta-title-link" href="/filmes/filme-{filme_id}/">Filme {filme_id}</a></h2>
+              <div class="meta-body">
+                <div class="meta-body-item meta-body-info">{filme_id % 28 + 1} de janeiro de {1950 + filme_id % 70} | 2h 10min | Drama</div>
+                <div class="meta-body-item meta-body-direction">Direção: Diretor {filme_id}</div>
+              </div>
+            </div>
+            <div class="rating-holder">
+              <div class="rating-item"><span class="stareval-note">4,{filme_id % 10}</span></div>
+            </div>
+            <div class="synopsis"><div class="content-txt">{"Sinopse longa do filme. " * 20}</div></div>
+          </div>
+        </li>''')
+    # menu, rodape e scripts inflam a pagina como no site real
+    menu = ''.join(f'<li><a href="/secao/{i}/">Seção {i}</a></li>' for i in range(200))
+    return f'''<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Melhores filmes - pagina {pagina}</title>
+<script>{"var x = 1;" * 500}</script></head>
+<body><header><ul class="menu">{menu}</ul></header>
+<main><ul>{"".join(cards)}</ul></main>
+<footer>{"<p>Rodape</p>" * 100}</footer></body></html>'''
+
+
+def html_filme(filme_id):
+    menu = ''.join(f'<li><a href="/secao/{i}/">Seção {i}</a></li>' for i in range(200))
+    return f'''<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>Filme {filme_id}</title>
+<script>{"var x = 1;" * 500}</script></head>
+<body><header><ul class="menu">{menu}</ul></header>
+<main>
+  <div class="meta-body">
+    <div class="meta-body-item meta-body-info">
+      <span class="date">{1950 + filme_id % 70}</span> | 2h 10min |
+      <a href="/filmes/genero-13008/">Drama</a>, <a href="/filmes/genero-13018/">Policial</a>,
+      <a href="/filmes/genero-13025/">Suspense</a>, <a href="/filmes/genero-13001/">Ação</a>
+    </div>
+    <div class="meta-body-item meta-body-direction meta-body-oneline">
+      <span class="light">Direção:</span> <a href="/personalidades/{filme_id}/">Diretor {filme_id}</a>
+    </div>
+  </div>
+  <section class="elenco">{"<div class='card person-card'>Ator</div>" * 40}</section>
+  <section class="criticas">{"<p>Critica do filme.</p>" * 60}</section>
+</main>
+<footer>{"<p>Rodape</p>" * 100}</footer></body></html>'''
+
+
+# Carrega uma pagina salva em benchmarks/fixtures (ex.: baixada do site real) ou gera uma sintetica
+def carregar_fixture(nome, gerar):
+    caminho = os.path.join(PASTA_FIXTURES, nome)
+    if os.path.exists(caminho):
+        with open(caminho, 'rb') as arquivo:
+            return arquivo.read()
+    return gerar().encode('utf-8')
+
+
+# Servidor HTTP local que responde as listagens e paginas de filmes com uma latencia simulada
+# (com ETag, para testar as requisições condicionais)
+class ServidorFixture:
+    def __init__(self, latencia=0.05):
+        latencia_servidor = latencia
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                caminho, _, query = self.path.partition('?')
+                if caminho.startswith('/filmes/melhores/'):
+                    pagina = int(dict(p.split('=') for p in query.split('&') if '=' in p).get('page', 1))
+                    corpo = html_listagem(pagina).encode('utf-8')
+                elif caminho.startswith('/filmes/filme-'):
+                    corpo = html_filme(int(caminho.strip('/').split('-')[-1])).encode('utf-8')
+                else:
+                    self.send_error(404)
+                    return
+                time.sleep(latencia_servidor)
+                etag = '"' + hashlib.md5(corpo).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_site = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        self.base_url = self.base_site + '/filmes/melhores/'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,369 @@
+# Suite de carga dos dashboards (main.py, super_bugs.py e final02.py) com dados sinteticos.
+# Para cada app e escala: gera os CSVs (1x = os arquivos do repositorio, Nx = N vezes mais linhas),
+# popula dados.db / consumo_alcool.db, mede cada rota pelo test client do Flask e depois
+# com um gerador de carga HTTP concorrente contra o servidor de verdade. O resultado vai
+# para um JSON (com o commit) que pode ser comparado com o de outro commit.
+# Cada app/escala roda num processo separado: os caches em memoria não se misturam e o
+# pico de RSS é só daquele app.
+#
+# Uso: python -m benchmarks.suite --escalas 1 100 --saida resultados.json
+#      python -m benchmarks.suite --escalas 1 100 --comparar resultados_antes.json
+#      (--escalas 10000 gera ~2.5 milhões de linhas de selic; demora)
+import argparse
+import importlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APPS = ('main', 'super_bugs', 'final02')
+# datas entre 1700 e 2024: o super_bugs usa pd.to_datetime, que não passa de 2262
+PRIMEIRO_MES = pd.Period('1700-01', freq='M')
+ULTIMO_MES = pd.Period('2024-12', freq='M')
+
+
+# ---------------------------------------------------------------- dados sinteticos
+
+# CSV data;valor (formato do BCB) com `linhas` linhas terminando em dez/2024.
+# Mantem `por_mes` observações por mês enquanto couber no intervalo de datas; depois
+# põe mais observações em cada mês
+def gerar_serie(caminho, linhas, por_mes, inicio_valor, passo, semente):
+    gerador = np.random.default_rng(semente)
+    total_meses = ULTIMO_MES.ordinal - PRIMEIRO_MES.ordinal + 1
+    meses = min(-(-linhas // por_mes), total_meses)
+    ordinais = ULTIMO_MES.ordinal - meses + 1 + (np.arange(linhas) * meses // linhas)
+    periodos = pd.PeriodIndex.from_ordinals(ordinais, freq='M')
+    dias = 1 + (np.arange(linhas) % 28)
+    datas = [f'{d:02d}/{p.month:02d}/{p.year:04d}' for d, p in zip(dias, periodos)]
+    valores = np.round(np.abs(inicio_valor + np.cumsum(gerador.normal(0, passo, linhas))), 6)
+    pd.DataFrame({'data': datas, 'valor': valores}).to_csv(caminho, sep=';', index=False)
+
+
+def gerar_drinks(caminho, linhas, semente):
+    gerador = np.random.default_rng(semente)
+    pd.DataFrame({
+        'country': [f'Pais {i:07d}' for i in range(linhas)],
+        'beer_servings': gerador.integers(0, 400, linhas),
+        'spirit_servings': gerador.integers(0, 450, linhas),
+        'wine_servings': gerador.integers(0, 380, linhas),
+        'total_litres_of_pure_alcohol': np.round(gerador.uniform(0, 15, linhas), 1),
+    }).to_csv(caminho, index=False)
+
+
+def contar_linhas(caminho):
+    with open(caminho, 'rb') as arquivo:
+        return sum(1 for _ in arquivo) - 1
+
+
+# Gera os arquivos da escala na pasta e devolve os caminhos
+def preparar_arquivos(pasta, escala):
+    arquivos = {nome: os.path.join(pasta, nome) for nome in ('inadimplencia.csv', 'taxa_selic.csv', 'drinks.csv')}
+    if escala == 1:
+        for nome, destino in arquivos.items():
+            shutil.copy(os.path.join(RAIZ, nome), destino)
+        return arquivos
+    base = {nome: contar_linhas(os.path.join(RAIZ, nome)) for nome in arquivos}
+    gerar_serie(arquivos['inadimplencia.csv'], base['inadimplencia.csv'] * escala, 1, 3.0, 0.05, 1)
+    gerar_serie(arquivos['taxa_selic.csv'], base['taxa_selic.csv'] * escala, 21, 0.04, 0.0003, 2)
+    gerar_drinks(arquivos['drinks.csv'], base['drinks.csv'] * escala, 3)
+    return arquivos
+
+
+# ---------------------------------------------------------------- rotas de cada app
+
+# (nome, metodo, url, dados, vai para a carga HTTP)
+def rotas(app):
+    if app == 'main':
+        return [
+            ('index', 'GET', '/', None, True),
+            ('graficos', 'GET', '/graficos', None, True),
+            ('graficos_completo', 'GET', '/graficos?largura=0', None, False),
+            ('correlacao', 'GET', '/correlacao', None, True),
+            ('correlacao_movel', 'GET', '/correlacao_movel', None, True),
+            ('insights_3d', 'GET', '/insights_3d?esperar=1', None, True),
+            ('api_series', 'GET', '/api/series?name=selic', None, True),
+            ('api_correlacao', 'GET', '/api/correlacao', None, True),
+            ('consultar_form', 'GET', '/consultar', None, False),
+            ('consultar_html', 'POST', '/consultar', {'campo_tabela': 'selic'}, False),
+            ('consultar_csv', 'POST', '/consultar', {'campo_tabela': 'selic', 'formato': 'csv'}, False),
+            ('consultar_ndjson', 'GET', '/consultar?campo_tabela=inadimplencia&formato=ndjson', None, True),
+            ('metrics', 'GET', '/metrics', None, False),
+            # escrita por ultimo: invalida os caches das rotas de leitura
+            ('editar_selic', 'POST', '/editar_selic', {'campo_mes': '2024-06', 'campo_valor': '0.05'}, False),
+        ]
+    if app == 'super_bugs':
+        return [
+            ('index', 'GET', '/', None, True),
+            ('consultar_form', 'GET', '/consultar', None, False),
+            ('consultar_selic', 'POST', '/consultar', {'campo_tabela': 'selic'}, True),
+            ('consultar_inadimplencia', 'POST', '/consultar', {'campo_tabela': 'inadimplencia'}, True),
+            ('metrics', 'GET', '/metrics', None, False),
+        ]
+    return [
+        ('index', 'GET', '/', None, True),
+        ('grafico1', 'GET', '/grafico1', None, True),
+        ('grafico2', 'GET', '/grafico2', None, True),
+        ('comparar_form', 'GET', '/comparar', None, False),
+        ('comparar', 'POST', '/comparar', {'eixo_x': 'beer_servings', 'eixo_y': 'wine_servings'}, True),
+    ]
+
+
+def estatisticas(latencias, duracao=None):
+    ms = np.asarray(latencias) * 1000
+    if not len(ms):
+        return {'n': 0}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'n': int(len(ms)),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'media_ms': round(float(ms.mean()), 3),
+        'req_s': round(len(ms) / (duracao if duracao else ms.sum() / 1000), 2),
+    }
+
+
+# ---------------------------------------------------------------- processo filho (um app, uma escala)
+
+def _upload(cliente, app, arquivos):
+    abertos = [open(arquivos['inadimplencia.csv'], 'rb'), open(arquivos['taxa_selic.csv'], 'rb')]
+    try:
+        dados = {'campo_inadimplencia': (abertos[0], 'inadimplencia.csv'),
+                 'campo_selic': (abertos[1], 'taxa_selic.csv')}
+        if app == 'main':
+            dados['esperar'] = '1'
+        return cliente.post('/upload', data=dados)
+    finally:
+        for arquivo in abertos:
+            arquivo.close()
+
+
+def executar_app(app, escala, pasta, requisicoes):
+    resultado = {'app': app, 'escala': escala}
+    inicio = time.perf_counter()
+    arquivos = preparar_arquivos(pasta, escala)
+    resultado['geracao_s'] = round(time.perf_counter() - inicio, 3)
+    resultado['linhas'] = {nome: contar_linhas(caminho) for nome, caminho in arquivos.items()}
+
+    import config
+    config.DB_PATH = os.path.join(pasta, 'dados.db')
+    inicio = time.perf_counter()
+    # o final02 cria o consumo_alcool.db a partir do drinks.csv da pasta atual ao ser importado
+    modulo = importlib.import_module(app)
+    # o main.py monta o app no criar_app; sem pre-aquecimento para o frio_ms de cada rota contar os imports
+    wsgi = modulo.criar_app(aquecer=False) if hasattr(modulo, 'criar_app') else modulo.app
+    resultado['import_s'] = round(time.perf_counter() - inicio, 3)
+    if hasattr(modulo, 'init_db'):
+        modulo.init_db()
+    cliente = wsgi.test_client()
+
+    if app in ('main', 'super_bugs'):
+        inicio = time.perf_counter()
+        response = _upload(cliente, app, arquivos)
+        resultado['upload_s'] = round(time.perf_counter() - inicio, 3)
+        resultado['upload_status'] = response.status_code
+
+    resultado['rotas'] = {}
+    for nome, metodo, url, dados, _ in rotas(app):
+        inicio = time.perf_counter()
+        response = cliente.open(url, method=metodo, data=dados)
+        response.get_data()
+        frio = time.perf_counter() - inicio
+        latencias = []
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            response = cliente.open(url, method=metodo, data=dados)
+            response.get_data()
+            latencias.append(time.perf_counter() - inicio)
+        resultado['rotas'][nome] = {
+            'status': response.status_code,
+            'bytes': len(response.get_data()),
+            'frio_ms': round(frio * 1000, 3),
+            **estatisticas(latencias),
+        }
+    resultado['rss_pico_cliente_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return wsgi, resultado
+
+
+def servidor(app, escala, pasta, requisicoes):
+    import logging
+    from werkzeug.serving import make_server
+
+    flask_app, resultado = executar_app(app, escala, pasta, requisicoes)
+    with open(os.path.join(pasta, 'cliente.json'), 'w') as arquivo:
+        json.dump(resultado, arquivo)
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    http = make_server('127.0.0.1', 0, flask_app, threaded=True)
+    with open(os.path.join(pasta, 'porta.tmp'), 'w') as arquivo:
+        arquivo.write(str(http.server_port))
+    os.replace(os.path.join(pasta, 'porta.tmp'), os.path.join(pasta, 'porta'))
+    http.serve_forever()
+
+
+# ---------------------------------------------------------------- processo principal
+
+def carga_http(porta, alvos, concorrencia, duracao):
+    import requests
+
+    fim = time.perf_counter() + duracao
+    latencias = [[] for _ in range(concorrencia)]
+    erros = [0] * concorrencia
+
+    def trabalhador(i):
+        sessao = requests.Session()
+        # cada trabalhador começa numa rota diferente e segue a lista em ordem (reproduzivel)
+        j = i
+        while time.perf_counter() < fim:
+            _, metodo, url, dados, _ = alvos[j % len(alvos)]
+            j += 1
+            inicio = time.perf_counter()
+            try:
+                response = sessao.request(metodo, f'http://127.0.0.1:{porta}{url}', data=dados, timeout=120)
+                response.content
+                if response.status_code >= 400:
+                    erros[i] += 1
+                    continue
+            except requests.RequestException:
+                erros[i] += 1
+                continue
+            latencias[i].append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        list(executor.map(trabalhador, range(concorrencia)))
+    total = time.perf_counter() - inicio
+    resultado = estatisticas([x for lista in latencias for x in lista], total)
+    resultado.update(concorrencia=concorrencia, duracao_s=round(total, 2), erros=sum(erros),
+                     rotas=[nome for nome, *_ in alvos])
+    return resultado
+
+
+def pico_rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith('VmHWM:'):
+                    return round(int(linha.split()[1]) / 1024, 1)
+    except OSError:
+        return None
+    return None
+
+
+def rodar(app, escala, args):
+    pasta = tempfile.mkdtemp(prefix=f'suite-{app}-{escala}x-')
+    ambiente = dict(os.environ, PYTHONPATH=RAIZ + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    processo = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.suite', '_servidor', app, str(escala), pasta, str(args.requisicoes)],
+        cwd=pasta, env=ambiente
+    )
+    try:
+        while not os.path.exists(os.path.join(pasta, 'porta')):
+            if processo.poll() is not None:
+                raise RuntimeError(f'{app} {escala}x terminou com código {processo.returncode}')
+            time.sleep(0.2)
+        with open(os.path.join(pasta, 'cliente.json')) as arquivo:
+            resultado = json.load(arquivo)
+        with open(os.path.join(pasta, 'porta')) as arquivo:
+            porta = int(arquivo.read())
+        if args.duracao > 0:
+            alvos = [rota for rota in rotas(app) if rota[4]]
+            resultado['carga_http'] = carga_http(porta, alvos, args.concorrencia, args.duracao)
+        resultado['rss_pico_mb'] = pico_rss_mb(processo.pid)
+    finally:
+        processo.terminate()
+        processo.wait()
+        shutil.rmtree(pasta, ignore_errors=True)
+    return resultado
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def imprimir(resultado):
+    print(f"\n== {resultado['app']} {resultado['escala']}x  linhas={resultado['linhas']}  "
+          f"upload={resultado.get('upload_s', '-')}s  rss pico={resultado.get('rss_pico_mb')}MB")
+    print(f'{"rota":<26} {"frio ms":>9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"req/s":>9} {"KB":>9}')
+    for nome, r in resultado['rotas'].items():
+        print(f"{nome:<26} {r['frio_ms']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['req_s']:>9.1f} {r['bytes'] / 1024:>9.1f}")
+    carga = resultado.get('carga_http')
+    if carga and carga['n']:
+        print(f"carga HTTP ({carga['concorrencia']} conexões, {carga['duracao_s']}s): {carga['req_s']} req/s, "
+              f"p50 {carga['p50_ms']}ms, p95 {carga['p95_ms']}ms, p99 {carga['p99_ms']}ms, erros {carga['erros']}")
+
+
+# p95 de cada rota contra um resultado anterior; marca o que piorou mais que `tolerancia`
+def comparar(atual, anterior, tolerancia):
+    antes = {(r['app'], r['escala']): r for r in anterior['resultados']}
+    regressoes = 0
+    print(f"\ncomparação com {anterior.get('commit')} (p95; piora acima de {tolerancia:.0%} marcada com !)")
+    for resultado in atual['resultados']:
+        base = antes.get((resultado['app'], resultado['escala']))
+        if not base:
+            continue
+        for nome, r in resultado['rotas'].items():
+            if nome not in base['rotas'] or not base['rotas'][nome].get('p95_ms'):
+                continue
+            razao = r['p95_ms'] / base['rotas'][nome]['p95_ms']
+            marca = '!' if razao > 1 + tolerancia else ' '
+            regressoes += marca == '!'
+            print(f"{marca} {resultado['app']:<10} {resultado['escala']:>6}x {nome:<26} "
+                  f"{base['rotas'][nome]['p95_ms']:>9.2f} -> {r['p95_ms']:>9.2f} ms ({razao - 1:+.0%})")
+    return regressoes
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '_servidor':
+        _, _, app, escala, pasta, requisicoes = sys.argv
+        servidor(app, int(escala), pasta, int(requisicoes))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='Suite de carga dos dashboards Flask')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 100])
+    parser.add_argument('--apps', nargs='+', choices=APPS, default=list(APPS))
+    parser.add_argument('--requisicoes', type=int, default=20, help='requisições por rota no test client')
+    parser.add_argument('--concorrencia', type=int, default=8, help='conexões simultaneas na carga HTTP')
+    parser.add_argument('--duracao', type=float, default=10, help='segundos de carga HTTP (0 = não roda)')
+    parser.add_argument('--saida', default='resultados_suite.json')
+    parser.add_argument('--comparar', help='JSON de uma execução anterior para comparar')
+    parser.add_argument('--tolerancia', type=float, default=0.10)
+    args = parser.parse_args()
+
+    saida = {
+        'commit': commit_atual(),
+        'data': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parametros': vars(args),
+        'resultados': [],
+    }
+    for escala in args.escalas:
+        for app in args.apps:
+            resultado = rodar(app, escala, args)
+            imprimir(resultado)
+            saida['resultados'].append(resultado)
+            # grava a cada app, para não perder tudo se uma escala grande cair
+            with open(args.saida, 'w') as arquivo:
+                json.dump(saida, arquivo, indent=2, ensure_ascii=False)
+    print(f'\nresultados em {args.saida}')
+
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            regressoes = comparar(saida, json.load(arquivo), args.tolerancia)
+        sys.exit(1 if regressoes else 0)
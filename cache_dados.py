@@ -0,0 +1,106 @@
+import sqlite3
+import threading
+from collections import namedtuple
+
+import metricas
+
+# Cache em memoria das series mensais usadas pelos graficos do main.py.
+# Cada escrita no banco (upload e rotas de edição) incrementa a versão dos dados na
+# tabela versao_dados; as rotas de leitura só refazem as consultas e o merge quando
+# a versão mudou. Como a versão fica no proprio banco, vale para varios processos.
+
+DadosMensais = namedtuple('DadosMensais', ['inadimplencia', 'selic', 'merged'])
+
+
+def preparar(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS versao_dados(
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            versao INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO versao_dados (id, versao) VALUES (1, 0)')
+    # em qual versão cada mês de cada serie mudou pela ultima vez (usado pelo delta da API)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS meses_alterados(
+            serie TEXT,
+            mes TEXT,
+            versao INTEGER NOT NULL,
+            removido INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (serie, mes)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_meses_alterados_versao ON meses_alterados(serie, versao)')
+
+
+def versao_atual(conn):
+    try:
+        linha = conn.execute('SELECT versao FROM versao_dados WHERE id = 1').fetchone()
+    except sqlite3.OperationalError:
+        # banco criado antes da tabela de versão existir
+        return 0
+    return linha[0] if linha else 0
+
+
+# Chamar dentro da mesma transação que alterou os dados
+def nova_versao(conn):
+    preparar(conn)
+    conn.execute('UPDATE versao_dados SET versao = versao + 1 WHERE id = 1')
+
+
+# Marca os meses de uma serie como alterados na versão atual (chamar depois de nova_versao)
+def registrar_alteracoes(conn, serie, meses, removido=False):
+    versao = versao_atual(conn)
+    conn.executemany('''
+        INSERT INTO meses_alterados (serie, mes, versao, removido) VALUES (?, ?, ?, ?)
+        ON CONFLICT(serie, mes) DO UPDATE SET versao = excluded.versao, removido = excluded.removido
+    ''', [(serie, mes, versao, int(removido)) for mes in meses])
+
+
+class CacheVersionado:
+    def __init__(self):
+        self._itens = {}
+        self._lock = threading.Lock()
+
+    # Devolve o valor guardado para `nome` se foi calculado na versão atual dos dados,
+    # senão chama calcular(conn) e guarda o resultado
+    def obter(self, nome, calcular, conn):
+        versao = versao_atual(conn)
+        with self._lock:
+            item = self._itens.get(nome)
+        if item and item[0] == versao:
+            return item[1]
+        valor = calcular(conn)
+        with self._lock:
+            self._itens[nome] = (versao, valor)
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+
+cache = CacheVersionado()
+
+
+def _carregar_dados_mensais(conn):
+    # pandas só quando alguém precisa dos dados (o main.py sobe sem ele)
+    import pandas as pd
+
+    with metricas.etapa('db_read'):
+        inad_df = pd.read_sql_query('SELECT * FROM inadimplencia', conn)
+        selic_df = pd.read_sql_query('SELECT * FROM selic', conn)
+
+    with metricas.etapa('merge'):
+        # merge (unir as duas tabelas de dados), já ordenado e com as colunas derivadas
+        merged = pd.merge(inad_df, selic_df, on='mes').sort_values('mes').reset_index(drop=True)
+        merged['mes_idx'] = range(len(merged))
+        # Derivadas Discretas (diferença mês a mês)
+        merged['var_inad'] = merged['inadimplencia'].diff().fillna(0)
+        merged['var_selic'] = merged['selic_diaria'].diff().fillna(0)
+    return DadosMensais(inad_df, selic_df, merged)
+
+
+# Os DataFrames são compartilhados entre as requisições: não alterar, usar .copy() antes
+def dados_mensais(conn):
+    return cache.obter('dados_mensais', _carregar_dados_mensais, conn)
@@ -0,0 +1,117 @@
+import json
+import sqlite3
+import threading
+import time
+
+import config
+
+
+# Cache em disco das respostas HTTP, guardado em SQLite e indexado pela URL.
+# Guarda ETag/Last-Modified para revalidar com requisições condicionais (304 Not Modified)
+# e, junto, os dados já extraídos da pagina para não precisar parsear de novo o que não mudou.
+class CacheHTTP:
+    def __init__(self, caminho=config.CACHE_HTTP_PATH, ttl=config.CACHE_HTTP_TTL,
+                 tamanho_maximo=config.CACHE_HTTP_TAMANHO_MAXIMO):
+        self.ttl = ttl
+        self.tamanho_maximo = tamanho_maximo
+        self.estatisticas = {'baixadas': 0, 'revalidadas': 0}
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(caminho, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS respostas(
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                encoding TEXT,
+                corpo BLOB,
+                dados TEXT,
+                tamanho INTEGER,
+                armazenado_em REAL,
+                acessado_em REAL
+            )
+        ''')
+        self.conn.commit()
+
+    # Cabeçalhos If-None-Match / If-Modified-Since para a proxima requisição da URL
+    def cabecalhos_condicionais(self, url):
+        with self.lock:
+            linha = self.conn.execute(
+                'SELECT etag, last_modified, armazenado_em FROM respostas WHERE url = ?', (url,)
+            ).fetchone()
+        if not linha:
+            return {}
+        etag, last_modified, armazenado_em = linha
+        # entrada vencida é tratada como se não existisse
+        if self.ttl and time.time() - armazenado_em > self.ttl:
+            return {}
+        cabecalhos = {}
+        if etag:
+            cabecalhos['If-None-Match'] = etag
+        if last_modified:
+            cabecalhos['If-Modified-Since'] = last_modified
+        return cabecalhos
+
+    def salvar(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        # sem validadores não tem como revalidar, então nem vale guardar
+        if not etag and not last_modified:
+            return
+        agora = time.time()
+        corpo = response.content
+        with self.lock:
+            self.conn.execute('''
+                INSERT OR REPLACE INTO respostas
+                    (url, etag, last_modified, encoding, corpo, dados, tamanho, armazenado_em, acessado_em)
+                VALUES (?, ?, ?, ?, ?, NULL, ?, ?, ?)
+            ''', (url, etag, last_modified, response.encoding, corpo, len(corpo), agora, agora))
+            self.conn.commit()
+            self.estatisticas['baixadas'] += 1
+
+    # Servidor respondeu 304: renova a entrada e devolve (corpo, encoding)
+    def revalidar(self, url):
+        agora = time.time()
+        with self.lock:
+            self.conn.execute(
+                'UPDATE respostas SET armazenado_em = ?, acessado_em = ? WHERE url = ?', (agora, agora, url)
+            )
+            self.conn.commit()
+            linha = self.conn.execute('SELECT corpo, encoding FROM respostas WHERE url = ?', (url,)).fetchone()
+            self.estatisticas['revalidadas'] += 1
+        return linha
+
+    def obter_dados(self, url):
+        with self.lock:
+            linha = self.conn.execute('SELECT dados FROM respostas WHERE url = ?', (url,)).fetchone()
+        return json.loads(linha[0]) if linha and linha[0] else None
+
+    def salvar_dados(self, url, dados):
+        with self.lock:
+            self.conn.execute(
+                'UPDATE respostas SET dados = ? WHERE url = ?', (json.dumps(dados, ensure_ascii=False), url)
+            )
+            self.conn.commit()
+
+    # Remove as entradas vencidas pelo TTL e, se passar do tamanho maximo,
+    # as menos acessadas recentemente (LRU)
+    def limpar(self):
+        with self.lock:
+            removidas = 0
+            if self.ttl:
+                removidas += self.conn.execute(
+                    'DELETE FROM respostas WHERE armazenado_em < ?', (time.time() - self.ttl,)
+                ).rowcount
+            if self.tamanho_maximo:
+                removidas += self.conn.execute('''
+                    DELETE FROM respostas WHERE url IN (
+                        SELECT url FROM (
+                            SELECT url, SUM(tamanho) OVER (ORDER BY acessado_em DESC, url) AS acumulado
+                            FROM respostas
+                        ) WHERE acumulado > ?
+                    )
+                ''', (self.tamanho_maximo,)).rowcount
+            self.conn.commit()
+        return removidas
+
+    def fechar(self):
+        self.conn.close()
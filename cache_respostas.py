@@ -0,0 +1,98 @@
+import functools
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+
+from flask import Response, request
+
+import banco
+import cache_dados
+import config
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional, sem ele só gzip
+    brotli = None
+
+# Cache do HTML já renderizado das rotas de graficos, por rota + versão dos dados.
+# Guarda o corpo pronto (e as versões comprimidas) e responde com ETag/Last-Modified,
+# então um navegador que já tem a pagina recebe só um 304.
+# Entradas de versões antigas dos dados saem quando a versão muda, e no maximo
+# CACHE_RESPOSTAS_MAX_ENTRADAS ficam guardadas (as usadas há mais tempo saem primeiro).
+
+Entrada = namedtuple('Entrada', ['versao', 'etag', 'modificado_em', 'corpos'])
+
+_entradas = OrderedDict()
+_lock = threading.Lock()
+
+
+def _comprimir(corpo):
+    corpos = {'identity': corpo, 'gzip': gzip.compress(corpo, compresslevel=6)}
+    if brotli:
+        corpos['br'] = brotli.compress(corpo, quality=5)
+    return corpos
+
+
+def _escolher_encoding(entrada):
+    for encoding in ('br', 'gzip'):
+        if encoding in entrada.corpos and encoding in request.accept_encodings:
+            return encoding
+    return 'identity'
+
+
+def limpar():
+    with _lock:
+        _entradas.clear()
+
+
+def _guardar(chave, entrada):
+    with _lock:
+        # o que é de outra versão dos dados não vai ser servido de novo
+        for antiga in [c for c, e in _entradas.items() if e.versao != entrada.versao]:
+            del _entradas[antiga]
+        _entradas[chave] = entrada
+        _entradas.move_to_end(chave)
+        while len(_entradas) > config.CACHE_RESPOSTAS_MAX_ENTRADAS:
+            _entradas.popitem(last=False)
+
+
+# `parametros`: função que recebe o request.args e devolve os valores, já convertidos como a
+# view os usa, que mudam a pagina (ex.: lambda args: (args.get('largura', 1000, type=int),)).
+# A chave é feita desses valores e não do texto da URL, então ?largura=024, ?largura=+24 e
+# ?largura=24&x= são a mesma entrada. A view deve recusar valores invalidos com uma tupla,
+# que não é guardada
+def resposta_em_cache(nome, parametros=None):
+    def decorador(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with banco.conectar() as conn:
+                versao = cache_dados.versao_atual(conn)
+            chave = (nome, parametros(request.args) if parametros else ())
+            with _lock:
+                entrada = _entradas.get(chave)
+                if entrada:
+                    _entradas.move_to_end(chave)
+            if not entrada or entrada.versao != versao:
+                html = view(*args, **kwargs)
+                if not isinstance(html, str):
+                    return html
+                corpo = html.encode('utf-8')
+                etag = f'{nome}-{versao}-{hashlib.md5(corpo).hexdigest()[:12]}'
+                entrada = Entrada(versao, etag, datetime.now(timezone.utc).replace(microsecond=0), _comprimir(corpo))
+                _guardar(chave, entrada)
+
+            encoding = _escolher_encoding(entrada)
+            response = Response(entrada.corpos[encoding], mimetype='text/html')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+            response.headers['Vary'] = 'Accept-Encoding'
+            # cada encoding tem seu proprio ETag, já que os bytes são diferentes
+            response.set_etag(entrada.etag if encoding == 'identity' else f'{entrada.etag}-{encoding}')
+            response.last_modified = entrada.modificado_em
+            # o navegador pode guardar, mas sempre confirma com o servidor (que responde 304)
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        return wrapper
+    return decorador
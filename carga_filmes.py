@@ -0,0 +1,145 @@
+import hashlib
+import time
+
+DB_FILMES = 'filmes_adorocinema.db'
+COLUNAS = ('titulo', 'direcao', 'nota', 'link', 'ano', 'categoria')
+TAMANHO_LOTE = 500
+
+
+# Cria as tabelas e migra bancos antigos: remove os filmes duplicados pelo link,
+# cria o indice unico em link e as colunas de controle da carga incremental
+def preparar_banco(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS filmes(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            titulo TEXT,
+            direcao TEXT,
+            nota REAL,
+            link TEXT,
+            ano TEXT,
+            categoria TEXT
+        )
+    ''')
+    colunas = [linha[1] for linha in conn.execute('PRAGMA table_info(filmes)')]
+    if 'hash_conteudo' not in colunas:
+        conn.execute('ALTER TABLE filmes ADD COLUMN hash_conteudo TEXT')
+    if 'carga_id' not in colunas:
+        conn.execute('ALTER TABLE filmes ADD COLUMN carga_id INTEGER')
+    # cada execução registra uma carga (marca d'agua); filmes.carga_id diz em qual carga o filme mudou
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS cargas(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            iniciada_em TEXT,
+            concluida_em TEXT,
+            inseridos INTEGER,
+            atualizados INTEGER,
+            ignorados INTEGER
+        )
+    ''')
+    conn.execute('DELETE FROM filmes WHERE id NOT IN (SELECT MAX(id) FROM filmes GROUP BY link)')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS ux_filmes_link ON filmes(link)')
+    conn.commit()
+
+
+# Converte o dicionario do scraper para a linha da tabela (na ordem de COLUNAS)
+def linha_do_filme(filme):
+    return (
+        filme['Titulo'],
+        filme['Direção'],
+        float(filme['Nota']) if filme['Nota'] != 'N/A' else None,
+        filme['Link'],
+        filme['Ano'],
+        filme['Categoria']
+    )
+
+
+def hash_linha(linha):
+    return hashlib.sha1(repr(linha).encode('utf-8')).hexdigest()
+
+
+def _hashes_existentes(conn, links):
+    existentes = {}
+    for i in range(0, len(links), TAMANHO_LOTE):
+        lote = links[i:i + TAMANHO_LOTE]
+        marcadores = ', '.join('?' * len(lote))
+        existentes.update(conn.execute(
+            f'SELECT link, hash_conteudo FROM filmes WHERE link IN ({marcadores})', lote
+        ).fetchall())
+    return existentes
+
+
+# Uma carga por execução da coleta (a marca d'agua): abrir_carga no inicio, os lotes gravados
+# com carregar_filmes(..., carga_id) e fechar_carga com a soma das contagens no fim
+def abrir_carga(conn):
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO cargas (iniciada_em) VALUES (strftime('%Y-%m-%d %H:%M:%f', 'now'))"
+        )
+    return cursor.lastrowid
+
+
+def fechar_carga(conn, carga_id, contagem):
+    with conn:
+        conn.execute('''
+            UPDATE cargas SET concluida_em = strftime('%Y-%m-%d %H:%M:%f', 'now'),
+                inseridos = ?, atualizados = ?, ignorados = ?
+            WHERE id = ?
+        ''', (contagem['inseridos'], contagem['atualizados'], contagem['ignorados'], carga_id))
+
+
+# Grava os filmes usando o link como chave natural: insere os novos, atualiza os que mudaram
+# e ignora os que estão iguais à ultima carga. Tudo em uma unica transação.
+# Sem carga_id o lote é uma carga inteira (abre, grava e fecha); com carga_id é um lote de
+# uma carga aberta com abrir_carga, e quem chamou fecha no fim
+def carregar_filmes(conn, filmes, carga_id=None):
+    inicio = time.perf_counter()
+    carga_propria = carga_id is None
+    if carga_propria:
+        carga_id = abrir_carga(conn)
+    contagem = {'inseridos': 0, 'atualizados': 0, 'ignorados': 0}
+
+    linhas = {}
+    for filme in filmes:
+        try:
+            linha = linha_do_filme(filme)
+        except Exception as e:
+            print(f"Erro ao preparar filme {filme.get('Titulo')} para o banco de dados. Erro: {e}")
+            continue
+        linhas[linha[3]] = linha
+
+    with conn:
+        existentes = _hashes_existentes(conn, list(linhas))
+        leitura = time.perf_counter() - inicio
+
+        gravar = []
+        for link, linha in linhas.items():
+            hash_atual = hash_linha(linha)
+            if link not in existentes:
+                contagem['inseridos'] += 1
+            elif existentes[link] != hash_atual:
+                contagem['atualizados'] += 1
+            else:
+                contagem['ignorados'] += 1
+                continue
+            gravar.append(linha + (hash_atual, carga_id))
+
+        for i in range(0, len(gravar), TAMANHO_LOTE):
+            conn.executemany(f'''
+                INSERT INTO filmes ({', '.join(COLUNAS)}, hash_conteudo, carga_id)
+                VALUES ({', '.join('?' * (len(COLUNAS) + 2))})
+                ON CONFLICT(link) DO UPDATE SET
+                    titulo = excluded.titulo,
+                    direcao = excluded.direcao,
+                    nota = excluded.nota,
+                    ano = excluded.ano,
+                    categoria = excluded.categoria,
+                    hash_conteudo = excluded.hash_conteudo,
+                    carga_id = excluded.carga_id
+            ''', gravar[i:i + TAMANHO_LOTE])
+
+    if carga_propria:
+        fechar_carga(conn, carga_id, contagem)
+        total = time.perf_counter() - inicio
+        print(f"Carga {carga_id}: {contagem['inseridos']} inseridos, {contagem['atualizados']} atualizados, "
+              f"{contagem['ignorados']} sem alteração (leitura {leitura * 1000:.1f} ms, total {total * 1000:.1f} ms)")
+    return contagem
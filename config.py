@@ -1,3 +1,92 @@
 # Principais configurações do nosso sistema
+# Qualquer uma pode ser trocada por uma variavel de ambiente com o mesmo nome, por exemplo
+#   DB_PATH=/dados/economia.db SERVIDOR_WORKERS=4 python servidor.py
+# (o tipo vem do valor padrão; booleanos aceitam 1/0, true/false, sim/nao)
+import os
 
-DB_PATH = 'dados.db'
\ No newline at end of file
+DB_PATH = 'dados.db'
+
+# Servidor de desenvolvimento do Flask (app.run no fim dos apps)
+FLASK_HOST = '127.0.0.1'
+FLASK_PORT = 5000
+FLASK_DEBUG = True
+FLASK_THREADED = True
+FLASK_USER_RELOADER = False
+
+# Servidor de produção pre-fork com gunicorn (servidor.py)
+SERVIDOR_HOST = '0.0.0.0'
+SERVIDOR_PORTA = 8000
+SERVIDOR_WORKERS = 0  # processos; 0 = um por nucleo disponivel
+SERVIDOR_THREADS = 4  # threads por worker
+SERVIDOR_BACKLOG = 2048  # conexões esperando accept
+SERVIDOR_KEEPALIVE = 5  # segundos que uma conexão ociosa fica aberta para a proxima requisição
+SERVIDOR_TIMEOUT = 120  # worker sem responder por mais que isso é reiniciado pelo mestre
+SERVIDOR_LOG_ACESSO = False  # uma linha por requisição no stdout
+
+# Pool de conexões do SQLite (banco.py)
+SQLITE_POOL_TAMANHO = 8  # conexões livres guardadas por banco
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # bytes
+SQLITE_CACHE_KB = 32 * 1024  # cache de paginas por conexão
+SQLITE_STATEMENTS_EM_CACHE = 256  # statements preparados guardados por conexão
+
+# Threads da fila de tarefas em segundo plano (upload e graficos pesados)
+TAREFAS_WORKERS = 2
+TAREFAS_RETENCAO_HORAS = 24  # tarefas terminadas (e o HTML do resultado) são apagadas depois disso
+
+# main.py: importar numpy/pandas/plotly/sklearn numa thread logo depois de subir o app,
+# em vez de esperar a primeira rota que precisa deles
+PRE_AQUECER = True
+
+# Modelos do /insights_3d (modelos.py): quando refazer o ajuste completo em vez de só incorporar os meses novos
+MODELOS_LIMITE_DRIFT = 3.0  # distancia media dos meses novos aos centroides, em relação à do ultimo ajuste
+MODELOS_FRACAO_REAJUSTE = 0.5  # meses incorporados desde o ultimo ajuste, em relação ao total
+
+# HTML das rotas de graficos guardado em memoria (cache_respostas.py)
+CACHE_RESPOSTAS_MAX_ENTRADAS = 64  # combinações de rota + parametros; as menos usadas saem primeiro
+
+# Metricas /metrics e perfil por requisição (metricas.py)
+METRICAS_PERFIL_HABILITADO = False  # ligar só onde o cabeçalho não pode vir de fora
+METRICAS_HEADER_PERFIL = 'X-Profile'
+METRICAS_PERFIL_DIR = 'perfis'
+
+# Pasta onde o plotly.min.js (e as versões comprimidas) é publicado (estaticos.py)
+ESTATICOS_DIR = 'estaticos_gerados'
+
+# Graficos do main.py (decimacao.py)
+GRAFICOS_LARGURA_PX = 1000  # largura assumida quando a pagina não manda ?largura=
+GRAFICOS_PONTOS_POR_PIXEL = 1.0  # pontos mantidos por pixel de largura
+GRAFICOS_DECIMACAO = 'lttb'  # 'lttb' ou 'minmax'
+GRAFICOS_LIMIAR_WEBGL = 5000  # acima disso o trace vira Scattergl
+GRAFICOS_LIMIAR_MARCADORES = 500  # acima disso só linha, sem marcadores
+
+# Consolidação de planilhas Excel (consolidacao.py)
+CONSOLIDACAO_CACHE_DIR = 'cache_planilhas'  # abas já lidas, em parquet
+CONSOLIDACAO_PROCESSOS = 0  # processos lendo planilhas; 0 = um por nucleo disponivel
+# formatos gravados pelo 02_importacao.py: parquet, feather, arrow, csv, xlsx
+# (pelo ambiente separados por virgula: SAIDA_FORMATOS=parquet,csv)
+SAIDA_FORMATOS = ('parquet', 'csv', 'xlsx')
+
+# Cache HTTP do scraper (05_webscrapping.py)
+CACHE_HTTP_PATH = 'cache_http.db'
+CACHE_HTTP_TTL = 7 * 24 * 3600  # segundos
+CACHE_HTTP_TAMANHO_MAXIMO = 200 * 1024 * 1024  # bytes
+
+
+def _do_ambiente(nome, padrao):
+    valor = os.environ[nome]
+    if isinstance(padrao, bool):
+        if valor.strip().lower() in ('1', 'true', 'sim', 'yes', 'on'):
+            return True
+        if valor.strip().lower() in ('0', 'false', 'nao', 'não', 'no', 'off', ''):
+            return False
+        raise ValueError(f'{nome}={valor!r} não é um booleano')
+    if isinstance(padrao, (int, float)):
+        return type(padrao)(valor)
+    if isinstance(padrao, (list, tuple)):
+        return type(padrao)(item.strip() for item in valor.split(',') if item.strip())
+    return valor
+
+
+for _nome, _padrao in list(globals().items()):
+    if _nome.isupper() and _nome in os.environ:
+        globals()[_nome] = _do_ambiente(_nome, _padrao)
\ No newline at end of file
@@ -0,0 +1,233 @@
+import fnmatch
+import glob
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import config
+import esquemas
+
+try:
+    import pyarrow
+except ImportError:  # pyarrow é opcional, sem ele não há cache e toda planilha é lida de novo
+    pyarrow = None
+
+# Consolidação de varias planilhas Excel (ex.: as planilhas regionais do fechamento do mês)
+# numa tabela só. Cada arquivo é lido num processo do pool (o openpyxl é puro Python e
+# usa um nucleo inteiro por arquivo) e cada aba lida vai para um parquet em
+# CONSOLIDACAO_CACHE_DIR, com o hash do conteudo do arquivo e as opções de leitura no nome.
+# Arquivos que não mudaram não são lidos de novo: o hash só é recalculado quando o mtime
+# ou o tamanho mudam, e as abas vêm direto do parquet.
+#
+# Com esquema= (um nome do esquemas.py) as abas são lidas sem cabeçalho e cada uma passa pelo
+# esquemas.normalizar antes do concat: linha de cabeçalho achada onde estiver, aba sem
+# cabeçalho recusada, a não ser que case com abas_sem_cabecalho (aí as colunas vão pela
+# posição), colunas com os nomes e tipos canonicos, e aba fora do esquema recusada com
+# ValueError. O cache guarda a aba crua, então mudar o esquema não o invalida.
+#
+# Uso: df = consolidacao.consolidar('regionais/**/*.xlsx', ['Relatório de Vendas*'], esquema='vendas')
+#      (as colunas _arquivo e _aba dizem de onde veio cada linha; df.attrs['consolidacao'] tem o resumo)
+
+COLUNA_ARQUIVO = '_arquivo'
+COLUNA_ABA = '_aba'
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+
+def listar_arquivos(padroes):
+    if isinstance(padroes, str):
+        padroes = [padroes]
+    arquivos = {}
+    for padrao in padroes:
+        for caminho in glob.glob(padrao, recursive=True):
+            # ~$planilha.xlsx é o arquivo de trava do Excel aberto, não uma planilha
+            if not os.path.basename(caminho).startswith('~$'):
+                arquivos.setdefault(os.path.abspath(caminho), os.path.normpath(caminho))
+    return sorted(arquivos.values())
+
+
+def hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO_HASH), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+# Abas que casam com algum dos padrões (fnmatch), na ordem da planilha
+def selecionar_abas(abas, padroes):
+    return [aba for aba in abas if any(fnmatch.fnmatchcase(aba, padrao) for padrao in padroes)]
+
+
+class CachePlanilhas:
+    # indice.json guarda
+    #   'arquivos': caminho -> [mtime_ns, tamanho, hash]
+    #   'leituras': hash-opções -> {'abas': todas as abas, 'lidas': {aba: {'parquet', 'colunas', 'linhas'}}}
+    def __init__(self, pasta):
+        self.pasta = pasta
+        os.makedirs(pasta, exist_ok=True)
+        try:
+            with open(os.path.join(pasta, 'indice.json'), encoding='utf-8') as arquivo:
+                self.indice = json.load(arquivo)
+        except (OSError, ValueError):
+            self.indice = {'arquivos': {}, 'leituras': {}}
+
+    def chave(self, caminho, opcoes):
+        info = os.stat(caminho)
+        absoluto = os.path.abspath(caminho)
+        conhecido = self.indice['arquivos'].get(absoluto)
+        if conhecido and conhecido[:2] == [info.st_mtime_ns, info.st_size]:
+            sha = conhecido[2]
+        else:
+            sha = hash_arquivo(caminho)
+            self.indice['arquivos'][absoluto] = [info.st_mtime_ns, info.st_size, sha]
+        texto_opcoes = json.dumps(opcoes, sort_keys=True, default=str)
+        return f'{sha[:32]}-{hashlib.sha256(texto_opcoes.encode()).hexdigest()[:8]}'
+
+    # A leitura guardada, se ela tem todas as abas pedidas e os parquets ainda existem
+    def leitura(self, chave, padroes_abas):
+        leitura = self.indice['leituras'].get(chave)
+        if not leitura:
+            return None
+        for aba in selecionar_abas(leitura['abas'], padroes_abas):
+            lida = leitura['lidas'].get(aba)
+            if not lida or not os.path.exists(os.path.join(self.pasta, lida['parquet'])):
+                return None
+        return leitura
+
+    def guardar(self, chave, abas, lidas):
+        leitura = self.indice['leituras'].setdefault(chave, {'abas': abas, 'lidas': {}})
+        leitura['abas'] = abas
+        leitura['lidas'].update(lidas)
+        self._podar()
+
+    # Leituras de conteudos que nenhum arquivo conhecido tem mais (a planilha mudou):
+    # saem do indice e os parquets delas são apagados
+    def _podar(self):
+        vivos = {sha[:32] for _, _, sha in self.indice['arquivos'].values()}
+        for chave in [chave for chave in self.indice['leituras'] if chave.split('-')[0] not in vivos]:
+            for lida in self.indice['leituras'].pop(chave)['lidas'].values():
+                try:
+                    os.remove(os.path.join(self.pasta, lida['parquet']))
+                except FileNotFoundError:
+                    pass
+
+    def ler(self, lida):
+        df = pd.read_parquet(os.path.join(self.pasta, lida['parquet']))
+        df.columns = lida['colunas']
+        return df
+
+    def salvar(self):
+        temporario = os.path.join(self.pasta, f'indice.json.{os.getpid()}.tmp')
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.indice, arquivo, ensure_ascii=False)
+        os.replace(temporario, os.path.join(self.pasta, 'indice.json'))
+
+
+# Colunas com valores de tipos diferentes (numero e texto misturados na mesma coluna) viram
+# texto: o parquet precisa de um tipo por coluna. Roda com e sem cache, então o resultado
+# é o mesmo nos dois casos
+def _uniformizar(df):
+    for coluna in range(df.shape[1]):
+        serie = df.iloc[:, coluna]
+        if serie.dtype == object and serie.dropna().map(type).nunique() > 1:
+            df.isetitem(coluna, serie.map(lambda valor: valor if isinstance(valor, str) or pd.isna(valor) else str(valor)))
+    return df
+
+
+# Grava a aba em parquet (nomes de coluna viram posições, os originais vão no indice)
+def _gravar_parquet(df, pasta, chave, aba):
+    nome = f'{chave}-{hashlib.sha256(aba.encode()).hexdigest()[:12]}.parquet'
+    tabela = df.set_axis([str(i) for i in range(df.shape[1])], axis=1)
+    temporario = os.path.join(pasta, f'{nome}.{os.getpid()}.tmp')
+    tabela.to_parquet(temporario, index=False)
+    os.replace(temporario, os.path.join(pasta, nome))
+    colunas = [coluna if isinstance(coluna, (str, int, float)) else str(coluna) for coluna in df.columns]
+    return {'parquet': nome, 'colunas': colunas, 'linhas': len(df)}
+
+
+# Le as abas de um arquivo (roda nos processos do pool). Com cache devolve só onde gravou
+# cada aba, para não mandar os DataFrames de volta pelo pickle
+def _ler_arquivo(caminho, padroes_abas, opcoes, pasta_cache, chave):
+    with pd.ExcelFile(caminho) as planilha:
+        abas = planilha.sheet_names
+        lidas = {}
+        for aba in selecionar_abas(abas, padroes_abas):
+            df = _uniformizar(planilha.parse(aba, **opcoes))
+            lidas[aba] = _gravar_parquet(df, pasta_cache, chave, aba) if pasta_cache else df
+    return abas, lidas
+
+
+def _numero_de_processos(processos, pendentes):
+    if not processos:
+        processos = config.CONSOLIDACAO_PROCESSOS
+    if not processos:
+        # nucleos que este processo pode usar (respeita taskset/cgroup)
+        processos = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    return max(1, min(processos, pendentes))
+
+
+# Junta as abas (padrões fnmatch) de todas as planilhas do glob. `opcoes` vão para o
+# pd.read_excel de cada aba (header, skiprows, dtype...) e fazem parte da chave do cache.
+def consolidar(padroes, abas=('*',), processos=None, usar_cache=True, esquema=None, abas_sem_cabecalho=(), **opcoes):
+    if isinstance(abas, str):
+        abas = [abas]
+    if isinstance(abas_sem_cabecalho, str):
+        abas_sem_cabecalho = [abas_sem_cabecalho]
+    if esquema:
+        # o normalizar acha o cabeçalho sozinho
+        opcoes = {'header': None, **opcoes}
+    arquivos = listar_arquivos(padroes)
+    if not arquivos:
+        raise FileNotFoundError(f'Nenhuma planilha encontrada em {padroes}')
+
+    cache = CachePlanilhas(config.CONSOLIDACAO_CACHE_DIR) if usar_cache and pyarrow else None
+    leituras = {}
+    pendentes = []
+    for caminho in arquivos:
+        chave = cache.chave(caminho, opcoes) if cache else None
+        leitura = cache.leitura(chave, abas) if cache else None
+        if leitura:
+            leituras[caminho] = (leitura['abas'], leitura['lidas'])
+        else:
+            pendentes.append((caminho, chave))
+
+    # os maiores primeiro, para o ultimo processo não ficar sozinho com o arquivo mais pesado
+    pendentes.sort(key=lambda item: os.path.getsize(item[0]), reverse=True)
+    pasta_cache = cache.pasta if cache else None
+    processos = _numero_de_processos(processos, len(pendentes))
+    if processos == 1:
+        resultados = [_ler_arquivo(caminho, abas, opcoes, pasta_cache, chave) for caminho, chave in pendentes]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = [executor.submit(_ler_arquivo, caminho, abas, opcoes, pasta_cache, chave) for caminho, chave in pendentes]
+            resultados = [futuro.result() for futuro in futuros]
+    for (caminho, chave), (todas, lidas) in zip(pendentes, resultados):
+        leituras[caminho] = (todas, lidas)
+        if cache:
+            cache.guardar(chave, todas, lidas)
+    if cache:
+        cache.salvar()
+
+    partes = []
+    for caminho in arquivos:
+        todas, lidas = leituras[caminho]
+        for aba in selecionar_abas(todas, abas):
+            df = cache.ler(lidas[aba]) if cache else lidas[aba]
+            if esquema:
+                sem_cabecalho = bool(selecionar_abas([aba], abas_sem_cabecalho))
+                df = esquemas.normalizar(df, esquema, f'{caminho} / {aba}', sem_cabecalho)
+            partes.append(df.assign(**{COLUNA_ARQUIVO: caminho, COLUNA_ABA: aba}))
+    consolidado = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=[COLUNA_ARQUIVO, COLUNA_ABA])
+    if esquema:
+        consolidado = esquemas.tipar(consolidado, esquema)
+    consolidado.attrs['consolidacao'] = {
+        'arquivos': len(arquivos),
+        'lidos': len(pendentes),
+        'do_cache': len(arquivos) - len(pendentes),
+        'abas': len(partes),
+        'processos': processos if pendentes else 0,
+    }
+    return consolidado
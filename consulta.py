@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+from flask import Response
+from markupsafe import escape
+
+import banco
+
+# Consulta das tabelas em streaming: as linhas saem do cursor do SQLite em blocos e vão
+# direto para a resposta, sem montar DataFrame nem a tabela inteira em memoria.
+# A paginação é por chave (keyset) em `mes`: a proxima pagina começa depois do ultimo
+# mês da anterior, então o custo não cresce com o numero da pagina.
+
+TAMANHO_BLOCO = 500
+FORMATOS = ('html', 'csv', 'ndjson')
+
+
+def _consultar(tabela, depois=None, limite=None):
+    conn = banco.pool().emprestar()
+    sql = f'SELECT * FROM {tabela}'
+    parametros = []
+    if depois:
+        sql += ' WHERE mes > ?'
+        parametros.append(depois)
+    sql += ' ORDER BY mes'
+    if limite:
+        sql += ' LIMIT ?'
+        parametros.append(limite)
+    try:
+        cursor = conn.execute(sql, parametros)
+    except Exception:
+        banco.pool().devolver(conn)
+        raise
+    devolvida = []
+
+    # Devolve a conexão ao pool uma vez só: chamada no fim da leitura e no close da resposta,
+    # que o servidor chama mesmo se o corpo nunca for lido (HEAD, cliente que desconectou antes)
+    def liberar():
+        if not devolvida:
+            devolvida.append(True)
+            cursor.close()
+            banco.pool().devolver(conn)
+
+    return cursor, [coluna[0] for coluna in cursor.description], liberar
+
+
+def _blocos(cursor, liberar):
+    try:
+        while True:
+            bloco = cursor.fetchmany(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            yield bloco
+    finally:
+        liberar()
+
+
+def _csv(cursor, liberar, colunas):
+    saida = io.StringIO()
+    writer = csv.writer(saida)
+    writer.writerow(colunas)
+    for bloco in _blocos(cursor, liberar):
+        writer.writerows(bloco)
+        yield saida.getvalue()
+        saida.seek(0)
+        saida.truncate(0)
+    if saida.tell():
+        yield saida.getvalue()
+
+
+def _ndjson(cursor, liberar, colunas):
+    for bloco in _blocos(cursor, liberar):
+        yield ''.join(json.dumps(dict(zip(colunas, linha))) + '\n' for linha in bloco)
+
+
+# Mesmo formato da tabela do df.to_html, mais o link para a proxima pagina
+def _html(cursor, liberar, colunas, url_proxima, limite):
+    cabecalho = ''.join(f'<th>{escape(coluna)}</th>' for coluna in colunas)
+    yield f'<table border="1" class="dataframe">\n<thead><tr style="text-align: right;">{cabecalho}</tr></thead>\n<tbody>\n'
+    total = 0
+    ultimo_mes = None
+    posicao_mes = colunas.index('mes')
+    for bloco in _blocos(cursor, liberar):
+        yield ''.join(
+            '<tr>' + ''.join(f'<td>{escape(valor)}</td>' for valor in linha) + '</tr>\n' for linha in bloco
+        )
+        total += len(bloco)
+        ultimo_mes = bloco[-1][posicao_mes]
+    yield '</tbody>\n</table>\n'
+    # pagina cheia: pode ter mais linhas depois do ultimo mês
+    if limite and total == limite:
+        yield f"<br><a href='{escape(url_proxima)}&amp;depois={escape(ultimo_mes)}'>Próxima página</a>"
+    yield "<br><a href='/consultar'>Voltar</a>"
+
+
+def resposta_em_stream(tabela, formato='html', depois=None, limite=None, url_proxima=''):
+    cursor, colunas, liberar = _consultar(tabela, depois, limite)
+    if formato == 'csv':
+        response = Response(_csv(cursor, liberar, colunas), mimetype='text/csv',
+                            headers={'Content-Disposition': f'attachment; filename={tabela}.csv'})
+    elif formato == 'ndjson':
+        response = Response(_ndjson(cursor, liberar, colunas), mimetype='application/x-ndjson')
+    else:
+        response = Response(_html(cursor, liberar, colunas, url_proxima, limite), mimetype='text/html')
+    response.call_on_close(liberar)
+    return response
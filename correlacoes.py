@@ -0,0 +1,122 @@
+import numpy as np
+
+# Correlações moveis e defasadas entre duas series mensais, vetorizadas com somas acumuladas:
+# a soma de qualquer janela sai de c[fim] - c[inicio], então todas as janelas de uma
+# defasagem custam O(n), sem laço de .corr() por janela.
+# Defasagem k = x adiantado k meses em relação a y, ou seja, corr(x[t-k], y[t]).
+# As defasagens contam linhas, então as series precisam ser mensais e sem buracos.
+
+JANELA_PADRAO = 24
+DEFASAGEM_MAXIMA_PADRAO = 24
+DEFASAGEM_LIMITE = 60
+
+
+def _somas_janela(v, janela):
+    c = np.concatenate(([0.0], np.cumsum(v)))
+    return c[janela:] - c[:-janela]
+
+
+# Pearson a partir das somas; janelas com variancia (quase) zero dão NaN
+def _pearson(n, sx, sy, sxx, syy, sxy, tolerancia):
+    cov = sxy - sx * sy / n
+    var_x = sxx - sx * sx / n
+    var_y = syy - sy * sy / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        r = cov / np.sqrt(var_x * var_y)
+    r = np.where((var_x <= tolerancia[0] * n) | (var_y <= tolerancia[1] * n), np.nan, r)
+    return np.clip(r, -1.0, 1.0)
+
+
+def _preparar(x, y):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # centralizar antes de acumular evita perder precisão nas somas de quadrados
+    x = x - x.mean()
+    y = y - y.mean()
+    tolerancia = (1e-12 * max(x.var(), 1e-300), 1e-12 * max(y.var(), 1e-300))
+    return x, y, tolerancia
+
+
+def _alinhar(x, y, defasagem):
+    if defasagem == 0:
+        return x, y
+    return x[:-defasagem], y[defasagem:]
+
+
+def _movel(x, y, janela, tolerancia):
+    return _pearson(
+        janela,
+        _somas_janela(x, janela), _somas_janela(y, janela),
+        _somas_janela(x * x, janela), _somas_janela(y * y, janela), _somas_janela(x * y, janela),
+        tolerancia
+    )
+
+
+# Correlação em cada janela de `janela` meses; o item i é a janela que termina no mês i + janela - 1
+def correlacao_movel(x, y, janela):
+    x, y, tolerancia = _preparar(x, y)
+    if janela < 2 or janela > len(x):
+        return np.array([])
+    return _movel(x, y, janela, tolerancia)
+
+
+# Correlação da serie inteira para cada defasagem (só a parte em que as duas se sobrepõem)
+def correlacao_defasada(x, y, defasagens):
+    x, y, tolerancia = _preparar(x, y)
+    resultado = np.full(len(defasagens), np.nan)
+    for i, k in enumerate(defasagens):
+        xa, ya = _alinhar(x, y, k)
+        n = len(xa)
+        if n >= 2:
+            resultado[i] = _pearson(
+                n, xa.sum(), ya.sum(), xa @ xa, ya @ ya, xa @ ya, tolerancia
+            )
+    return resultado
+
+
+# Matriz (defasagens x janelas) de correlações moveis, alinhada pelo mês final da janela em y:
+# a coluna j é a janela que termina no mês j + janela - 1. Onde x ainda não tem dados
+# suficientes para a defasagem, fica NaN.
+def correlacao_movel_defasada(x, y, janela, defasagens):
+    x, y, tolerancia = _preparar(x, y)
+    n = len(x)
+    colunas = max(n - janela + 1, 0)
+    matriz = np.full((len(defasagens), colunas), np.nan)
+    for i, k in enumerate(defasagens):
+        xa, ya = _alinhar(x, y, k)
+        if janela < 2 or janela > len(xa):
+            continue
+        matriz[i, k:] = _movel(xa, ya, janela, tolerancia)
+    return matriz
+
+
+# Para o JSON: NaN vira null
+def para_lista(valores):
+    return [None if np.isnan(v) else round(float(v), 6) for v in valores]
+
+
+# Le janela e defasagem_max da query string; devolve (janela, defasagens, erro).
+# Sem parametros usa os padrões, reduzidos quando a serie é curta
+def ler_parametros(args, meses):
+    defasagem_max = args.get('defasagem_max', min(DEFASAGEM_MAXIMA_PADRAO, meses // 3), type=int)
+    janela = args.get('janela', min(JANELA_PADRAO, meses - max(defasagem_max, 0)), type=int)
+    if not 0 <= defasagem_max <= DEFASAGEM_LIMITE:
+        return None, None, f'defasagem_max deve estar entre 0 e {DEFASAGEM_LIMITE}'
+    if not 3 <= janela <= meses - defasagem_max:
+        return None, None, f'janela deve estar entre 3 e {meses - defasagem_max} (meses disponiveis menos a defasagem maxima)'
+    return janela, list(range(defasagem_max + 1)), None
+
+
+# Tudo que a rota e a API mostram: selic (x) adiantada em relação à inadimplencia (y)
+def analisar(merged, janela, defasagens):
+    x = merged['selic_diaria'].to_numpy()
+    y = merged['inadimplencia'].to_numpy()
+    defasada = correlacao_defasada(x, y, defasagens)
+    return {
+        'janela': janela,
+        'defasagens': defasagens,
+        'defasada': defasada,
+        'melhor_defasagem': defasagens[int(np.nanargmax(np.abs(defasada)))] if not np.isnan(defasada).all() else None,
+        'mes': merged['mes'].to_list()[janela - 1:],
+        'movel': correlacao_movel_defasada(x, y, janela, defasagens),
+    }
@@ -0,0 +1,127 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Headers para simular um navegador real
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0 Safari/537.36'
+}
+
+
+# Limitador de taxa do tipo "balde de fichas": libera `taxa` requisições por segundo
+# e aceita rajadas de até `capacidade` requisições seguidas
+class TokenBucket:
+    def __init__(self, taxa, capacidade=None):
+        self.taxa = float(taxa)
+        self.capacidade = float(capacidade or max(1.0, self.taxa))
+        self.fichas = self.capacidade
+        self.ultimo = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consumir(self, quantidade=1):
+        while True:
+            with self.lock:
+                agora = time.monotonic()
+                self.fichas = min(self.capacidade, self.fichas + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.fichas >= quantidade:
+                    self.fichas -= quantidade
+                    return
+                espera = (quantidade - self.fichas) / self.taxa
+            # dorme fora do lock para não travar as outras threads
+            time.sleep(espera)
+
+
+# Sessão HTTP com pool de conexões (keep-alive) e novas tentativas em erros temporários
+def criar_sessao(tamanho_pool=10, tentativas=3):
+    sessao = requests.Session()
+    sessao.headers.update(HEADERS)
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=('GET', 'HEAD')
+    )
+    adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool, max_retries=retry)
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    return sessao
+
+
+class Crawler:
+    # concorrencia_por_host: quantas requisições simultâneas no mesmo site
+    # requisicoes_por_segundo: taxa máxima global (0 ou None = sem limite)
+    # cache: CacheHTTP opcional para requisições condicionais (ETag / Last-Modified)
+    def __init__(self, concorrencia_por_host=4, requisicoes_por_segundo=2.0, timeout=15, sessao=None, cache=None):
+        self.concorrencia_por_host = max(1, concorrencia_por_host)
+        self.timeout = timeout
+        self.cache = cache
+        self.sessao = sessao or criar_sessao(tamanho_pool=self.concorrencia_por_host)
+        self.limitador = TokenBucket(requisicoes_por_segundo) if requisicoes_por_segundo else None
+        self._semaforos = {}
+        self._lock = threading.Lock()
+
+    def _semaforo(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._semaforos:
+                self._semaforos[host] = threading.BoundedSemaphore(self.concorrencia_por_host)
+            return self._semaforos[host]
+
+    def _get(self, url, **kwargs):
+        if self.limitador:
+            self.limitador.consumir()
+        with self._semaforo(url):
+            response = self.sessao.get(url, timeout=self.timeout, **kwargs)
+        response.do_cache = False
+        return response
+
+    # Com cache, uma resposta 304 volta com o corpo guardado, status 200 e do_cache = True,
+    # assim quem chama sabe que a pagina não mudou desde a ultima coleta
+    def buscar(self, url, **kwargs):
+        if not self.cache:
+            return self._get(url, **kwargs)
+        cabecalhos = kwargs.pop('headers', None) or {}
+        response = self._get(url, headers={**self.cache.cabecalhos_condicionais(url), **cabecalhos}, **kwargs)
+        if response.status_code == 304:
+            guardado = self.cache.revalidar(url)
+            if guardado:
+                response.status_code = 200
+                response._content = guardado[0]
+                response.encoding = guardado[1]
+                response.do_cache = True
+                return response
+            # a entrada saiu do cache (podada ou apagada) depois de montar os cabeçalhos
+            # condicionais: sem corpo para devolver, busca de novo uma vez sem eles
+            response = self._get(url, headers=cabecalhos, **kwargs)
+        if response.status_code == 200:
+            self.cache.salvar(url, response)
+        return response
+
+    def _buscar_seguro(self, url):
+        try:
+            return url, self.buscar(url), None
+        except requests.RequestException as e:
+            return url, None, e
+
+    # Busca várias URLs em paralelo e devolve (url, resposta, erro) na mesma ordem da entrada
+    def buscar_varios(self, urls):
+        urls = list(urls)
+        if not urls:
+            return
+        with ThreadPoolExecutor(max_workers=min(len(urls), self.concorrencia_por_host)) as executor:
+            yield from executor.map(self._buscar_seguro, urls)
+
+    def fechar(self):
+        self.sessao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,76 @@
+import numpy as np
+import plotly.graph_objs as go
+
+import config
+
+# Redução de pontos das series antes de ir para o plotly. Um grafico de N pixels de largura
+# não mostra mais que ~N pontos, então mandar a serie inteira só pesa no HTML e no navegador.
+#   - lttb: Largest-Triangle-Three-Buckets, escolhe em cada balde o ponto que forma o maior
+#     triangulo com o ponto anterior e a media do proximo balde (mantem o formato da linha)
+#   - minmax: o menor e o maior valor de cada balde (mantem os picos, mais barato)
+# Acima de GRAFICOS_LIMIAR_WEBGL pontos o trace vira Scattergl (WebGL em vez de SVG), e os
+# valores vão como float32, que é a precisão que o navegador consegue desenhar de qualquer jeito.
+
+
+def lttb(x, y, limite):
+    n = len(y)
+    if limite >= n or limite < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    indices = np.empty(limite, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    # limite - 2 baldes para os pontos do meio (o primeiro e o ultimo sempre ficam)
+    bordas = np.linspace(1, n - 1, limite - 1).astype(np.int64)
+    bordas = np.append(bordas, n)
+    a = 0
+    for i in range(limite - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        proximo_fim = bordas[i + 2] if i + 2 < limite - 1 else n
+        media_x = x[fim:proximo_fim].mean()
+        media_y = y[fim:proximo_fim].mean()
+        areas = np.abs((x[a] - media_x) * (y[inicio:fim] - y[a]) - (x[a] - x[inicio:fim]) * (media_y - y[a]))
+        a = inicio + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def minmax(y, limite):
+    n = len(y)
+    baldes = limite // 2
+    if baldes < 1 or 2 * baldes >= n:
+        return np.arange(n)
+    tamanho = -(-n // baldes)
+    matriz = np.full(baldes * tamanho, np.nan)
+    matriz[:n] = y
+    matriz = matriz.reshape(baldes, tamanho)
+    baldes_usados = np.arange(-(-n // tamanho))
+    matriz = matriz[baldes_usados]
+    deslocamento = baldes_usados * tamanho
+    indices = np.concatenate((
+        [0, n - 1],
+        deslocamento + np.nanargmin(matriz, axis=1),
+        deslocamento + np.nanargmax(matriz, axis=1),
+    ))
+    return np.unique(indices)
+
+
+# Indices dos pontos que vão para um grafico de `largura_px` pixels (0 = todos)
+def reduzir(y, largura_px, metodo=None):
+    metodo = metodo or config.GRAFICOS_DECIMACAO
+    limite = int(largura_px * config.GRAFICOS_PONTOS_POR_PIXEL)
+    if not largura_px or len(y) <= limite:
+        return np.arange(len(y))
+    if metodo == 'minmax':
+        return minmax(np.asarray(y, dtype=float), limite)
+    return lttb(np.arange(len(y)), y, limite)
+
+
+# Trace de linha já reduzido: Scattergl para muitos pontos, marcadores só quando cabem
+def trace_serie(x, y, nome, largura_px, **kwargs):
+    indices = reduzir(y, largura_px)
+    x = np.asarray(x)[indices]
+    y = np.asarray(y, dtype=float)[indices].astype(np.float32)
+    classe = go.Scattergl if len(y) > config.GRAFICOS_LIMIAR_WEBGL else go.Scatter
+    modo = 'lines+markers' if len(y) <= config.GRAFICOS_LIMIAR_MARCADORES else 'lines'
+    return classe(x=x, y=y, mode=modo, name=nome, **kwargs)
@@ -0,0 +1,140 @@
+import unicodedata
+
+import pandas as pd
+
+# Esquemas das tabelas que chegam em planilhas: as colunas canonicas, na ordem, com o tipo
+# de cada uma e os outros nomes com que a coluna aparece nos arquivos.
+# normalizar() recebe a aba lida sem cabeçalho (header=None) e
+#   - acha a linha de cabeçalho nas primeiras LINHAS_PROCURA_CABECALHO linhas (nomes
+#     comparados sem acento, caixa e espaços sobrando) e joga fora o que vem antes dela;
+#     aba sem cabeçalho só é aceita com sem_cabecalho=True, e aí as colunas vão pela posição
+#   - troca os nomes pelos canonicos e converte cada coluna para o tipo do esquema
+#   - recusa a aba (ValueError) se faltar coluna, sobrar coluna desconhecida ou algum valor
+#     não couber no tipo, em vez de deixar o concat criar colunas novas cheias de NaN
+#
+# Uso: esquemas.registrar('vendas', [('Posição', 'Int64'), ('Cidade', 'category')], {'Municipio': 'Cidade'})
+#      df = esquemas.normalizar(pd.read_excel(arquivo, header=None), 'vendas', arquivo)
+
+LINHAS_PROCURA_CABECALHO = 10
+EXEMPLOS_NO_ERRO = 5
+
+ESQUEMAS = {}
+
+
+# 'Plano  Vendido ' e 'plano vendido' viram o mesmo nome; 'Posicao' casa com 'Posição'
+def _chave_nome(valor):
+    texto = unicodedata.normalize('NFKD', str(valor))
+    texto = ''.join(letra for letra in texto if not unicodedata.combining(letra))
+    return ' '.join(texto.casefold().split())
+
+
+def registrar(nome, colunas, sinonimos=None):
+    colunas = dict(colunas)
+    nomes = {_chave_nome(coluna): coluna for coluna in colunas}
+    for apelido, coluna in (sinonimos or {}).items():
+        if coluna not in colunas:
+            raise ValueError(f'Esquema {nome}: o sinonimo {apelido!r} aponta para {coluna!r}, que não é coluna do esquema')
+        nomes[_chave_nome(apelido)] = coluna
+    ESQUEMAS[nome] = {'nome': nome, 'colunas': colunas, 'nomes': nomes}
+    return ESQUEMAS[nome]
+
+
+registrar(
+    'vendas',
+    [('Posição', 'Int64'), ('Cliente', 'str'), ('Cidade', 'category'), ('Plano Vendido', 'category')],
+    {'Plano': 'Plano Vendido', 'Município': 'Cidade'},
+)
+
+
+def _esquema(esquema):
+    if isinstance(esquema, str):
+        if esquema not in ESQUEMAS:
+            raise ValueError(f"Esquema desconhecido: {esquema}. Opções: {', '.join(ESQUEMAS)}")
+        return ESQUEMAS[esquema]
+    return esquema
+
+
+def _canonica(esquema, valor):
+    if pd.isna(valor):
+        return None
+    return esquema['nomes'].get(_chave_nome(valor))
+
+
+# Indice (posição) da linha de cabeçalho: a primeira em que pelo menos metade das celulas
+# preenchidas e metade das colunas do esquema são nomes conhecidos. None se não houver
+def localizar_cabecalho(df, esquema):
+    esquema = _esquema(esquema)
+    minimo = (len(esquema['colunas']) + 1) // 2
+    for posicao, linha in enumerate(df.head(LINHAS_PROCURA_CABECALHO).itertuples(index=False, name=None)):
+        preenchidas = [valor for valor in linha if not pd.isna(valor)]
+        reconhecidas = {_canonica(esquema, valor) for valor in preenchidas} - {None}
+        if preenchidas and len(reconhecidas) >= minimo and 2 * len(reconhecidas) >= len(preenchidas):
+            return posicao
+    return None
+
+
+def _converter(serie, tipo, coluna, origem):
+    if pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(tipo)):
+        numeros = pd.to_numeric(serie, errors='coerce')
+        invalidos = serie[serie.notna() & numeros.isna()]
+        if pd.api.types.is_integer_dtype(pd.api.types.pandas_dtype(tipo)):
+            invalidos = pd.concat([invalidos, serie[numeros.notna() & (numeros % 1 != 0)]])
+        if len(invalidos):
+            exemplos = ', '.join(repr(valor) for valor in invalidos.head(EXEMPLOS_NO_ERRO))
+            raise ValueError(f'{origem}: {len(invalidos)} valor(es) de {coluna!r} não são {tipo} ({exemplos})')
+        return numeros.astype(tipo)
+    # texto e categorias: sem espaços nas pontas e celula em branco vira vazia
+    texto = serie.astype('str').str.strip()
+    return texto.mask(texto == '').astype(tipo)
+
+
+# Aba lida com header=None -> DataFrame com as colunas do esquema, na ordem e nos tipos dele.
+# sem_cabecalho=True: quem chama sabe que a aba não tem cabeçalho (continua a tabela de outra)
+def normalizar(df, esquema, origem='tabela', sem_cabecalho=False):
+    esquema = _esquema(esquema)
+    colunas = list(esquema['colunas'])
+    df = df.dropna(how='all').dropna(axis=1, how='all')
+    posicao = localizar_cabecalho(df, esquema)
+    if posicao is None:
+        if not sem_cabecalho:
+            raise ValueError(
+                f'{origem}: cabeçalho do esquema {esquema["nome"]} não encontrado nas primeiras '
+                f'{LINHAS_PROCURA_CABECALHO} linhas (se a aba não tem cabeçalho, use sem_cabecalho=True)'
+            )
+        if df.shape[1] != len(colunas):
+            raise ValueError(f'{origem}: aba sem cabeçalho com {df.shape[1]} colunas no lugar de {len(colunas)}')
+        # colunas pela posição: a conversão de tipos só pega uma troca entre colunas de tipos
+        # diferentes (texto na Posição); duas colunas de texto trocadas passam, por isso
+        # isso só vale com o sem_cabecalho explicito
+        nomes = colunas
+        corpo = df
+    else:
+        cabecalho = df.iloc[posicao].tolist()
+        nomes = [_canonica(esquema, valor) for valor in cabecalho]
+        desconhecidas = [
+            f'sem nome (coluna {numero + 1})' if pd.isna(valor) else repr(valor)
+            for numero, (valor, nome) in enumerate(zip(cabecalho, nomes)) if nome is None
+        ]
+        faltando = [coluna for coluna in colunas if coluna not in nomes]
+        repetidas = sorted({nome for nome in nomes if nome and nomes.count(nome) > 1})
+        problemas = []
+        if faltando:
+            problemas.append(f"faltando {', '.join(faltando)}")
+        if desconhecidas:
+            problemas.append(f"desconhecidas {', '.join(desconhecidas)}")
+        if repetidas:
+            problemas.append(f"repetidas {', '.join(repetidas)}")
+        if problemas:
+            raise ValueError(f'{origem}: colunas fora do esquema {esquema["nome"]}: ' + '; '.join(problemas))
+        corpo = df.iloc[posicao + 1:]
+    corpo = corpo.set_axis(nomes, axis=1)
+    return pd.DataFrame(
+        {coluna: _converter(corpo[coluna], tipo, coluna, origem) for coluna, tipo in esquema['colunas'].items()}
+    ).reset_index(drop=True)
+
+
+# Depois do concat de varias abas normalizadas: as categorias de cada aba são diferentes e
+# o concat devolve essas colunas como texto; aqui elas voltam a ser category
+def tipar(df, esquema):
+    esquema = _esquema(esquema)
+    return df.astype({coluna: tipo for coluna, tipo in esquema['colunas'].items() if coluna in df.columns})
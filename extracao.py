@@ -0,0 +1,147 @@
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml é opcional, sem ele usamos o html.parser do Python
+    lxml = None
+
+CLASSE_CARD = "card entity-card entity-card-list cf"
+CLASSE_DIRECAO = "meta-body-item meta-body-direction meta-body-oneline"
+
+
+def limpar_diretor(texto):
+    diretor = texto.strip().replace("Direção:", "").replace(",", "").replace("|", "").strip()
+    # Limpar a direção para evitar espaços indesejados
+    return diretor.replace("\n", " ").replace("\r", " ").strip()
+
+
+def juntar_generos(generos):
+    return ", ".join(generos[:3]) if generos else "N/A"
+
+
+# Extratores das paginas do AdoroCinema. Todos recebem o corpo da resposta em bytes
+# (response.content) e devolvem os mesmos dicionarios, então dá pra trocar um pelo outro.
+
+# Monta a arvore inteira da pagina com o html.parser (o jeito original do scraper)
+class ExtratorBS4:
+    parser = "html.parser"
+
+    def _soup(self, conteudo, encoding, parse_only=None):
+        return BeautifulSoup(conteudo, self.parser, from_encoding=encoding, parse_only=parse_only)
+
+    def cards(self, conteudo, base_site, encoding=None):
+        soup = self._soup(conteudo, encoding, self.filtro_cards())
+        cards = []
+        # Cada filme está em uma div com classe nomeada
+        for card in soup.find_all("div", class_=CLASSE_CARD):
+            titulo_tag = card.find("a", class_="meta-title-link")
+            titulo = titulo_tag.text.strip() if titulo_tag else "N/A"
+            link = base_site + titulo_tag['href'] if titulo_tag else None
+            nota_tag = card.find("span", class_="stareval-note")
+            nota = nota_tag.text.strip().replace(",", ".") if nota_tag else "N/A"
+            cards.append({"Titulo": titulo, "Nota": nota, "Link": link})
+        return cards
+
+    def detalhes(self, conteudo, encoding=None):
+        filme_soup = self._soup(conteudo, encoding, self.filtro_detalhes())
+
+        # Diretor - Extração do diretor de forma mais precisa
+        diretor_tag = filme_soup.find("div", class_=CLASSE_DIRECAO)
+        diretor = limpar_diretor(diretor_tag.text) if diretor_tag else "N/A"
+
+        # Categoria
+        categoria = "N/A"
+        genero_block = filme_soup.find("div", class_="meta-body-info")
+        if genero_block:
+            categoria = juntar_generos([g.text.strip() for g in genero_block.find_all('a')])
+
+        # Ano de lançamento
+        ano_tag = genero_block.find("span", class_="date") if genero_block else None
+        ano = ano_tag.text.strip() if ano_tag else "N/A"
+
+        return {"Direção": diretor, "Ano": ano, "Categoria": categoria}
+
+    def filtro_cards(self):
+        return None
+
+    def filtro_detalhes(self):
+        return None
+
+
+# Só constroi as subarvores que interessam (SoupStrainer), com o parser lxml quando disponivel
+class ExtratorStrainer(ExtratorBS4):
+    parser = "lxml" if lxml else "html.parser"
+
+    def filtro_cards(self):
+        return SoupStrainer("div", class_=CLASSE_CARD)
+
+    def filtro_detalhes(self):
+        # durante o parse o atributo class ainda é a string inteira, por isso a regex
+        return SoupStrainer("div", class_=re.compile(r"(^|\s)meta-body-(direction|info)(\s|$)"))
+
+
+def _tem_classe(classe):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {classe} ")'
+
+
+# Usa o lxml direto com consultas XPath compiladas uma vez só, sem passar pelo BeautifulSoup
+class ExtratorLxml:
+    def __init__(self):
+        self.xp_cards = etree.XPath(f'//div[@class="{CLASSE_CARD}"]')
+        self.xp_titulo = etree.XPath(f'.//a[{_tem_classe("meta-title-link")}]')
+        self.xp_nota = etree.XPath(f'.//span[{_tem_classe("stareval-note")}]')
+        self.xp_direcao = etree.XPath(f'//div[@class="{CLASSE_DIRECAO}"]')
+        self.xp_info = etree.XPath(f'//div[{_tem_classe("meta-body-info")}]')
+        self.xp_generos = etree.XPath('.//a')
+        self.xp_ano = etree.XPath(f'.//span[{_tem_classe("date")}]')
+
+    def _arvore(self, conteudo, encoding):
+        parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+        return lxml.html.document_fromstring(conteudo, parser=parser)
+
+    def cards(self, conteudo, base_site, encoding=None):
+        cards = []
+        for card in self.xp_cards(self._arvore(conteudo, encoding)):
+            titulo_tag = next(iter(self.xp_titulo(card)), None)
+            titulo = titulo_tag.text_content().strip() if titulo_tag is not None else "N/A"
+            link = base_site + titulo_tag.get('href') if titulo_tag is not None else None
+            nota_tag = next(iter(self.xp_nota(card)), None)
+            nota = nota_tag.text_content().strip().replace(",", ".") if nota_tag is not None else "N/A"
+            cards.append({"Titulo": titulo, "Nota": nota, "Link": link})
+        return cards
+
+    def detalhes(self, conteudo, encoding=None):
+        arvore = self._arvore(conteudo, encoding)
+
+        diretor_tag = next(iter(self.xp_direcao(arvore)), None)
+        diretor = limpar_diretor(diretor_tag.text_content()) if diretor_tag is not None else "N/A"
+
+        categoria = "N/A"
+        ano = "N/A"
+        genero_block = next(iter(self.xp_info(arvore)), None)
+        if genero_block is not None:
+            categoria = juntar_generos([g.text_content().strip() for g in self.xp_generos(genero_block)])
+            ano_tag = next(iter(self.xp_ano(genero_block)), None)
+            ano = ano_tag.text_content().strip() if ano_tag is not None else "N/A"
+
+        return {"Direção": diretor, "Ano": ano, "Categoria": categoria}
+
+
+EXTRATORES = {
+    'bs4': ExtratorBS4,
+    'strainer': ExtratorStrainer,
+}
+if lxml:
+    EXTRATORES['lxml'] = ExtratorLxml
+
+EXTRATOR_PADRAO = 'lxml' if lxml else 'strainer'
+
+
+def obter_extrator(nome=None):
+    nome = nome or EXTRATOR_PADRAO
+    if nome not in EXTRATORES:
+        raise ValueError(f"Extrator desconhecido: {nome}. Opções: {', '.join(EXTRATORES)}")
+    return EXTRATORES[nome]()
@@ -5,6 +5,8 @@ import plotly.express as px
 import plotly.io as pio
 import random
 
+import estaticos
+
 #configura o plotly para abrir os arquivos no navegador por padrão
 pio.renderers.default = "browser"
 
@@ -19,6 +21,8 @@ conn.close()
 
 #incia o flask
 app = Flask(__name__)
+# plotly.min.js servido uma vez do disco (/vendor/...) em vez de ir inteiro dentro de cada grafico
+app.register_blueprint(estaticos.estaticos)
 html_template = '''
     <h1>Dashboard - Consumo de Alcool</h1>
     <h2> Menu </h2>
@@ -29,6 +33,11 @@ html_template = '''
         </ul>
     '''
 
+# pagina do grafico com o <script src> do plotly.min.js local; o rodape vai dentro do <body>
+def pagina_grafico(fig, rodape=''):
+    grafico = fig.to_html(include_plotlyjs=estaticos.url_plotly(), full_html=False)
+    return f'<html><head><meta charset="utf-8"></head><body>{grafico}{rodape}</body></html>'
+
 # rota inicial com o links para os graficos
 @app.route('/')
 def index():
@@ -43,7 +52,7 @@ def grafico1():
     conn.close()
     df_melted = df.melt(var_name="Bebidas", value_name="Média de Porções")
     fig = px.bar(df_melted, x="Bebidas", y="Média de Porções", title="Media de consumo global por tipo")
-    return fig.to_html()
+    return pagina_grafico(fig)
 
 @app.route("/grafico2")
 def grafico2():
@@ -53,7 +62,7 @@ def grafico2():
     medias = df.mean().reset_index()
     medias.columns = ["Tipo", "Média"]
     fig = px.pie(medias, names="Tipo", values="Média", title="Proporção média entre tipos de bebidas")
-    return fig.to_html() + '<br><a href="/">Voltar ao início</a>'
+    return pagina_grafico(fig, '<br><a href="/">Voltar ao início</a>')
 
 @app.route("/comparar", methods=['GET','POST'])
 def comparar():
@@ -69,7 +78,7 @@ def comparar():
         conn.close()
         fig = px.scatter(df, x=eixo_x, y=eixo_y, title=f"Comparação entre {eixo_x} e {eixo_y}")
         fig.update_traces(textposition="top center")
-        return fig.to_html() + '<br><a href="/">Voltar ao início</a>'
+        return pagina_grafico(fig, '<br><a href="/">Voltar ao início</a>')
 
     return render_template_string('''
         <h2>Comparar Campos</h2>
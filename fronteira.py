@@ -0,0 +1,82 @@
+import json
+import sqlite3
+
+DB_FRONTEIRA = 'fronteira_adorocinema.db'
+MAX_TENTATIVAS = 3
+
+
+# Fronteira de coleta persistente em SQLite: guarda as URLs que faltam visitar
+# (pendente), as que estão sendo visitadas (em_andamento) e as que já terminaram
+# (concluida / erro). Os filmes coletados vão direto para os sinks do pipeline_filmes,
+# não ficam aqui.
+class Fronteira:
+    def __init__(self, caminho=DB_FRONTEIRA, max_tentativas=MAX_TENTATIVAS):
+        self.max_tentativas = max_tentativas
+        self.conn = sqlite3.connect(caminho)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS fronteira(
+                ordem INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE,
+                tipo TEXT,
+                estado TEXT DEFAULT 'pendente',
+                tentativas INTEGER DEFAULT 0,
+                dados TEXT
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS ix_fronteira_estado ON fronteira(tipo, estado, ordem)')
+        self.conn.commit()
+
+    # Começa uma coleta do zero
+    def reiniciar(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM fronteira')
+
+    # O que estava em andamento quando o processo caiu volta para a fila
+    def recuperar(self):
+        with self.conn:
+            return self.conn.execute(
+                "UPDATE fronteira SET estado = 'pendente' WHERE estado = 'em_andamento'"
+            ).rowcount
+
+    # itens: lista de (url, dados); URLs já conhecidas são ignoradas
+    def adicionar(self, tipo, itens):
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO fronteira (url, tipo, dados) VALUES (?, ?, ?)',
+                [(url, tipo, json.dumps(dados, ensure_ascii=False)) for url, dados in itens]
+            )
+
+    # Tira até `limite` URLs pendentes da fila e marca como em andamento
+    def pegar(self, tipo, limite):
+        with self.conn:
+            linhas = self.conn.execute('''
+                SELECT ordem, url, dados FROM fronteira
+                WHERE tipo = ? AND estado = 'pendente'
+                ORDER BY ordem LIMIT ?
+            ''', (tipo, limite)).fetchall()
+            self.conn.executemany(
+                "UPDATE fronteira SET estado = 'em_andamento' WHERE ordem = ?", [(ordem,) for ordem, _, _ in linhas]
+            )
+        return [(url, json.loads(dados)) for _, url, dados in linhas]
+
+    def concluir(self, url):
+        self.concluir_varios([url])
+
+    def concluir_varios(self, urls):
+        with self.conn:
+            self.conn.executemany("UPDATE fronteira SET estado = 'concluida' WHERE url = ?", [(url,) for url in urls])
+
+    def falhar(self, url):
+        with self.conn:
+            self.conn.execute('''
+                UPDATE fronteira
+                SET tentativas = tentativas + 1,
+                    estado = CASE WHEN tentativas + 1 >= ? THEN 'erro' ELSE 'pendente' END
+                WHERE url = ?
+            ''', (self.max_tentativas, url))
+
+    def resumo(self):
+        return dict(self.conn.execute('SELECT estado, COUNT(*) FROM fronteira GROUP BY estado').fetchall())
+
+    def fechar(self):
+        self.conn.close()
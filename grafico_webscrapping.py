@@ -2,6 +2,7 @@ import dash
 from dash import html
 import pandas as pd
 import plotly.express as px
+import estaticos
 
 #carregar o csv
 df = pd.read_csv('filmes_adorocinema.csv')
@@ -18,12 +19,14 @@ fig = px.bar(
 )
 #inicializando a aplicação dash
 app = dash.Dash()
+# o iframe carrega o plotly.min.js do proprio servidor (/vendor/...), com cache longo, em vez de embutido no srcDoc
+app.server.register_blueprint(estaticos.estaticos)
 #definindo o layout da aplicação
 app.layout = html.Div([
     html.H1("Grafico de notas dos filmes", style={'text-align':'center'}),
     html.Div([
         html.Iframe(
-            srcDoc=fig.to_html(),
+            srcDoc=fig.to_html(include_plotlyjs=estaticos.url_plotly()),
             width="100%",
             height="600px",
             style={'border':'none'} 
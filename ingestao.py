@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+
+import cache_dados
+
+# Leitura dos CSVs do BCB (data;valor, data em dd/mm/aaaa) em pedaços, agregando a
+# media mensal aos poucos: para cada mês guardamos só a soma e a contagem, então a
+# memoria depende do numero de meses e do tamanho do pedaço, não do tamanho do arquivo.
+
+TAMANHO_CHUNK = 500_000
+_ZERO = ord('0')
+_DIAS_NO_MES = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+
+# Converte datas 'dd/mm/aaaa' na chave inteira aaaamm olhando direto para os bytes de
+# cada posição (formato fixo), sem criar datetime nem uma string por linha
+def chave_mes(datas):
+    datas = pd.Series(datas, dtype=str)
+    # o S10 corta o que passa de 10 caracteres ('01/03/2011 00:00'): esses vão pelo caminho lento
+    tamanho_ok = (datas.str.len() == 10).to_numpy()
+    texto = datas.to_numpy(dtype='S10')
+    digitos = np.frombuffer(texto.tobytes(), dtype=np.uint8).reshape(-1, 10).astype(np.int32) - _ZERO
+    posicoes = [0, 1, 3, 4, 6, 7, 8, 9]
+    formato_ok = (
+        tamanho_ok
+        & (digitos[:, [2, 5]] == ord('/') - _ZERO).all(axis=1)
+        & ((digitos[:, posicoes] >= 0) & (digitos[:, posicoes] <= 9)).all(axis=1)
+    )
+    dia = digitos[:, 0] * 10 + digitos[:, 1]
+    mes = digitos[:, 3] * 10 + digitos[:, 4]
+    ano = digitos[:, 6] * 1000 + digitos[:, 7] * 100 + digitos[:, 8] * 10 + digitos[:, 9]
+    mes_ok = (mes >= 1) & (mes <= 12)
+    # dia conferido com o calendario (fevereiro com 29 nos anos bissextos)
+    bissexto = (ano % 4 == 0) & ((ano % 100 != 0) | (ano % 400 == 0))
+    dias_no_mes = _DIAS_NO_MES[np.where(mes_ok, mes, 1) - 1] + ((mes == 2) & bissexto)
+    fora_do_padrao = ~(formato_ok & mes_ok & (dia >= 1) & (dia <= dias_no_mes))
+    if fora_do_padrao.any():
+        # datas como '1/3/2011' vão pelo caminho lento; se forem invalidas
+        # ('31/02/2024', '00/05/2024') o pandas levanta o erro
+        lentas = pd.to_datetime(datas[fora_do_padrao], format="%d/%m/%Y")
+        ano[fora_do_padrao] = lentas.dt.year.to_numpy()
+        mes[fora_do_padrao] = lentas.dt.month.to_numpy()
+    return ano * 100 + mes
+
+
+# Le o arquivo em pedaços e devolve um DataFrame (mes 'AAAA-MM', coluna) com a media de cada mês
+def media_mensal(arquivo, coluna, tamanho_chunk=TAMANHO_CHUNK):
+    soma = pd.Series(dtype='float64')
+    contagem = pd.Series(dtype='int64')
+    leitor = pd.read_csv(
+        arquivo,
+        sep=';',
+        names=['data', coluna],
+        header=0,
+        dtype={'data': str},
+        chunksize=tamanho_chunk
+    )
+    for chunk in leitor:
+        chunk = chunk.dropna()
+        if chunk.empty:
+            continue
+        grupos = chunk[coluna].groupby(chave_mes(chunk['data']))
+        soma = soma.add(grupos.sum(), fill_value=0)
+        contagem = contagem.add(grupos.count(), fill_value=0)
+
+    media = (soma / contagem).sort_index()
+    # só agora, uma vez por mês, a chave vira o texto 'AAAA-MM'
+    meses = [f'{chave // 100:04d}-{chave % 100:02d}' for chave in media.index.astype(int)]
+    return pd.DataFrame({'mes': meses, coluna: media.to_numpy()})
+
+
+# Recria a tabela com o esquema do init_db (mes TEXT PRIMARY KEY) se ela foi criada por um
+# to_sql(if_exists='replace') antigo, que jogava fora a chave primaria
+def garantir_esquema(conn, tabela, coluna):
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {tabela}(mes TEXT PRIMARY KEY, {coluna} REAL)')
+    chaves = [linha[1] for linha in conn.execute(f'PRAGMA table_info({tabela})') if linha[5]]
+    if chaves == ['mes']:
+        return
+    conn.execute(f'ALTER TABLE {tabela} RENAME TO {tabela}_antiga')
+    conn.execute(f'CREATE TABLE {tabela}(mes TEXT PRIMARY KEY, {coluna} REAL)')
+    conn.execute(f'INSERT OR REPLACE INTO {tabela} (mes, {coluna}) SELECT mes, {coluna} FROM {tabela}_antiga')
+    conn.execute(f'DROP TABLE {tabela}_antiga')
+
+
+# Grava só os meses novos ou com valor diferente do que já está no banco, com upsert em lote.
+# Com substituir=True os meses que não estão no arquivo são apagados.
+# Devolve (meses alterados, meses removidos); não faz commit, fica na transação de quem chamou.
+def mesclar_mensal(conn, tabela, coluna, mensal, substituir=False):
+    garantir_esquema(conn, tabela, coluna)
+    atuais = dict(conn.execute(f'SELECT mes, {coluna} FROM {tabela}'))
+    novos = list(zip(mensal['mes'], mensal[coluna].astype(float)))
+    alterados = [(mes, valor) for mes, valor in novos if atuais.get(mes) != valor]
+    conn.executemany(f'''
+        INSERT INTO {tabela} (mes, {coluna}) VALUES (?, ?)
+        ON CONFLICT(mes) DO UPDATE SET {coluna} = excluded.{coluna}
+    ''', alterados)
+
+    removidos = []
+    if substituir:
+        removidos = sorted(set(atuais) - {mes for mes, _ in novos})
+        conn.executemany(f'DELETE FROM {tabela} WHERE mes = ?', [(mes,) for mes in removidos])
+    return [mes for mes, _ in alterados], removidos
+
+
+# Grava as duas series mensais (upload do main.py e do super_bugs.py) e, se algo mudou, sobe a
+# versão dos dados e marca os meses alterados/removidos: caches de dados e de paginas, o delta
+# do /api/series e os modelos incrementais dependem disso. Roda dentro do banco.escrever
+def gravar_series(conn, inad_mensal, selic_mensal, substituir=False):
+    inad_alterados, inad_removidos = mesclar_mensal(conn, 'inadimplencia', 'inadimplencia', inad_mensal, substituir)
+    selic_alterados, selic_removidos = mesclar_mensal(conn, 'selic', 'selic_diaria', selic_mensal, substituir)
+    if inad_alterados or inad_removidos or selic_alterados or selic_removidos:
+        cache_dados.nova_versao(conn)
+        cache_dados.registrar_alteracoes(conn, 'inadimplencia', inad_alterados)
+        cache_dados.registrar_alteracoes(conn, 'inadimplencia', inad_removidos, removido=True)
+        cache_dados.registrar_alteracoes(conn, 'selic', selic_alterados)
+        cache_dados.registrar_alteracoes(conn, 'selic', selic_removidos, removido=True)
+    return inad_alterados, inad_removidos, selic_alterados, selic_removidos
@@ -1,40 +1,58 @@
 import config 
-import pandas as pd
-import sqlite3
+import banco
+import cache_dados
+from cache_respostas import resposta_em_cache
+from api_series import api
+import consulta
+import estaticos
+import metricas
+import tarefas
+import importlib
 import os
-from flask import Flask, request, jsonify, render_template_string
-import dash
-from dash import Dash, html, dcc
-import plotly.graph_objs as go
-import numpy as np 
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-
-app = Flask(__name__)
+import tempfile
+import threading
+import time
+from flask import Blueprint, Flask, request, jsonify, render_template_string, url_for
+
+# numpy, pandas, plotly e sklearn (e os modulos nossos que usam eles: correlacoes, decimacao,
+# ingestao e modelos) são importados dentro das rotas que precisam, para o app subir rapido.
+# Com o pre-aquecimento (config.PRE_AQUECER) eles são carregados numa thread logo depois.
+MODULOS_PESADOS = (
+    'numpy', 'pandas', 'plotly.graph_objs', 'sklearn.cluster', 'sklearn.preprocessing',
+    'correlacoes', 'decimacao', 'ingestao', 'modelos',
+)
+
+# as rotas ficam num blueprint; o app é montado pelo criar_app()
+paginas = Blueprint('paginas', __name__)
 
 DB_PATH = config.DB_PATH
 
 # Função para inicializar o banco de dados SQL
 def init_db():
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS inadimplencia(
-                mes TEXT PRIMARY KEY,
-                inadimplencia REAL 
-                )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS selic (
-                mes TEXT PRIMARY KEY,
-                selic_diaria REAL
-                )
-        ''')
-        conn.commit()
+    banco.escrever(criar_tabelas)
+
+def criar_tabelas(conn):
+    import modelos
+
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS inadimplencia(
+            mes TEXT PRIMARY KEY,
+            inadimplencia REAL 
+            )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS selic (
+            mes TEXT PRIMARY KEY,
+            selic_diaria REAL
+            )
+    ''')
+    cache_dados.preparar(conn)
+    modelos.preparar(conn)
 
 #EM breve =)
 vazio = 0
-@app.route('/')
+@paginas.route('/')
 def index():
     return render_template_string('''
         <h1>Upload de dados Economicos</h1>
@@ -44,6 +62,12 @@ def index():
             
             <label for='campo_selic'>Arquivo Taxa Selic</label>
             <input type='file' name='campo_selic' required><br><br>
+
+            <label for='modo'>Modo</label>
+            <select name='modo'>
+                <option value='mesclar'>Mesclar (só meses novos ou alterados)</option>
+                <option value='substituir'>Substituir (apaga meses fora do arquivo)</option>
+            </select><br><br>
             <input type='submit' value='Fazer Upload'>    
         </form>
         <br><br><hr>
@@ -52,10 +76,11 @@ def index():
         <a href='/editar_inadimplencia'> Editar dados de Inadimplencia </a> <br>
         <a href='/editar_selic'>Editar dados da Selic </a><br>
         <a href='/correlacao'> Analisar a Correlação </a> <br>
+        <a href='/correlacao_movel'> Correlação Movel e Defasada </a> <br>
         <a href='/insights_3d'> Grafico 3D </a> <br>
     ''')
 
-@app.route('/upload', methods=['POST','GET'])
+@paginas.route('/upload', methods=['POST','GET'])
 def upload():
     inad_file = request.files.get('campo_inadimplencia')
     selic_file = request.files.get('campo_selic')
@@ -63,45 +88,78 @@ def upload():
     if not inad_file or not selic_file:
         return jsonify({'Erro':'Ambos os arquivos devem ser enviados'})
     
-    inad_df = pd.read_csv(
-        inad_file,
-        sep = ';',
-        names=['data','inadimplencia'],
-        header = 0
-    )
 
-    selic_df = pd.read_csv(
-        selic_file,
-        sep = ';',
-        names = ['data','selic_diaria'],
-        header = 0
-    )
-    # formata o campo de data como datahora padrão
-    inad_df['data'] = pd.to_datetime(inad_df['data'], format="%d/%m/%Y")
-    selic_df['data'] = pd.to_datetime(selic_df['data'], format="%d/%m/%Y")
-    # gera uma coluna nova mes e preenche de acordo com a data
-    inad_df['mes'] = inad_df['data'].dt.to_period('M').astype(str)
-    selic_df['mes'] = selic_df['data'].dt.to_period('M').astype(str)
-    #limpa as duplicatas e agrupa conjuntos
-    inad_mensal = inad_df[['mes','inadimplencia']].drop_duplicates()
-    selic_mensal = selic_df.groupby('mes')['selic_diaria'].mean().reset_index()
-
-    # agora com tudo limpo e ordenado vamos armazenar no banco de dados
-    with sqlite3.connect(DB_PATH) as conn:
-        inad_mensal.to_sql('inadimplencia', conn, if_exists='replace', index=False)
-        selic_mensal.to_sql('selic', conn, if_exists='replace', index=False)
-    return jsonify({'Mensagem':'Dados inseridos com sucesso!'})
-
-@app.route('/consultar', methods=['POST','GET'])
+    # modo 'mesclar' só acrescenta/atualiza meses; 'substituir' também apaga os meses que não vieram no arquivo
+    substituir = request.form.get('modo') == 'substituir'
+
+    # salva os arquivos em disco: quem le é a tarefa em segundo plano, depois que a requisição já respondeu
+    caminhos = []
+    for arquivo in (inad_file, selic_file):
+        descritor, caminho = tempfile.mkstemp(suffix='.csv')
+        os.close(descritor)
+        arquivo.save(caminho)
+        caminhos.append(caminho)
+    tarefa_id = tarefas.fila.enviar('upload', processar_upload, *caminhos, substituir)
+
+    # esperar=1 devolve o resultado final na mesma requisição (util para scripts)
+    if request.values.get('esperar'):
+        return jsonify(tarefas.fila.esperar(tarefa_id))
+    return jsonify({
+        'Mensagem':'Upload recebido, processando em segundo plano',
+        'tarefa': tarefa_id,
+        'status': url_for('.status_tarefa', tarefa_id=tarefa_id)
+    }), 202
+
+# Processa os arquivos do upload (roda na fila de tarefas)
+def processar_upload(caminho_inad, caminho_selic, substituir):
+    import ingestao
+
+    try:
+        # le os arquivos em pedaços e já agrupa por mês (media mensal), sem carregar o arquivo inteiro
+        inad_mensal = ingestao.media_mensal(caminho_inad, 'inadimplencia')
+        selic_mensal = ingestao.media_mensal(caminho_selic, 'selic_diaria')
+
+        # agora com tudo limpo e ordenado vamos armazenar no banco de dados, só o que mudou e numa transação só
+        inad_alterados, inad_removidos, selic_alterados, selic_removidos = banco.escrever(
+            ingestao.gravar_series, inad_mensal, selic_mensal, substituir
+        )
+        return {
+            'Mensagem':'Dados inseridos com sucesso!',
+            'Alterados': {'inadimplencia': len(inad_alterados), 'selic': len(selic_alterados)},
+            'Removidos': {'inadimplencia': len(inad_removidos), 'selic': len(selic_removidos)}
+        }
+    finally:
+        for caminho in (caminho_inad, caminho_selic):
+            os.remove(caminho)
+
+# Status (e resultado, quando pronta) de uma tarefa em segundo plano
+@paginas.route('/jobs/<tarefa_id>')
+def status_tarefa(tarefa_id):
+    tarefa = tarefas.fila.obter(tarefa_id)
+    if not tarefa:
+        return jsonify({'Erro':'Tarefa não encontrada'}), 404
+    return jsonify(tarefa)
+
+@paginas.route('/consultar', methods=['POST','GET'])
 def consultar():
-    # Resultado se a pagina for carregada recebendo POST
-    if request.method == 'POST':
-        tabela = request.form.get('campo_tabela')
+    # Resultado se a pagina for carregada recebendo POST (ou GET com a tabela, vindo do link de proxima pagina)
+    tabela = request.values.get('campo_tabela')
+    if request.method == 'POST' or tabela:
         if tabela not in ['inadimplencia','selic']:
             return jsonify({'Erro':'Tabela é invalida'})
-        with sqlite3.connect(DB_PATH) as conn:
-            df = pd.read_sql_query(f'SELECT * FROM {tabela}', conn)
-        return df.to_html(index=False)
+        formato = request.values.get('formato', 'html')
+        if formato not in consulta.FORMATOS:
+            return jsonify({'Erro':'Formato é invalido'})
+        # sem limite = todas as linhas; com limite, pelo menos 1 (LIMIT negativo no SQLite é sem limite)
+        try:
+            limite = int(request.values['limite']) if request.values.get('limite') else None
+        except ValueError:
+            return jsonify({'Erro':'Limite é invalido'})
+        if limite is not None and limite < 1:
+            return jsonify({'Erro':'Limite é invalido'})
+        # as linhas vão saindo do banco direto para a resposta, em blocos
+        url_proxima = url_for('.consultar', campo_tabela=tabela, formato=formato, limite=limite)
+        return consulta.resposta_em_stream(tabela, formato, request.values.get('depois'), limite, url_proxima)
 
     #Resultado sem receber um POST, ou seja, primeiro carregamento da pagina de consulta
     return render_template_string('''
@@ -112,26 +170,36 @@ def consultar():
                 <option value='inadimplencia'>Inadimplencia</option>
                 <option value='selic'>Selic</option>
             </select>
+            <label for='formato'> Formato: </label>
+            <select name='formato'>
+                <option value='html'>HTML</option>
+                <option value='csv'>CSV</option>
+                <option value='ndjson'>NDJSON</option>
+            </select>
+            <label for='limite'> Linhas por pagina: </label>
+            <input type='number' name='limite' min='1' placeholder='todas'>
             <input type="submit" value='Consultar'>
         </form>
         <br>
         <a href='/'>Voltar</a>
     ''')
 
-@app.route('/graficos')
+# ?largura=<pixels> ajusta quantos pontos vão para cada grafico (0 = serie inteira)
+@paginas.route('/graficos')
+@resposta_em_cache('graficos', parametros=lambda args: (args.get('largura', config.GRAFICOS_LARGURA_PX, type=int),))
 def graficos():
-    with sqlite3.connect(DB_PATH) as conn:
-        inad_df = pd.read_sql_query('SELECT * FROM inadimplencia', conn)
-        selic_df = pd.read_sql_query('SELECT * FROM selic', conn)
+    import plotly.graph_objs as go
+    import decimacao
+
+    largura = request.args.get('largura', config.GRAFICOS_LARGURA_PX, type=int)
+    if not 0 <= largura <= 10000:
+        return jsonify({'Erro':'largura deve estar entre 0 e 10000'}), 400
+    with banco.conectar() as conn:
+        inad_df, selic_df, _ = cache_dados.dados_mensais(conn)
 # Criaremos nosso proimeiro grafico de Inadimplencia
     fig1 = go.Figure()
-    fig1.add_trace(go.Scatter(
-            x = inad_df['mes'],
-            y = inad_df['inadimplencia'],
-            mode = 'lines+markers',
-            name = 'Inadimplencia'
-        )
-    )
+    # series longas são reduzidas para a largura do grafico (e viram WebGL se ainda forem grandes)
+    fig1.add_trace(decimacao.trace_serie(inad_df['mes'], inad_df['inadimplencia'], 'Inadimplencia', largura))
 # ggplot2, seaborn, simple_white, plotly, plotly_white, presentation, xgridoff, ygridoff, gridon, none, plotly_dark
     fig1.update_layout(
         title = "Evolução da Inadimplencia",
@@ -141,13 +209,7 @@ def graficos():
     )
     
     fig2 = go.Figure()
-    fig2.add_trace(go.Scatter(
-        x = selic_df['mes'],
-        y = selic_df['selic_diaria'],
-        mode = 'lines+markers',
-        name = 'Selic'
-        )
-    )
+    fig2.add_trace(decimacao.trace_serie(selic_df['mes'], selic_df['selic_diaria'], 'Selic', largura))
     fig2.update_layout(
         title = 'Média Mensal da Selic',
         xaxis_title = "Mês",
@@ -155,8 +217,10 @@ def graficos():
         template = "plotly_dark"
     )
 
-    graph_html_1 = fig1.to_html(full_html=False, include_plotlyjs='cdn')
-    graph_html_2 = fig2.to_html(full_html=False, include_plotlyjs='cdn')
+    # o plotly.min.js vem do nosso servidor (estaticos.py), uma vez por pagina
+    with metricas.etapa('render'):
+        graph_html_1 = fig1.to_html(full_html=False, include_plotlyjs=estaticos.url_plotly())
+        graph_html_2 = fig2.to_html(full_html=False, include_plotlyjs=False)
 
     return render_template_string('''
         <html>
@@ -181,7 +245,7 @@ def graficos():
     ''', grafico1 = graph_html_1, grafico2 = graph_html_2)
 
 # Rota para editar a tabela de inadimplencia
-@app.route('/editar_inadimplencia', methods=['POST','GET'])
+@paginas.route('/editar_inadimplencia', methods=['POST','GET'])
 def editar_inadimplencia():
     # Bloco que será carregado apenas quando receber o post
     if request.method == 'POST':
@@ -192,11 +256,15 @@ def editar_inadimplencia():
         except:
             return jsonify({'Erro':'Valor Invalido'})
         
-        # atualizar os dados do banco
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("UPDATE inadimplencia SET inadimplencia = ? WHERE mes = ?", (novo_valor, mes))
-            conn.commit()
+        # atualizar os dados do banco (a versão só muda se o mês existir)
+        def atualizar(conn):
+            alteradas = conn.execute("UPDATE inadimplencia SET inadimplencia = ? WHERE mes = ?", (novo_valor, mes)).rowcount
+            if alteradas > 0:
+                cache_dados.nova_versao(conn)
+                cache_dados.registrar_alteracoes(conn, 'inadimplencia', [mes])
+            return alteradas
+        if not banco.escrever(atualizar):
+            return jsonify({'Erro': f'Mês {mes} não encontrado'}), 404
         return jsonify({'Mensagem:':f'Dados do mês {mes} atualizados com sucesso'})
         
     # Bloco que será carregado a primeira vez que a pagina abrir (sem receber post)
@@ -215,7 +283,7 @@ def editar_inadimplencia():
     ''')
 
 # Exercicio editar Selic 
-@app.route('/editar_selic', methods=['POST','GET'])
+@paginas.route('/editar_selic', methods=['POST','GET'])
 def editar_selic():
     if request.method == 'POST':
         mes = request.form.get('campo_mes')
@@ -225,10 +293,14 @@ def editar_selic():
         except:
             return jsonify({'Erro:','Valor invalido!'})
 
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute('UPDATE selic SET selic_diaria = ? WHERE mes = ?', (novo_valor,mes))
-            conn.commit()
+        def atualizar(conn):
+            alteradas = conn.execute('UPDATE selic SET selic_diaria = ? WHERE mes = ?', (novo_valor,mes)).rowcount
+            if alteradas > 0:
+                cache_dados.nova_versao(conn)
+                cache_dados.registrar_alteracoes(conn, 'selic', [mes])
+            return alteradas
+        if not banco.escrever(atualizar):
+            return jsonify({'Erro': f'Mês {mes} não encontrado'}), 404
         return jsonify({'Mensagem:':f'Dados do mês {mes} atualizados com sucesso'})
     return render_template_string('''
         <h1> Editar Selic</h1>
@@ -244,18 +316,21 @@ def editar_selic():
         <a href='/'>Voltar</a>
     ''')
 
-@app.route('/correlacao')
+@paginas.route('/correlacao')
+@resposta_em_cache('correlacao')
 def correlacao():
-    with sqlite3.connect(DB_PATH) as conn:
-        inad_df = pd.read_sql_query('SELECT * FROM inadimplencia',conn)
-        selic_df = pd.read_sql_query('SELECT * FROM selic',conn)
-    merged = pd.merge(inad_df, selic_df, on='mes')
-    correl = merged['inadimplencia'].corr(merged['selic_diaria'])
+    import numpy as np
+    import plotly.graph_objs as go
 
+    with banco.conectar() as conn:
+        merged = cache_dados.dados_mensais(conn).merged
     #regressão linear para visualização
     x = merged['selic_diaria']
     y = merged['inadimplencia']
-    m, b = np.polyfit(y, x, 1)
+    with metricas.etapa('model_fit'):
+        correl = merged['inadimplencia'].corr(merged['selic_diaria'])
+        # inadimplencia (y) em função da selic (x), que é o eixo x do grafico
+        m, b = np.polyfit(x, y, 1)
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -342,7 +417,8 @@ def correlacao():
         ),
         margin=dict(l=60, r=60, t=120, b=60)
     )
-    graph_html = fig.to_html(full_html = False, include_plotlyjs='cdn')
+    with metricas.etapa('render'):
+        graph_html = fig.to_html(full_html = False, include_plotlyjs=estaticos.url_plotly())
     return  render_template_string('''
     <html>
         <head>
@@ -385,37 +461,174 @@ def correlacao():
     </html>
     ''', grafico_correlacao = graph_html)
 
-@app.route('/insights_3d')
-def insights_3d():
-    with sqlite3.connect(DB_PATH) as conn:
-        inad_df = pd.read_sql_query('SELECT * FROM inadimplencia', conn)
-        selic_df = pd.read_sql_query('SELECT * FROM selic', conn)
+# Correlação movel (janela de N meses) para cada defasagem da Selic em relação à inadimplencia
+# ?janela=24&defasagem_max=24  (os mesmos dados em JSON: /api/correlacao)
+@paginas.route('/correlacao_movel')
+# (na chave, valor que não é inteiro conta como ausente: a view usa o padrão nos dois casos)
+@resposta_em_cache('correlacao_movel', parametros=lambda args: (args.get('janela', type=int), args.get('defasagem_max', type=int)))
+def correlacao_movel():
+    import plotly.graph_objs as go
+    import correlacoes
+
+    with banco.conectar() as conn:
+        merged = cache_dados.dados_mensais(conn).merged
+    janela, defasagens, erro = correlacoes.ler_parametros(request.args, len(merged))
+    if erro:
+        return jsonify({'Erro': erro}), 400
+    with metricas.etapa('model_fit'):
+        analise = correlacoes.analisar(merged, janela, defasagens)
+
+    # mapa de calor: meses (fim da janela) x defasagem
+    fig1 = go.Figure(go.Heatmap(
+        x = analise['mes'],
+        y = defasagens,
+        z = analise['movel'],
+        zmin = -1,
+        zmax = 1,
+        colorscale = 'RdBu',
+        reversescale = True,
+        colorbar = dict(title='Correlação'),
+        hovertemplate = 'Fim da janela: %{x}<br>Defasagem: %{y} meses<br>Correlação: %{z:.2f}<extra></extra>'
+    ))
+    fig1.update_layout(
+        title = f'Correlação movel ({janela} meses) entre Selic defasada e Inadimplencia',
+        xaxis_title = 'Mês (fim da janela)',
+        yaxis_title = 'Selic adiantada em (meses)',
+        template = 'plotly_white'
+    )
 
-    # merge (unir as duas tabelas de dados)
-    merged = pd.merge(inad_df, selic_df, on='mes').sort_values('mes')
-    merged['mes_idx'] = range(len(merged))
+    # correlação da serie inteira por defasagem
+    fig2 = go.Figure(go.Bar(
+        x = defasagens,
+        y = analise['defasada'],
+        marker_color = ['crimson' if k == analise['melhor_defasagem'] else 'steelblue' for k in defasagens],
+        hovertemplate = 'Defasagem: %{x} meses<br>Correlação: %{y:.2f}<extra></extra>'
+    ))
+    fig2.update_layout(
+        title = f"Correlação por defasagem (mais forte: {analise['melhor_defasagem']} meses)",
+        xaxis_title = 'Selic adiantada em (meses)',
+        yaxis_title = 'Correlação',
+        yaxis = dict(range=[-1, 1]),
+        template = 'plotly_white'
+    )
 
-    # tendencia de inadimplencia (diferença mês a mês)
-    merged['tend_inad'] = merged['inadimplencia'].diff().fillna(0)
-    trend_color = ['subiu' if x > 0  else 'caiu' if x < 0  else 'estavel' for x in merged['tend_inad']] 
+    with metricas.etapa('render'):
+        graph_html1 = fig1.to_html(full_html = False, include_plotlyjs=estaticos.url_plotly())
+        graph_html2 = fig2.to_html(full_html = False, include_plotlyjs=False)
+    return render_template_string('''
+    <html>
+        <head>
+            <title>Correlação Movel e Defasada</title>
+            <style>
+                body{ font-family: Arial; color: #333; }
+                .container{ width:90%; margin: auto; text-align: center; }
+                a{ text-decoration:none; color: #007bff; }
+                a:hover{ text-decoration: underline; }
+            </style>
+        </head>
+        <body>
+            <div class='container'>
+                <h1> Correlação Movel e Defasada entre Selic e Inadimplencia</h1>
+                <form method='GET' action='/correlacao_movel'>
+                    <label>Janela (meses):</label>
+                    <input type='number' name='janela' value='{{ janela }}' min='3'>
+                    <label>Defasagem maxima (meses):</label>
+                    <input type='number' name='defasagem_max' value='{{ defasagem_max }}' min='0'>
+                    <input type='submit' value='Atualizar'>
+                </form>
+                <div> {{ grafico1 | safe }} </div>
+                <div> {{ grafico2 | safe }} </div>
+                <a href='/api/correlacao?janela={{ janela }}&defasagem_max={{ defasagem_max }}'> Dados em JSON </a> <br>
+                <a href='/'> Voltar </a>
+            </div>
+        </body>
+    </html>
+    ''', grafico1 = graph_html1, grafico2 = graph_html2, janela = janela, defasagem_max = defasagens[-1])
 
-    # Derivadas Discretas
-    merged['var_inad'] = merged['inadimplencia'].diff().fillna(0)
-    merged['var_selic'] = merged['selic_diaria'].diff().fillna(0)
+@paginas.route('/insights_3d')
+@resposta_em_cache('insights_3d')
+def insights_3d():
+    # o calculo (clusters, regressão e o grafico) roda na fila de tarefas; a mesma versão
+    # dos dados reaproveita o resultado da tarefa que já rodou
+    with banco.conectar() as conn:
+        versao = cache_dados.versao_atual(conn)
+    tarefa_id = tarefas.fila.enviar('insights_3d', calcular_insights_3d, chave=f'insights_3d-{versao}')
+    if request.args.get('esperar'):
+        tarefa = tarefas.fila.esperar(tarefa_id)
+    else:
+        tarefa = tarefas.fila.obter(tarefa_id)
+    if tarefa['estado'] == 'erro':
+        return jsonify({'Erro': tarefa['erro']}), 500
+    if tarefa['estado'] != 'concluida':
+        return render_template_string('''
+            <html>
+                <head>
+                    <meta http-equiv='refresh' content='2'>
+                    <title> Insights Economicos 3D </title>
+                </head>
+                <body style='font-family:Arial; text-align:center;'>
+                    <h1>Calculando os insights...</h1>
+                    <p>A pagina atualiza sozinha. Status: <a href='{{ status }}'>{{ status }}</a></p>
+                    <a href='/'>Voltar</a>
+                </body>
+            </html>
+        ''', status = url_for('.status_tarefa', tarefa_id=tarefa_id)), 202
+    graph_html = tarefa['resultado']
+    return render_template_string('''
+        <html>
+            <head>
+                <title> Insights Economicos 3D ☻ </title>
+                <style>
+                    body{
+                        font-family:Arial;
+                        background-color: #f8f9fa;
+                        color:#222;
+                        text-align:center;
+                    }
+                    .container{ width:95%; margin: auto; }
+                    a{text-decoration:none; color:#007bff;}
+                    a:hover{text-decoration:underline;}
+                    h1{margin-top: 40px;}
+                </style>
+            </head>
+            <body>
+                <div class='container'>
+                    <h1>Grafico 3d com Insights Economicos</h1>
+                    <p>Analise visual com clusters, tendencias, e plano de regressão.</p>
+                    <div>{{ grafico | safe }}</div>
+                    <a href='/'>Voltar</a>
+                    <p>Feito com carinho por <b>Seu nome ♥</b> </p>
+                </div>
+            </body>
+        </html>        
+    ''', grafico = graph_html)
+
+# Clusters, regressão e o grafico 3d (roda na fila de tarefas, devolve o html do grafico)
+def calcular_insights_3d():
+    import numpy as np
+    import plotly.graph_objs as go
+    import modelos
+
+    # dados já unidos, ordenados e com as derivadas discretas (var_inad, var_selic) vindos do cache
+    with banco.conectar() as conn:
+        versao = cache_dados.versao_atual(conn)
+        merged = cache_dados.dados_mensais(conn).merged.copy()
+        # clusters e plano de regressão salvos no banco: só os meses novos são incorporados
+        with metricas.etapa('model_fit'):
+            modelo, como = modelos.modelo_insights(conn, merged, versao)
+    if como != 'salvo':
+        with metricas.etapa('db_write'):
+            banco.escrever(modelos.salvar, 'insights_3d', versao, modelo)
 
-    #clustering
-    features = merged[['selic_diaria', 'inadimplencia']].copy()
-    scaler = StandardScaler()
-    scaler_features = scaler.fit_transform(features)
+    # tendencia de inadimplencia (diferença mês a mês)
+    trend_color = ['subiu' if x > 0  else 'caiu' if x < 0  else 'estavel' for x in merged['var_inad']] 
 
-    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-    merged['cluster'] = kmeans.fit_predict(scaler_features)
+    with metricas.etapa('model_fit'):
+        #clustering
+        merged['cluster'] = modelo.rotulos(merged)
 
-    # Plano de Regressão 3D
-    X = merged[['mes_idx','selic_diaria']].values
-    Y = merged['inadimplencia'].values
-    A = np.c_[X, np.ones(X.shape[0])]
-    coeffs, _, _,_ = np.linalg.lstsq(A, Y, rcond=None)
+        # Plano de Regressão 3D
+        coeffs = modelo.coeficientes()
 
     # Malha para o plano 3D
     xi = np.linspace(merged['mes_idx'].min(),merged['mes_idx'].max(), 30)
@@ -463,39 +676,43 @@ def insights_3d():
         margin=dict(l=0, r=0, t=50, b=0),
         height = 800 
     )
-    graph_html = fig.to_html(full_html = False, include_plotlyjs='cdn')
-
-    return render_template_string('''
-        <html>
-            <head>
-                <title> Insights Economicos 3D ☻ </title>
-                <style>
-                    body{
-                        font-family:Arial;
-                        background-color: #f8f9fa;
-                        color:#222;
-                        text-align:center;
-                    }
-                    .container{ width:95%; margin: auto; }
-                    a{text-decoration:none; color:#007bff;}
-                    a:hover{text-decoration:underline;}
-                    h1{margin-top: 40px;}
-                </style>
-            </head>
-            <body>
-                <div class='container'>
-                    <h1>Grafico 3d com Insights Economicos</h1>
-                    <p>Analise visual com clusters, tendencias, e plano de regressão.</p>
-                    <div>{{ grafico | safe }}</div>
-                    <a href='/'>Voltar</a>
-                    <p>Feito com carinho por <b>Seu nome ♥</b> </p>
-                </div>
-            </body>
-        </html>        
-    ''', grafico = graph_html)
+    with metricas.etapa('render'):
+        return fig.to_html(full_html = False, include_plotlyjs=estaticos.url_plotly())
+
+# Monta o app Flask. Com aquecer=True os modulos pesados e os caches são carregados numa
+# thread em segundo plano, para a primeira requisição de grafico não pagar por eles
+# (o servidor.py chama o pre_aquecer direto, antes do fork dos workers)
+def criar_app(aquecer=config.PRE_AQUECER):
+    app = Flask(__name__)
+    app.register_blueprint(paginas)
+    app.register_blueprint(api)
+    app.register_blueprint(estaticos.estaticos)
+    # /metrics, tempo de cada rota e perfil opcional por requisição
+    metricas.instrumentar(app)
+    if aquecer:
+        threading.Thread(target=pre_aquecer, name='pre_aquecer', daemon=True).start()
+    return app
+
+def pre_aquecer():
+    inicio = time.perf_counter()
+    for modulo in MODULOS_PESADOS:
+        importlib.import_module(modulo)
+    # series mensais em memoria e o plotly.min.js publicado
+    with metricas.rota('pre_aquecer'), banco.conectar() as conn:
+        cache_dados.dados_mensais(conn)
+    estaticos.url_plotly()
+    print(f'Modulos pesados e caches carregados em {time.perf_counter() - inicio:.2f}s')
+
+# Pontos de entrada para ferramentas de fora: `flask --app main routes` e `gunicorn main:app`
+# acham o `app`; `flask --app main run` e `gunicorn 'main:create_app()'` também acham a fabrica.
+# Montar o app aqui é barato (os modulos pesados só carregam nas rotas ou no pre-aquecimento).
+# O banco não é criado aqui: python main.py e servidor.py chamam o init_db
+create_app = criar_app
+app = criar_app(aquecer=False)
 
 if __name__ == '__main__' :
     init_db()
+    app = criar_app()
     app.run(
         host = config.FLASK_HOST,
         port = config.FLASK_PORT,
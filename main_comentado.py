@@ -1,10 +1,11 @@
 from sklearn.cluster import KMeans  # Importa o algoritmo de agrupamento KMeans
 from sklearn.preprocessing import StandardScaler  # Importa o normalizador de dados para padronização
+import banco  # Pool de conexões com o SQLite (WAL), compartilhado com o main.py
 
 @app.route('/insights_3d')
 def insights_3d():
-    # Abrimos o banco de dados SQLite para leitura das tabelas salvas
-    with sqlite3.connect(DB_PATH) as conn:
+    # Pegamos uma conexão do pool do SQLite para leitura das tabelas salvas (ela volta para o pool no fim do with)
+    with banco.conectar() as conn:
         inad_df = pd.read_sql_query("SELECT * FROM inadimplencia", conn)  # Lê os dados de inadimplência
         selic_df = pd.read_sql_query("SELECT * FROM selic", conn)  # Lê os dados da taxa SELIC
 
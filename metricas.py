@@ -0,0 +1,201 @@
+import contextvars
+import cProfile
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Blueprint, Response, g, request
+
+import config
+
+# Metricas no formato texto do Prometheus para os apps Flask, sem dependencia externa:
+#   flask_requisicoes_total{rota,metodo,status}       contador de requisições
+#   flask_requisicao_segundos{rota,metodo}            histograma de latencia
+#   flask_requisicoes_em_andamento{rota}              requisições em andamento agora
+#   flask_etapa_segundos{rota,etapa}                  histograma das etapas internas (db_read, merge, model_fit, render)
+# As etapas são marcadas no codigo com `with metricas.etapa('render'):`; a rota vem da
+# requisição atual ou de `with metricas.rota(...)` (tarefas em segundo plano).
+# Cada processo tem seus proprios numeros.
+#
+# Perfil: com METRICAS_PERFIL_HABILITADO, uma requisição com o cabeçalho METRICAS_HEADER_PERFIL
+# roda sob cProfile e o .prof vai para METRICAS_PERFIL_DIR (caminho no cabeçalho X-Profile-Arquivo).
+#
+# Uso: metricas.instrumentar(app)
+
+BALDES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_rota_atual = contextvars.ContextVar('rota', default='-')
+
+
+class Histograma:
+    def __init__(self, nome, ajuda, rotulos):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valores, segundos):
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * len(BALDES), 0.0, 0]
+            for i, limite in enumerate(BALDES):
+                if segundos <= limite:
+                    serie[0][i] += 1
+            serie[1] += segundos
+            serie[2] += 1
+
+    def exportar(self):
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} histogram']
+        with self._lock:
+            series = {valores: (list(baldes), soma, total) for valores, (baldes, soma, total) in self._series.items()}
+        for valores, (baldes, soma, total) in sorted(series.items()):
+            rotulos = _rotulos(self.rotulos, valores)
+            for limite, contagem in zip(BALDES, baldes):
+                linhas.append(f'{self.nome}_bucket{{{rotulos},le="{limite}"}} {contagem}')
+            linhas.append(f'{self.nome}_bucket{{{rotulos},le="+Inf"}} {total}')
+            linhas.append(f'{self.nome}_sum{{{rotulos}}} {soma:.6f}')
+            linhas.append(f'{self.nome}_count{{{rotulos}}} {total}')
+        return linhas
+
+
+class Contador:
+    def __init__(self, nome, ajuda, rotulos, tipo='counter'):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.tipo = tipo
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def somar(self, valores, quantidade=1):
+        with self._lock:
+            self._series[valores] = self._series.get(valores, 0) + quantidade
+
+    def exportar(self):
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} {self.tipo}']
+        with self._lock:
+            series = dict(self._series)
+        for valores, total in sorted(series.items()):
+            linhas.append(f'{self.nome}{{{_rotulos(self.rotulos, valores)}}} {total}')
+        return linhas
+
+
+def _rotulos(nomes, valores):
+    return ','.join(
+        f'{nome}="{str(valor).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for nome, valor in zip(nomes, valores)
+    )
+
+
+requisicoes = Contador('flask_requisicoes_total', 'Requisições atendidas', ('rota', 'metodo', 'status'))
+latencia = Histograma('flask_requisicao_segundos', 'Tempo de resposta das rotas', ('rota', 'metodo'))
+em_andamento = Contador('flask_requisicoes_em_andamento', 'Requisições em andamento', ('rota',), tipo='gauge')
+etapas = Histograma('flask_etapa_segundos', 'Tempo das etapas internas das rotas', ('rota', 'etapa'))
+
+METRICAS = (requisicoes, latencia, em_andamento, etapas)
+
+
+# Mede um trecho da rota (db_read, merge, model_fit, render, ...)
+@contextmanager
+def etapa(nome):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        etapas.observar((_rota_atual.get(), nome), time.perf_counter() - inicio)
+
+
+# Rotulo de rota para etapas fora de uma requisição (tarefas em segundo plano)
+@contextmanager
+def rota(nome):
+    token = _rota_atual.set(nome)
+    try:
+        yield
+    finally:
+        _rota_atual.reset(token)
+
+
+def exportar():
+    linhas = []
+    for metrica in METRICAS:
+        linhas.extend(metrica.exportar())
+    return '\n'.join(linhas) + '\n'
+
+
+bp = Blueprint('metricas', __name__)
+
+
+@bp.route('/metrics')
+def metrics():
+    return Response(exportar(), mimetype='text/plain; version=0.0.4')
+
+
+def _rota_da_requisicao():
+    # o padrão da rota (/jobs/<tarefa_id>), não a URL, para não criar uma serie por id
+    return request.url_rule.rule if request.url_rule else 'desconhecida'
+
+
+def _antes():
+    g.metricas_rota = _rota_da_requisicao()
+    g.metricas_inicio = time.perf_counter()
+    g.metricas_token = _rota_atual.set(g.metricas_rota)
+    em_andamento.somar((g.metricas_rota,), 1)
+    if config.METRICAS_PERFIL_HABILITADO and request.headers.get(config.METRICAS_HEADER_PERFIL):
+        g.metricas_perfil = cProfile.Profile()
+        g.metricas_perfil.enable()
+
+
+def _depois(response):
+    perfil = g.pop('metricas_perfil', None)
+    if perfil:
+        perfil.disable()
+        os.makedirs(config.METRICAS_PERFIL_DIR, exist_ok=True)
+        arquivo = os.path.join(
+            config.METRICAS_PERFIL_DIR,
+            f"{request.endpoint or 'desconhecida'}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}.prof"
+        )
+        perfil.dump_stats(arquivo)
+        response.headers['X-Profile-Arquivo'] = arquivo
+
+    rota_atual, inicio, metodo, status = g.metricas_rota, g.metricas_inicio, request.method, response.status_code
+    # daqui em diante quem fecha a requisição nas metricas é o terminar(), não o _limpar
+    g.metricas_terminada = True
+
+    def terminar():
+        latencia.observar((rota_atual, metodo), time.perf_counter() - inicio)
+        requisicoes.somar((rota_atual, metodo, str(status)))
+        em_andamento.somar((rota_atual,), -1)
+    # respostas em streaming (/consultar) só terminam quando o corpo inteiro foi enviado
+    if response.is_streamed:
+        response.call_on_close(terminar)
+    else:
+        terminar()
+    return response
+
+
+# Roda sempre, mesmo quando a view levanta uma exceção e o after_request não roda (com
+# FLASK_DEBUG ligado a exceção sobe direto para o debugger): aí o perfil é desligado e a
+# requisição sai do em_andamento aqui, contada como 500
+def _limpar(erro=None):
+    perfil = g.pop('metricas_perfil', None)
+    if perfil:
+        perfil.disable()
+    if 'metricas_rota' in g and not g.pop('metricas_terminada', False):
+        rota_atual = g.metricas_rota
+        latencia.observar((rota_atual, request.method), time.perf_counter() - g.metricas_inicio)
+        requisicoes.somar((rota_atual, request.method, '500'))
+        em_andamento.somar((rota_atual,), -1)
+    token = g.pop('metricas_token', None)
+    if token is not None:
+        _rota_atual.reset(token)
+
+
+def instrumentar(app):
+    app.before_request(_antes)
+    app.after_request(_depois)
+    app.teardown_request(_limpar)
+    app.register_blueprint(bp)
+    return app
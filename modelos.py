@@ -0,0 +1,173 @@
+import json
+import time
+
+import numpy as np
+
+import config
+
+# Modelos do /insights_3d (normalização, KMeans e plano de regressão) guardados no banco,
+# com a versão dos dados em que foram calculados. Quando só entram meses novos no fim da
+# serie, o modelo salvo é atualizado com eles em vez de recalculado do zero:
+#   - normalização: media e variancia acumuladas (Welford)
+#   - KMeans: atualização mini-batch dos centroides, com contagem por centroide
+#   - regressão: soma de atualizações de posto 1 nas equações normais (X'X e X'y)
+# Se algum mês antigo mudou, ou se os meses novos ficam longe dos centroides (drift),
+# ou se já entrou muito dado desde o ultimo ajuste completo, faz o ajuste completo.
+
+COLUNAS_CLUSTER = ['selic_diaria', 'inadimplencia']
+N_CLUSTERS = 3
+
+
+def preparar(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS modelos(
+            nome TEXT PRIMARY KEY,
+            versao INTEGER NOT NULL,
+            estado TEXT NOT NULL,
+            atualizado_em REAL
+        )
+    ''')
+
+
+# Linhas da regressão: [mes_idx, selic, 1]
+def _matriz_regressao(merged):
+    return np.c_[merged[['mes_idx', 'selic_diaria']].to_numpy(dtype=float), np.ones(len(merged))]
+
+
+class ModeloInsights:
+    def __init__(self, estado):
+        self.estado = estado
+
+    # Ajuste completo (o mesmo que o /insights_3d fazia a cada requisição)
+    @classmethod
+    def ajustar(cls, merged):
+        # o sklearn só é importado aqui: sozinho ele leva mais de 1s para carregar
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+
+        features = merged[COLUNAS_CLUSTER].to_numpy(dtype=float)
+        scaler = StandardScaler().fit(features)
+        kmeans = KMeans(n_clusters=N_CLUSTERS, random_state=42, n_init=10).fit(scaler.transform(features))
+        rotulos = kmeans.labels_
+        A = _matriz_regressao(merged)
+        return cls({
+            'meses': len(merged),
+            'ultimo_mes': merged['mes'].iloc[-1],
+            'media': scaler.mean_.tolist(),
+            'm2': (scaler.var_ * len(merged)).tolist(),
+            # centroides na escala original: continuam validos quando a normalização muda
+            'centroides': scaler.inverse_transform(kmeans.cluster_centers_).tolist(),
+            'contagens': np.bincount(rotulos, minlength=N_CLUSTERS).tolist(),
+            'inercia_media': kmeans.inertia_ / len(merged),
+            'xtx': (A.T @ A).tolist(),
+            'xty': (A.T @ merged['inadimplencia'].to_numpy(dtype=float)).tolist(),
+            'incrementais': 0,
+            'ajustado_em': time.time()
+        })
+
+    def _escalar(self, features):
+        desvio = np.sqrt(np.asarray(self.estado['m2']) / self.estado['meses'])
+        desvio[desvio == 0] = 1.0
+        return (features - np.asarray(self.estado['media'])) / desvio
+
+    def _distancias(self, features):
+        pontos = self._escalar(features)
+        centroides = self._escalar(np.asarray(self.estado['centroides']))
+        return ((pontos[:, None, :] - centroides[None, :, :]) ** 2).sum(axis=2)
+
+    # Acrescenta os meses novos (linhas do merged depois de ultimo_mes) ao modelo.
+    # Devolve a razão entre a distancia media dos novos aos centroides e a do ultimo ajuste
+    # completo, calculada antes de mover os centroides (>1: os meses novos encaixam pior)
+    def incorporar(self, novos):
+        estado = self.estado
+        features = novos[COLUNAS_CLUSTER].to_numpy(dtype=float)
+        drift = self._distancias(features).min(axis=1).mean() / max(estado['inercia_media'], 1e-12)
+
+        # media e variancia acumuladas, um mês de cada vez
+        media = np.asarray(estado['media'])
+        m2 = np.asarray(estado['m2'])
+        n = estado['meses']
+        for x in features:
+            n += 1
+            delta = x - media
+            media = media + delta / n
+            m2 = m2 + delta * (x - media)
+        estado.update(meses=n, media=media.tolist(), m2=m2.tolist())
+
+        # mini-batch: cada centroide anda na direção dos pontos atribuidos a ele, com passo 1/contagem
+        centroides = np.asarray(estado['centroides'])
+        contagens = np.asarray(estado['contagens'], dtype=float)
+        for x, rotulo in zip(features, self._distancias(features).argmin(axis=1)):
+            contagens[rotulo] += 1
+            centroides[rotulo] += (x - centroides[rotulo]) / contagens[rotulo]
+        estado.update(centroides=centroides.tolist(), contagens=contagens.astype(int).tolist())
+
+        # equações normais: X'X += a a', X'y += a y para cada linha nova
+        A = _matriz_regressao(novos)
+        estado['xtx'] = (np.asarray(estado['xtx']) + A.T @ A).tolist()
+        estado['xty'] = (np.asarray(estado['xty']) + A.T @ novos['inadimplencia'].to_numpy(dtype=float)).tolist()
+        estado['ultimo_mes'] = novos['mes'].iloc[-1]
+        estado['incrementais'] += len(novos)
+        return drift
+
+    def rotulos(self, merged):
+        return self._distancias(merged[COLUNAS_CLUSTER].to_numpy(dtype=float)).argmin(axis=1)
+
+    # Coeficientes do plano inadimplencia = c0*mes_idx + c1*selic + c2
+    def coeficientes(self):
+        coeffs, _, _, _ = np.linalg.lstsq(np.asarray(self.estado['xtx']), np.asarray(self.estado['xty']), rcond=None)
+        return coeffs
+
+
+def carregar(conn, nome):
+    try:
+        linha = conn.execute('SELECT versao, estado FROM modelos WHERE nome = ?', (nome,)).fetchone()
+    except Exception:
+        # banco sem a tabela de modelos ainda
+        return None, None
+    if not linha:
+        return None, None
+    return linha[0], ModeloInsights(json.loads(linha[1]))
+
+
+def salvar(conn, nome, versao, modelo):
+    preparar(conn)
+    conn.execute('''
+        INSERT INTO modelos (nome, versao, estado, atualizado_em) VALUES (?, ?, ?, ?)
+        ON CONFLICT(nome) DO UPDATE SET
+            versao = excluded.versao, estado = excluded.estado, atualizado_em = excluded.atualizado_em
+    ''', (nome, versao, json.dumps(modelo.estado), time.time()))
+
+
+# Algum mês já incluido no modelo mudou (ou foi removido) depois da versão do modelo?
+def _historico_alterado(conn, versao_modelo, ultimo_mes):
+    try:
+        return conn.execute(
+            'SELECT 1 FROM meses_alterados WHERE versao > ? AND mes <= ? LIMIT 1', (versao_modelo, ultimo_mes)
+        ).fetchone() is not None
+    except Exception:
+        return True
+
+
+# Devolve (modelo, como) para o merged na versão `versao` dos dados, onde como é
+# 'salvo', 'incremental' ou 'completo'; quem chama grava o modelo se não for 'salvo'
+def modelo_insights(conn, merged, versao, nome='insights_3d'):
+    versao_modelo, modelo = carregar(conn, nome)
+    if modelo is None:
+        return ModeloInsights.ajustar(merged), 'completo'
+    if versao_modelo == versao and modelo.estado['meses'] == len(merged):
+        return modelo, 'salvo'
+
+    ultimo_mes = modelo.estado['ultimo_mes']
+    antigos = int((merged['mes'] <= ultimo_mes).sum())
+    novos = merged[merged['mes'] > ultimo_mes]
+    if antigos != modelo.estado['meses'] or _historico_alterado(conn, versao_modelo, ultimo_mes):
+        return ModeloInsights.ajustar(merged), 'completo'
+    if novos.empty:
+        return modelo, 'incremental'
+
+    drift = modelo.incorporar(novos)
+    if (drift > config.MODELOS_LIMITE_DRIFT
+            or modelo.estado['incrementais'] > config.MODELOS_FRACAO_REAJUSTE * modelo.estado['meses']):
+        return ModeloInsights.ajustar(merged), 'completo'
+    return modelo, 'incremental'
@@ -0,0 +1,99 @@
+import csv
+import os
+import sqlite3
+
+import adorocinema
+import carga_filmes
+
+# Pipeline de coleta em streaming: coleta -> parse -> validação -> sinks.
+# Cada etapa é um gerador que puxa um lote por vez da anterior, então o proximo
+# lote só é baixado depois que todos os sinks gravaram o atual (back-pressure)
+# e a memoria fica limitada a um lote, não importa quantas paginas sejam coletadas.
+
+CAMPOS = ["Titulo", "Direção", "Nota", "Link", "Ano", "Categoria"]
+
+
+def validar(lotes):
+    for lote in lotes:
+        validos = []
+        for filme in lote:
+            if adorocinema.filme_valido(filme):
+                validos.append(filme)
+            else:
+                print(f"Filme incompleto ou erro na coleta de dados: {filme['Titulo']}")
+        yield validos
+
+
+# Grava no CSV no mesmo formato do df.to_csv antigo (utf-8-sig e tudo entre aspas).
+# anexar=True continua um arquivo existente, usado ao retomar uma coleta. Ao retomar, a
+# fronteira devolve as paginas que estavam em andamento, e os filmes delas podem já estar
+# no arquivo: os links já gravados são lidos e esses filmes não entram de novo (o SinkSQLite
+# resolve o mesmo caso com o upsert por link)
+class SinkCSV:
+    def __init__(self, caminho, anexar=False):
+        novo = not (anexar and os.path.exists(caminho) and os.path.getsize(caminho) > 0)
+        self.links = None if novo else self._links_gravados(caminho)
+        self.arquivo = open(caminho, 'w' if novo else 'a', newline='', encoding='utf-8-sig')
+        self.writer = csv.DictWriter(self.arquivo, fieldnames=CAMPOS, quoting=csv.QUOTE_ALL)
+        if novo:
+            self.writer.writeheader()
+        self.total = 0
+
+    @staticmethod
+    def _links_gravados(caminho):
+        with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+            return {linha.get('Link') for linha in csv.DictReader(arquivo)}
+
+    def escrever(self, lote):
+        if self.links is not None:
+            lote = [filme for filme in lote if filme['Link'] not in self.links]
+            self.links.update(filme['Link'] for filme in lote)
+        self.writer.writerows(lote)
+        self.arquivo.flush()
+        self.total += len(lote)
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+# Grava no SQLite com o upsert incremental do carga_filmes. A execução inteira é uma carga só
+# (uma linha em `cargas`, com a soma dos lotes), aberta no primeiro lote e fechada no fechar()
+class SinkSQLite:
+    def __init__(self, caminho=carga_filmes.DB_FILMES):
+        self.conn = sqlite3.connect(caminho)
+        carga_filmes.preparar_banco(self.conn)
+        self.total = 0
+        self.carga_id = None
+        self.contagem = {'inseridos': 0, 'atualizados': 0, 'ignorados': 0}
+
+    def escrever(self, lote):
+        if self.carga_id is None:
+            self.carga_id = carga_filmes.abrir_carga(self.conn)
+        for chave, valor in carga_filmes.carregar_filmes(self.conn, lote, self.carga_id).items():
+            self.contagem[chave] += valor
+        self.total += len(lote)
+
+    def fechar(self):
+        try:
+            if self.carga_id is not None:
+                carga_filmes.fechar_carga(self.conn, self.carga_id, self.contagem)
+                print(f"Carga {self.carga_id}: {self.contagem['inseridos']} inseridos, "
+                      f"{self.contagem['atualizados']} atualizados, {self.contagem['ignorados']} sem alteração")
+        finally:
+            self.conn.close()
+
+
+# Entrega cada lote a todos os sinks antes de pedir o proximo
+def executar(lotes, sinks):
+    total = 0
+    try:
+        for lote in lotes:
+            if not lote:
+                continue
+            for sink in sinks:
+                sink.escrever(lote)
+            total += len(lote)
+    finally:
+        for sink in sinks:
+            sink.fechar()
+    return total
@@ -0,0 +1,195 @@
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:  # pyarrow é opcional, sem ele só CSV e Excel
+    pyarrow = None
+
+# Gravação e leitura de tabelas (DataFrames) escolhidas pela extensão do arquivo.
+#   colunares: .parquet, .feather e .arrow (Arrow IPC, sem compressão, lido com mmap)
+#   texto:     .csv e .xlsx (Excel gravado em streaming, memoria constante)
+# As colunas em `categoricas` vão como dictionary (cada valor distinto gravado uma vez e
+# as linhas só com o indice) e voltam como category na leitura.
+# Na leitura, carregar('x.csv') usa o x.parquet / x.feather / x.arrow do lado se ele
+# existir e não for mais velho que o texto; só cai no CSV/Excel quando não há colunar.
+# Arquivos colunares com outro nome entram como alternativas: carregar('x.csv', 'y.parquet').
+# Novos formatos: @escritor('.ext') e @leitor('.ext').
+#
+# Uso: saida.gravar(df, 'dados.parquet', categoricas=['Cidade'])
+#      df = saida.carregar('dados.csv')
+
+COLUNARES = ('.parquet', '.feather', '.arrow')  # em ordem de preferencia na leitura
+EXCEL_MAX_LINHAS = 1_048_576  # contando a linha de cabeçalho
+EXCEL_MAX_COLUNAS = 16_384
+
+ESCRITORES = {}
+LEITORES = {}
+
+
+def escritor(extensao):
+    def registrar(funcao):
+        ESCRITORES[extensao] = funcao
+        return funcao
+    return registrar
+
+
+def leitor(extensao):
+    def registrar(funcao):
+        LEITORES[extensao] = funcao
+        return funcao
+    return registrar
+
+
+def _extensao(caminho):
+    return os.path.splitext(caminho)[1].lower()
+
+
+def _exigir_pyarrow(caminho):
+    if pyarrow is None:
+        raise RuntimeError(f'{caminho}: gravar e ler {_extensao(caminho)} precisa do pyarrow (pip install pyarrow)')
+
+
+@escritor('.parquet')
+def _gravar_parquet(df, caminho):
+    _exigir_pyarrow(caminho)
+    df.to_parquet(caminho, index=False, compression='zstd')
+
+
+@escritor('.feather')
+def _gravar_feather(df, caminho):
+    _exigir_pyarrow(caminho)
+    df.reset_index(drop=True).to_feather(caminho, compression='zstd')
+
+
+@escritor('.arrow')
+def _gravar_arrow(df, caminho):
+    _exigir_pyarrow(caminho)
+    tabela = pyarrow.Table.from_pandas(df, preserve_index=False)
+    with pyarrow.OSFile(caminho, 'wb') as arquivo, pyarrow.ipc.new_file(arquivo, tabela.schema) as writer:
+        writer.write_table(tabela)
+
+
+@escritor('.csv')
+def _gravar_csv(df, caminho):
+    df.to_csv(caminho, index=False)
+
+
+# O to_excel do pandas monta a planilha inteira em memoria (e escreve coluna por coluna);
+# aqui o xlsxwriter em constant_memory grava linha por linha direto no arquivo
+@escritor('.xlsx')
+def _gravar_excel(df, caminho):
+    import xlsxwriter
+
+    # o xlsxwriter não levanta erro fora dos limites da planilha, só ignora a celula
+    # (write_row devolve -1): as linhas a mais sumiriam sem aviso
+    if len(df) + 1 > EXCEL_MAX_LINHAS or df.shape[1] > EXCEL_MAX_COLUNAS:
+        raise ValueError(
+            f'{len(df)} linhas x {df.shape[1]} colunas não cabem numa planilha do Excel '
+            f'(máximo {EXCEL_MAX_LINHAS - 1} linhas + cabeçalho e {EXCEL_MAX_COLUNAS} colunas); use .parquet ou .csv'
+        )
+    with xlsxwriter.Workbook(caminho, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd hh:mm:ss'}) as planilha:
+        aba = planilha.add_worksheet()
+        negrito = planilha.add_format({'bold': True})
+        cabecalho = [coluna if isinstance(coluna, (str, int, float)) else str(coluna) for coluna in df.columns]
+        _escrever_linha(aba, 0, cabecalho, negrito)
+        # None vira celula vazia (NaN o Excel não aceita)
+        valores = df.astype(object).where(df.notna(), None)
+        for linha, registro in enumerate(valores.itertuples(index=False, name=None), start=1):
+            _escrever_linha(aba, linha, registro)
+
+
+def _escrever_linha(aba, linha, valores, formato=None):
+    # -1: fora dos limites; -2: texto maior que os 32767 caracteres de uma celula
+    retorno = aba.write_row(linha, 0, valores, formato)
+    if retorno:
+        raise ValueError(f'Linha {linha + 1} não pôde ser gravada no Excel (xlsxwriter devolveu {retorno})')
+
+
+@leitor('.parquet')
+def _ler_parquet(caminho, **opcoes):
+    _exigir_pyarrow(caminho)
+    return pd.read_parquet(caminho, **opcoes)
+
+
+@leitor('.feather')
+def _ler_feather(caminho, **opcoes):
+    _exigir_pyarrow(caminho)
+    return pd.read_feather(caminho, **opcoes)
+
+
+@leitor('.arrow')
+def _ler_arrow(caminho, **opcoes):
+    _exigir_pyarrow(caminho)
+    with pyarrow.memory_map(caminho) as arquivo:
+        return pyarrow.ipc.open_file(arquivo).read_pandas(**opcoes)
+
+
+@leitor('.csv')
+def _ler_csv(caminho, **opcoes):
+    return pd.read_csv(caminho, **opcoes)
+
+
+@leitor('.xlsx')
+def _ler_excel(caminho, **opcoes):
+    return pd.read_excel(caminho, **opcoes)
+
+
+def gravar(df, caminho, categoricas=()):
+    extensao = _extensao(caminho)
+    if extensao not in ESCRITORES:
+        raise ValueError(f'{caminho}: formato {extensao or "sem extensão"} não suportado ({", ".join(ESCRITORES)})')
+    categoricas = [coluna for coluna in categoricas if coluna in df.columns]
+    if categoricas:
+        df = df.astype({coluna: 'category' for coluna in categoricas})
+    temporario = f'{caminho}.{os.getpid()}.tmp{extensao}'
+    try:
+        ESCRITORES[extensao](df, temporario)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    # quem le nunca vê um arquivo pela metade
+    os.replace(temporario, caminho)
+    return caminho
+
+
+# Grava a mesma tabela em varios arquivos. Os colunares vão por ultimo: ficam com o mtime
+# mais novo e o carregar() passa a preferir eles aos de texto gravados agora
+def gravar_varios(df, caminhos, categoricas=()):
+    ordem = sorted(caminhos, key=lambda caminho: _extensao(caminho) in COLUNARES)
+    return [gravar(df, caminho, categoricas) for caminho in ordem]
+
+
+# O arquivo colunar que pode ser lido no lugar dos caminhos: um dos colunares passados ou
+# um irmão (mesmo nome, extensão colunar) dos de texto, que exista e não seja mais velho que
+# nenhum dos arquivos de texto
+def colunar_atualizado(*caminhos):
+    if pyarrow is None:
+        return None
+    textos = [caminho for caminho in caminhos if _extensao(caminho) not in COLUNARES]
+    candidatos = [caminho for caminho in caminhos if _extensao(caminho) in COLUNARES]
+    candidatos += [os.path.splitext(texto)[0] + colunar for texto in textos for colunar in COLUNARES]
+    candidatos.sort(key=lambda candidato: COLUNARES.index(_extensao(candidato)))
+    mtime_texto = max((os.path.getmtime(texto) for texto in textos if os.path.exists(texto)), default=float('-inf'))
+    for candidato in candidatos:
+        if os.path.exists(candidato) and os.path.getmtime(candidato) >= mtime_texto:
+            return candidato
+    return None
+
+
+# Le a tabela preferindo o arquivo colunar; senão o primeiro dos caminhos que existir.
+# `opcoes` só valem para o leitor de texto (no colunar os tipos já vêm gravados)
+def carregar(caminho, *alternativas, **opcoes):
+    colunar = colunar_atualizado(caminho, *alternativas)
+    if colunar:
+        return LEITORES[_extensao(colunar)](colunar)
+    existentes = [candidato for candidato in (caminho, *alternativas) if os.path.exists(candidato)]
+    if not existentes:
+        raise FileNotFoundError(f'Nenhum dos arquivos existe: {", ".join((caminho, *alternativas))}')
+    extensao = _extensao(existentes[0])
+    if extensao not in LEITORES:
+        raise ValueError(f'{existentes[0]}: formato {extensao or "sem extensão"} não suportado ({", ".join(LEITORES)})')
+    return LEITORES[extensao](existentes[0], **opcoes)
@@ -0,0 +1,83 @@
+# Servidor de produção para os apps Flask (no lugar do app.run de desenvolvimento), sobre o gunicorn:
+#   - pre-fork: o processo mestre importa o app, cria as tabelas e carrega os modulos pesados e
+#     os caches (main.pre_aquecer) antes do fork; os workers herdam tudo pronto e dividem essa
+#     memoria copy-on-write com o mestre
+#   - um worker por nucleo (config.SERVIDOR_WORKERS), cada um com SERVIDOR_THREADS threads
+#   - keep-alive: o cliente reaproveita a conexão por SERVIDOR_KEEPALIVE segundos
+#   - o mestre recria o worker que morrer ou travar (SERVIDOR_TIMEOUT)
+#
+# Uso: pip install gunicorn
+#      python servidor.py [modulo[:atributo]]      (padrão: main)
+#      SERVIDOR_PORTA=8080 SERVIDOR_WORKERS=4 python servidor.py super_bugs
+# Apps com criar_app() são montados por ele; os outros pelo atributo (padrão `app`).
+# O /metrics continua por processo: cada worker responde os seus numeros.
+import gc
+import importlib
+import os
+import sys
+
+from gunicorn.app.base import BaseApplication
+
+import config
+
+
+def numero_de_workers():
+    if config.SERVIDOR_WORKERS > 0:
+        return config.SERVIDOR_WORKERS
+    # nucleos que este processo pode usar (respeita taskset/cgroup), não os da maquina toda
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def carregar_app(alvo):
+    nome, _, atributo = alvo.partition(':')
+    modulo = importlib.import_module(nome)
+    if hasattr(modulo, 'init_db'):
+        modulo.init_db()
+    if atributo:
+        app = getattr(modulo, atributo)
+    elif hasattr(modulo, 'criar_app'):
+        # o pre-aquecimento roda aqui mesmo, antes do fork, e não numa thread
+        app = modulo.criar_app(aquecer=False)
+    else:
+        app = modulo.app
+    if hasattr(modulo, 'pre_aquecer'):
+        modulo.pre_aquecer()
+    return app
+
+
+class Servidor(BaseApplication):
+    def __init__(self, alvo='main'):
+        self.alvo = alvo
+        super().__init__()
+
+    def load_config(self):
+        opcoes = {
+            'bind': f'{config.SERVIDOR_HOST}:{config.SERVIDOR_PORTA}',
+            'workers': numero_de_workers(),
+            # gthread: threads por worker e conexões keep-alive (o worker sync fecha toda conexão)
+            'worker_class': 'gthread',
+            'threads': config.SERVIDOR_THREADS,
+            'keepalive': config.SERVIDOR_KEEPALIVE,
+            'backlog': config.SERVIDOR_BACKLOG,
+            'timeout': config.SERVIDOR_TIMEOUT,
+            'preload_app': True,
+            'accesslog': '-' if config.SERVIDOR_LOG_ACESSO else None,
+            'proc_name': f'servidor:{self.alvo}',
+        }
+        for chave, valor in opcoes.items():
+            self.cfg.set(chave, valor)
+
+    # com preload_app roda uma vez, no mestre, antes do fork
+    def load(self):
+        app = carregar_app(self.alvo)
+        # o que foi carregado até aqui não muda mais: tirar do coletor de lixo evita que ele
+        # escreva nessas paginas nos workers e desfaça o compartilhamento copy-on-write
+        gc.collect()
+        gc.freeze()
+        return app
+
+
+if __name__ == '__main__':
+    Servidor(*sys.argv[1:2]).run()
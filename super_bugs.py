@@ -1,30 +1,35 @@
 import config 
+import banco
+import ingestao
+import metricas
 import pandas as pd
-import sqlite3
 import os
 from flask import Flask, request, jsonify, render_template_string
 
 app = Flask(__name__)
+# /metrics com o tempo das rotas
+metricas.instrumentar(app)
 
 DB_PATH = config.DB_PATH
 
 # Função para inicializar o banco de dados SQL
 def init_db():
-    with sqlite3.connect(DB_PATH) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS inadimplencia(
-                mes TEXT PRIMARY KEY,
-                inadimplencia REAL 
-                )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS selic (
-                mes TEXT PRIMARY KEY,
-                selic_diaria REAL
-                )
-        ''')
-        conn.commit()
+    banco.escrever(criar_tabelas)
+
+def criar_tabelas(conn):
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS inadimplencia(
+            mes TEXT PRIMARY KEY,
+            inadimplencia REAL 
+            )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS selic (
+            mes TEXT PRIMARY KEY,
+            selic_diaria REAL
+            )
+    ''')
 
 #EM breve =)
 vazio = 0
@@ -78,10 +83,11 @@ def upload():
     inad_mensal = inad_df[['mes','inadimplencia']].drop_duplicates()
     selic_mensal = selic_df.groupby('mes')['selic_diaria'].mean().reset_index()
 
-    # agora com tudo limpo e ordenado vamos armazenar no banco de dados
-    with sqlite3.connect(DB_PATH) as conn:
-        inad_mensal.to_sql('inadimplencia', conn, if_exists='replace', index=False)
-        selic_mensal.to_sql('selic', conn, if_exists='replace', index=False)
+    # agora com tudo limpo e ordenado vamos armazenar no banco de dados.
+    # As duas tabelas ficam com o conteudo dos arquivos (substituir=True apaga os meses que não
+    # vieram) na mesma transação do banco.escrever: se a segunda falhar, nenhuma muda.
+    # O banco é o mesmo do main.py: a versão dos dados sobe junto e os caches dele se atualizam
+    banco.escrever(ingestao.gravar_series, inad_mensal, selic_mensal, True)
     return jsonify({'Mensagem':'Dados inseridos com sucesso!'})
 
 @app.route('/consultar', methods=['POST','GET'])
@@ -91,7 +97,7 @@ def consultar():
         tabela = request.form.get('campo_tabela')
         if tabela not in ['inadimplencia','selic']:
             return jsonify({'Erro':'Tabela é invalida'})
-        with sqlite3.connect(DB_PATH) as conn:
+        with banco.conectar() as conn:
             df = pd.read_sql_query(f'SELECT * FROM {tabela}', conn)
         return df.to_html(index=False)
 
@@ -112,4 +118,10 @@ def consultar():
 
 if __name__ == '__main__' :
     init_db()
-    app.run(debug=True)
+    app.run(
+        host = config.FLASK_HOST,
+        port = config.FLASK_PORT,
+        debug = config.FLASK_DEBUG,
+        threaded = config.FLASK_THREADED,
+        use_reloader = config.FLASK_USER_RELOADER
+    )
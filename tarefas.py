@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import banco
+import config
+import metricas
+
+# Fila local de tarefas em segundo plano para o main.py (upload e graficos pesados).
+# As tarefas rodam num pool de threads e o estado de cada uma (pendente, executando,
+# concluida, erro) fica gravado no SQLite, então qualquer processo do servidor consegue
+# responder o /jobs/<id>. Tarefas com a mesma `chave` são reaproveitadas: se já existe
+# uma pendente, executando ou concluida, devolvemos o id dela em vez de rodar de novo.
+# Cada tarefa guarda o pid e a identidade do processo que a roda (boot do sistema + instante
+# em que o processo começou): uma tarefa pendente de um processo que morreu, ou cujo pid foi
+# reaproveitado (o PID 1 de um container reiniciado), é marcada como erro em vez de reaproveitada.
+# Tarefas terminadas há mais de TAREFAS_RETENCAO_HORAS são apagadas.
+
+ESTADOS_ATIVOS = ('pendente', 'executando', 'concluida')
+
+
+def preparar(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tarefas(
+            id TEXT PRIMARY KEY,
+            tipo TEXT,
+            chave TEXT,
+            estado TEXT,
+            processo INTEGER,
+            processo_identidade TEXT,
+            criada_em REAL,
+            iniciada_em REAL,
+            concluida_em REAL,
+            resultado TEXT,
+            erro TEXT
+        )
+    ''')
+    colunas = [linha[1] for linha in conn.execute('PRAGMA table_info(tarefas)')]
+    if 'processo_identidade' not in colunas:
+        conn.execute('ALTER TABLE tarefas ADD COLUMN processo_identidade TEXT')
+    conn.execute('CREATE INDEX IF NOT EXISTS ix_tarefas_chave ON tarefas(chave)')
+
+
+# boot_id + instante de inicio do processo (em ticks desde o boot): juntos não se repetem,
+# mesmo quando o pid se repete. None fora do Linux, aí só o pid é conferido
+def identidade_processo(pid):
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as arquivo:
+            boot = arquivo.read().strip()
+        with open(f'/proc/{pid}/stat') as arquivo:
+            # o nome do processo (entre parenteses) pode ter espaços; o inicio é o campo 22
+            inicio = arquivo.read().rpartition(')')[2].split()[19]
+    except (OSError, IndexError):
+        return None
+    return f'{boot}:{inicio}'
+
+
+def _processo_vivo(pid, identidade=None):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    if identidade is None:
+        return True
+    atual = identidade_processo(pid)
+    return atual is None or atual == identidade
+
+
+def _interromper(conn, tarefa_id):
+    conn.execute(
+        "UPDATE tarefas SET estado = 'erro', erro = 'Interrompida', concluida_em = ? WHERE id = ?", (time.time(), tarefa_id)
+    )
+
+
+def _apagar_antigas(conn):
+    limite = time.time() - config.TAREFAS_RETENCAO_HORAS * 3600
+    conn.execute("DELETE FROM tarefas WHERE estado IN ('concluida', 'erro') AND concluida_em < ?", (limite,))
+
+
+class FilaTarefas:
+    def __init__(self, max_workers=config.TAREFAS_WORKERS):
+        self._executor = None
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._preparada = False
+
+    def _preparar(self):
+        if self._preparada:
+            return
+        banco.escrever(self._preparar_tabela)
+        self._preparada = True
+
+    def _preparar_tabela(self, conn):
+        preparar(conn)
+        # tarefas de um processo que morreu nunca vão terminar
+        for tarefa_id, processo, identidade in conn.execute(
+            "SELECT id, processo, processo_identidade FROM tarefas WHERE estado IN ('pendente', 'executando')"
+        ).fetchall():
+            if not _processo_vivo(processo, identidade):
+                _interromper(conn, tarefa_id)
+        _apagar_antigas(conn)
+
+    def _pool(self):
+        with self._lock:
+            self._preparar()
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='tarefa')
+            return self._executor
+
+    # Enfileira funcao(*args) e devolve o id da tarefa
+    def enviar(self, tipo, funcao, *args, chave=None):
+        pool = self._pool()
+        # a busca pela chave e a inserção ficam na mesma transação de escrita
+        tarefa_id, nova = banco.escrever(self._registrar, tipo, chave)
+        if nova:
+            pool.submit(self._executar, tarefa_id, tipo, funcao, args)
+        return tarefa_id
+
+    def _registrar(self, conn, tipo, chave):
+        _apagar_antigas(conn)
+        if chave:
+            existente = conn.execute(
+                "SELECT id, estado, processo, processo_identidade FROM tarefas"
+                f" WHERE chave = ? AND estado IN ({', '.join('?' * len(ESTADOS_ATIVOS))})"
+                " ORDER BY criada_em DESC LIMIT 1",
+                (chave, *ESTADOS_ATIVOS)
+            ).fetchone()
+            if existente:
+                tarefa_id, estado, processo, identidade = existente
+                # o processo pode ter morrido depois do _preparar_tabela deste (worker do
+                # gunicorn morto por timeout, container reiniciado): aí roda de novo
+                if estado == 'concluida' or _processo_vivo(processo, identidade):
+                    return tarefa_id, False
+                _interromper(conn, tarefa_id)
+        tarefa_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT INTO tarefas (id, tipo, chave, estado, processo, processo_identidade, criada_em)"
+            " VALUES (?, ?, ?, 'pendente', ?, ?, ?)",
+            (tarefa_id, tipo, chave, os.getpid(), identidade_processo(os.getpid()), time.time())
+        )
+        return tarefa_id, True
+
+    def _atualizar(self, tarefa_id, **campos):
+        banco.escrever(lambda conn: conn.execute(
+            f"UPDATE tarefas SET {', '.join(f'{campo} = ?' for campo in campos)} WHERE id = ?",
+            (*campos.values(), tarefa_id)
+        ))
+
+    def _executar(self, tarefa_id, tipo, funcao, args):
+        self._atualizar(tarefa_id, estado='executando', iniciada_em=time.time())
+        try:
+            # as etapas medidas dentro da tarefa aparecem no /metrics com rota="tarefa:<tipo>"
+            with metricas.rota(f'tarefa:{tipo}'):
+                resultado = funcao(*args)
+        except Exception as e:
+            traceback.print_exc()
+            self._atualizar(tarefa_id, estado='erro', erro=f'{type(e).__name__}: {e}', concluida_em=time.time())
+            return
+        self._atualizar(
+            tarefa_id, estado='concluida', resultado=json.dumps(resultado, ensure_ascii=False), concluida_em=time.time()
+        )
+
+    def obter(self, tarefa_id):
+        self._preparar()
+        with banco.conectar() as conn:
+            cursor = conn.execute('SELECT * FROM tarefas WHERE id = ?', (tarefa_id,))
+            linha = cursor.fetchone()
+        if not linha:
+            return None
+        tarefa = dict(zip([coluna[0] for coluna in cursor.description], linha))
+        tarefa['resultado'] = json.loads(tarefa['resultado']) if tarefa['resultado'] else None
+        return tarefa
+
+    # Espera a tarefa terminar (para quem precisa do resultado na hora, como scripts e testes)
+    def esperar(self, tarefa_id, timeout=300, intervalo=0.05):
+        limite = time.monotonic() + timeout
+        while True:
+            tarefa = self.obter(tarefa_id)
+            if tarefa is None or tarefa['estado'] in ('concluida', 'erro') or time.monotonic() > limite:
+                return tarefa
+            time.sleep(intervalo)
+
+
+fila = FilaTarefas()
@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+from flask import Flask
+
+import api_series
+import banco
+import cache_dados
+import config
+
+
+@pytest.fixture
+def cliente(tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'dados.db')
+    conn = sqlite3.connect(caminho)
+    conn.execute('CREATE TABLE selic (mes TEXT PRIMARY KEY, selic_diaria REAL)')
+    conn.executemany('INSERT INTO selic VALUES (?, ?)', [('2024-01', 0.04), ('2024-02', 0.05)])
+    cache_dados.nova_versao(conn)
+    cache_dados.registrar_alteracoes(conn, 'selic', ['2024-01', '2024-02'])
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(config, 'DB_PATH', caminho)
+    app = Flask(__name__)
+    app.register_blueprint(api_series.api)
+    yield app.test_client()
+    banco.fechar()
+
+
+def test_since_zero_e_delta(cliente):
+    dados = cliente.get('/api/series?name=selic&since=0').get_json()
+    assert dados['since'] == 0
+    assert dados['removidos'] == []
+    assert dados['mes'] == ['2024-01', '2024-02']
+
+
+def test_since_na_versao_atual_vem_vazio(cliente):
+    dados = cliente.get('/api/series?name=selic&since=1').get_json()
+    assert dados['since'] == 1
+    assert dados['mes'] == []
+
+
+def test_since_maior_que_a_versao_devolve_a_serie_inteira(cliente):
+    dados = cliente.get('/api/series?name=selic&since=50').get_json()
+    assert 'since' not in dados and 'removidos' not in dados
+    assert dados['version'] == 1
+    assert dados['mes'] == ['2024-01', '2024-02']
@@ -0,0 +1,69 @@
+import contextlib
+
+import pytest
+from flask import Flask, jsonify, request
+
+import cache_respostas
+import config
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    versao = {'atual': 1}
+    chamadas = []
+    monkeypatch.setattr(cache_respostas.banco, 'conectar', contextlib.nullcontext)
+    monkeypatch.setattr(cache_respostas.cache_dados, 'versao_atual', lambda conn: versao['atual'])
+    cache_respostas.limpar()
+
+    app = Flask(__name__)
+
+    @app.route('/pagina')
+    @cache_respostas.resposta_em_cache('pagina', parametros=lambda args: (args.get('largura', 1000, type=int),))
+    def pagina():
+        largura = request.args.get('largura', 1000, type=int)
+        if not 0 <= largura <= 10000:
+            return jsonify({'Erro': 'largura'}), 400
+        chamadas.append(largura)
+        return f'<p>{largura}</p>'
+
+    yield app.test_client(), chamadas, versao
+    cache_respostas.limpar()
+
+
+def test_chave_usa_os_valores_convertidos(cliente):
+    http, chamadas, _ = cliente
+    for consulta in ('largura=24', 'largura=024', 'largura=+24', 'largura=24&x='):
+        assert http.get(f'/pagina?{consulta}').data == b'<p>24</p>'
+    # valor invalido cai no padrão, igual a não mandar nada
+    http.get('/pagina?largura=abc')
+    http.get('/pagina')
+    assert chamadas == [24, 1000]
+    assert len(cache_respostas._entradas) == 2
+
+
+def test_resposta_invalida_nao_e_guardada(cliente):
+    http, chamadas, _ = cliente
+    assert http.get('/pagina?largura=-1').status_code == 400
+    assert http.get('/pagina?largura=-1').status_code == 400
+    assert chamadas == [] and len(cache_respostas._entradas) == 0
+
+
+def test_versao_nova_descarta_as_antigas(cliente):
+    http, _, versao = cliente
+    http.get('/pagina?largura=1')
+    http.get('/pagina?largura=2')
+    versao['atual'] = 2
+    http.get('/pagina?largura=3')
+    assert [chave[1] for chave in cache_respostas._entradas] == [(3,)]
+
+
+def test_limite_de_entradas_lru(cliente, monkeypatch):
+    http, chamadas, _ = cliente
+    monkeypatch.setattr(config, 'CACHE_RESPOSTAS_MAX_ENTRADAS', 2)
+    http.get('/pagina?largura=1')
+    http.get('/pagina?largura=2')
+    http.get('/pagina?largura=1')  # 1 passa a ser a mais recente
+    http.get('/pagina?largura=3')  # sai a 2
+    assert [chave[1] for chave in cache_respostas._entradas] == [(1,), (3,)]
+    http.get('/pagina?largura=1')
+    assert chamadas == [1, 2, 3]
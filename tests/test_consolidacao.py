@@ -0,0 +1,45 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import config
+import consolidacao
+
+
+@pytest.fixture
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'CONSOLIDACAO_CACHE_DIR', str(tmp_path / 'cache'))
+    return tmp_path
+
+
+def _planilha(caminho, linhas):
+    pd.DataFrame(linhas, columns=['Posição', 'Cliente']).to_excel(caminho, index=False)
+
+
+def test_mesmo_resultado_com_e_sem_cache(pasta):
+    # numero e texto na mesma coluna
+    _planilha(pasta / 'a.xlsx', [[1, 'Ejecta'], ['dois', 'Planetbiz'], [None, 'Powerbod']])
+    padrao = str(pasta / '*.xlsx')
+    sem_cache = consolidacao.consolidar(padrao, processos=1, usar_cache=False)
+    frio = consolidacao.consolidar(padrao, processos=1)
+    quente = consolidacao.consolidar(padrao, processos=1)
+    pd.testing.assert_frame_equal(sem_cache, frio)
+    pd.testing.assert_frame_equal(sem_cache, quente)
+    assert sem_cache['Posição'].tolist()[:2] == ['1', 'dois']
+    assert quente.attrs['consolidacao']['do_cache'] == 1
+
+
+def test_planilha_alterada_apaga_leitura_antiga(pasta):
+    caminho = pasta / 'a.xlsx'
+    _planilha(caminho, [[1, 'Ejecta']])
+    consolidacao.consolidar(str(caminho), processos=1)
+    antigos = set(os.listdir(config.CONSOLIDACAO_CACHE_DIR))
+    _planilha(caminho, [[1, 'Ejecta'], [2, 'Planetbiz']])
+    os.utime(caminho, ns=(0, 0))
+    assert len(consolidacao.consolidar(str(caminho), processos=1)) == 2
+    arquivos = set(os.listdir(config.CONSOLIDACAO_CACHE_DIR))
+    assert not (antigos - {'indice.json'}) & arquivos
+    with open(os.path.join(config.CONSOLIDACAO_CACHE_DIR, 'indice.json')) as indice:
+        assert len(json.load(indice)['leituras']) == 1
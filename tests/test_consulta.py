@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+from flask import Flask, request
+
+import banco
+import config
+import consulta
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    caminho = str(tmp_path / 'dados.db')
+    conn = sqlite3.connect(caminho)
+    conn.execute('CREATE TABLE selic (mes TEXT PRIMARY KEY, selic_diaria REAL)')
+    conn.executemany('INSERT INTO selic VALUES (?, ?)', [(f'2024-{mes:02d}', mes / 100) for mes in range(1, 13)])
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(config, 'DB_PATH', caminho)
+    yield banco.pool()
+    banco.fechar()
+
+
+def test_resposta_nunca_lida_devolve_a_conexao(pool):
+    response = consulta.resposta_em_stream('selic', 'csv')
+    assert pool._livres.qsize() == 0
+    response.close()
+    assert pool._livres.qsize() == 1
+
+
+@pytest.mark.parametrize('formato', consulta.FORMATOS)
+def test_resposta_lida_devolve_a_conexao_uma_vez(pool, formato):
+    response = consulta.resposta_em_stream('selic', formato, limite=5, url_proxima='/consultar?tabela=selic')
+    corpo = response.get_data(as_text=True)
+    response.close()
+    assert '2024-05' in corpo and '2024-06' not in corpo
+    assert pool._livres.qsize() == 1
+
+
+def test_head_devolve_a_conexao(pool):
+    app = Flask(__name__)
+
+    @app.route('/consultar', methods=['GET', 'HEAD'])
+    def consultar():
+        return consulta.resposta_em_stream('selic', request.args.get('formato', 'html'))
+
+    # o servidor WSGI sempre chama o close da resposta, mesmo sem ler o corpo
+    with app.test_client().head('/consultar?formato=ndjson') as response:
+        assert response.status_code == 200
+    assert pool._livres.qsize() == 1
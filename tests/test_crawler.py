@@ -0,0 +1,55 @@
+import requests
+
+from cache_http import CacheHTTP
+from crawler import Crawler
+
+
+def _resposta(status, corpo=b'', headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response._content = corpo
+    response.headers.update(headers or {})
+    response.encoding = 'utf-8'
+    return response
+
+
+class SessaoFalsa:
+    def __init__(self, respostas, ao_buscar=None):
+        self.respostas = list(respostas)
+        self.ao_buscar = ao_buscar
+        self.cabecalhos = []
+
+    def get(self, url, timeout=None, headers=None):
+        self.cabecalhos.append(dict(headers or {}))
+        if self.ao_buscar:
+            self.ao_buscar()
+        return self.respostas.pop(0)
+
+
+def test_304_com_entrada_removida_busca_de_novo_sem_condicionais(tmp_path):
+    cache = CacheHTTP(str(tmp_path / 'cache.db'), ttl=None, tamanho_maximo=None)
+    url = 'http://exemplo/filme'
+    cache.salvar(url, _resposta(200, b'antigo', {'ETag': '"v1"'}))
+
+    def podar():
+        # outra thread/processo limpou o cache entre os cabeçalhos e a resposta
+        cache.conn.execute('DELETE FROM respostas')
+        cache.conn.commit()
+
+    sessao = SessaoFalsa([_resposta(304), _resposta(200, b'novo', {'ETag': '"v2"'})], ao_buscar=podar)
+    response = Crawler(requisicoes_por_segundo=0, sessao=sessao, cache=cache).buscar(url)
+    assert response.status_code == 200
+    assert response.content == b'novo'
+    assert not response.do_cache
+    assert sessao.cabecalhos[0] == {'If-None-Match': '"v1"'}
+    assert sessao.cabecalhos[1] == {}
+
+
+def test_304_com_entrada_no_cache_devolve_o_corpo_guardado(tmp_path):
+    cache = CacheHTTP(str(tmp_path / 'cache.db'), ttl=None, tamanho_maximo=None)
+    url = 'http://exemplo/filme'
+    cache.salvar(url, _resposta(200, b'guardado', {'ETag': '"v1"'}))
+    sessao = SessaoFalsa([_resposta(304)])
+    response = Crawler(requisicoes_por_segundo=0, sessao=sessao, cache=cache).buscar(url)
+    assert (response.status_code, response.content, response.do_cache) == (200, b'guardado', True)
+    assert len(sessao.cabecalhos) == 1
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+import esquemas
+
+CABECALHO = ['Posição', 'Cliente', 'Cidade', 'Plano Vendido']
+LINHAS = [[1, 'Ejecta', 'Curitiba', 'Pro'], [2, ' Planetbiz ', 'Recife', 'Basic']]
+
+
+def test_acha_cabecalho_abaixo_do_titulo():
+    bruto = pd.DataFrame([['Relatório', None, None, None], [None] * 4, CABECALHO, *LINHAS])
+    df = esquemas.normalizar(bruto, 'vendas')
+    assert list(df.columns) == CABECALHO
+    assert df['Cliente'].tolist() == ['Ejecta', 'Planetbiz']
+    assert df['Cidade'].dtype == 'category' and df['Posição'].dtype == 'Int64'
+
+
+def test_sinonimos_e_nomes_sem_acento():
+    bruto = pd.DataFrame([['posicao', 'CLIENTE', 'Município', 'plano'], *LINHAS])
+    assert list(esquemas.normalizar(bruto, 'vendas').columns) == CABECALHO
+
+
+def test_aba_sem_cabecalho_precisa_de_opt_in():
+    bruto = pd.DataFrame(LINHAS)
+    with pytest.raises(ValueError, match='sem_cabecalho'):
+        esquemas.normalizar(bruto, 'vendas')
+    assert esquemas.normalizar(bruto, 'vendas', sem_cabecalho=True)['Cidade'].tolist() == ['Curitiba', 'Recife']
+
+
+def test_aba_com_colunas_de_texto_trocadas_e_recusada():
+    with pytest.raises(ValueError):
+        esquemas.normalizar(pd.DataFrame([[1, 'Rio', 'ClienteA', 'Enterprise']]), 'vendas')
+
+
+@pytest.mark.parametrize('cabecalho, linha, mensagem', [
+    (CABECALHO + ['Vendedor'], LINHAS[0] + ['Ana'], 'desconhecidas'),
+    (CABECALHO[:3], LINHAS[0][:3], 'faltando'),
+    (CABECALHO, ['x', 'Ejecta', 'Curitiba', 'Pro'], 'não são Int64'),
+    (CABECALHO, [1.5, 'Ejecta', 'Curitiba', 'Pro'], 'não são Int64'),
+])
+def test_recusa_drift(cabecalho, linha, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        esquemas.normalizar(pd.DataFrame([cabecalho, linha]), 'vendas')
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+import ingestao
+
+
+def test_chave_mes_datas_validas():
+    datas = ['01/01/2024', '29/02/2024', '31/12/1999', '1/3/2011', '30/04/2023']
+    assert ingestao.chave_mes(datas).tolist() == [202401, 202402, 199912, 201103, 202304]
+
+
+@pytest.mark.parametrize('data', ['32/01/2024', '31/02/2024', '29/02/2023', '00/05/2024', '31/04/2024', '01/13/2024', '01/03/2011 00:00'])
+def test_chave_mes_recusa_data_invalida(data):
+    with pytest.raises(ValueError):
+        ingestao.chave_mes(['01/01/2024', data])
+
+
+def test_media_mensal_recusa_dia_invalido(tmp_path):
+    arquivo = tmp_path / 'selic.csv'
+    arquivo.write_text('data;valor\n01/02/2024;1\n31/02/2024;1\n')
+    with pytest.raises(ValueError):
+        ingestao.media_mensal(arquivo, 'selic_diaria')
+
+
+def test_media_mensal_igual_ao_to_datetime(tmp_path):
+    arquivo = tmp_path / 'selic.csv'
+    datas = pd.date_range('2023-12-25', '2024-03-05', freq='D').strftime('%d/%m/%Y')
+    pd.DataFrame({'data': datas, 'valor': range(len(datas))}).to_csv(arquivo, sep=';', index=False)
+    esperado = pd.read_csv(arquivo, sep=';')
+    esperado['mes'] = pd.to_datetime(esperado['data'], format='%d/%m/%Y').dt.strftime('%Y-%m')
+    esperado = esperado.groupby('mes')['valor'].mean()
+    obtido = ingestao.media_mensal(arquivo, 'selic_diaria', tamanho_chunk=7).set_index('mes')['selic_diaria']
+    assert obtido.index.tolist() == esperado.index.tolist()
+    assert obtido.tolist() == pytest.approx(esperado.tolist())
@@ -0,0 +1,78 @@
+import pytest
+from flask import Flask, Response
+
+import config
+import metricas
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    # como com FLASK_DEBUG: a exceção da view sobe direto e o after_request não roda
+    app.config['PROPAGATE_EXCEPTIONS'] = True
+
+    @app.route('/falha')
+    def falha():
+        raise RuntimeError('falhou')
+
+    @app.route('/ok')
+    def ok():
+        return 'ok'
+
+    @app.route('/stream')
+    def stream():
+        return Response((parte for parte in ('a', 'b')))
+
+    return metricas.instrumentar(app)
+
+
+def _valor(contador, valores):
+    return contador._series.get(valores, 0)
+
+
+def test_excecao_com_debug_sai_do_em_andamento(app):
+    antes = _valor(metricas.requisicoes, ('/falha', 'GET', '500'))
+    with pytest.raises(RuntimeError):
+        app.test_client().get('/falha')
+    assert _valor(metricas.em_andamento, ('/falha',)) == 0
+    assert _valor(metricas.requisicoes, ('/falha', 'GET', '500')) == antes + 1
+
+
+def test_excecao_desliga_o_perfil(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, 'METRICAS_PERFIL_HABILITADO', True)
+    monkeypatch.setattr(config, 'METRICAS_PERFIL_DIR', str(tmp_path))
+    perfis = []
+    original = metricas.cProfile.Profile
+
+    class Perfil(original):
+        def __init__(self):
+            super().__init__()
+            perfis.append(self)
+            self.ligado = False
+
+        def enable(self):
+            self.ligado = True
+            super().enable()
+
+        def disable(self):
+            self.ligado = False
+            super().disable()
+
+    monkeypatch.setattr(metricas.cProfile, 'Profile', Perfil)
+    with pytest.raises(RuntimeError):
+        app.test_client().get('/falha', headers={config.METRICAS_HEADER_PERFIL: '1'})
+    assert perfis and not perfis[0].ligado
+
+
+def test_normal_e_streaming_contados_uma_vez(app):
+    cliente = app.test_client()
+    ok_antes = _valor(metricas.requisicoes, ('/ok', 'GET', '200'))
+    stream_antes = _valor(metricas.requisicoes, ('/stream', 'GET', '200'))
+    assert cliente.get('/ok').data == b'ok'
+    resposta = cliente.get('/stream')
+    assert resposta.data == b'ab'
+    resposta.close()
+    assert _valor(metricas.requisicoes, ('/ok', 'GET', '200')) == ok_antes + 1
+    assert _valor(metricas.requisicoes, ('/stream', 'GET', '200')) == stream_antes + 1
+    assert _valor(metricas.em_andamento, ('/ok',)) == 0
+    assert _valor(metricas.em_andamento, ('/stream',)) == 0
@@ -0,0 +1,50 @@
+import csv
+import sqlite3
+
+from pipeline_filmes import CAMPOS, SinkCSV, SinkSQLite
+
+
+def _filme(numero):
+    return dict(zip(CAMPOS, [f'Filme {numero}', 'Direção', '4.0', f'/filmes/{numero}', '2020', 'Drama']))
+
+
+def _links(caminho):
+    with open(caminho, newline='', encoding='utf-8-sig') as arquivo:
+        return [linha['Link'] for linha in csv.DictReader(arquivo)]
+
+
+def test_retomar_nao_duplica_filmes_ja_gravados(tmp_path):
+    caminho = str(tmp_path / 'filmes.csv')
+    sink = SinkCSV(caminho)
+    sink.escrever([_filme(1), _filme(2)])
+    sink.fechar()
+    # as paginas em andamento voltam na retomada e trazem o filme 2 de novo
+    sink = SinkCSV(caminho, anexar=True)
+    sink.escrever([_filme(2), _filme(3)])
+    sink.fechar()
+    assert _links(caminho) == ['/filmes/1', '/filmes/2', '/filmes/3']
+    assert sink.total == 1
+
+
+def test_sem_anexar_recomeca_o_arquivo(tmp_path):
+    caminho = str(tmp_path / 'filmes.csv')
+    for _ in range(2):
+        sink = SinkCSV(caminho)
+        sink.escrever([_filme(1)])
+        sink.fechar()
+    assert _links(caminho) == ['/filmes/1']
+
+
+def test_sqlite_uma_carga_por_execucao(tmp_path):
+    caminho = str(tmp_path / 'filmes.db')
+    sink = SinkSQLite(caminho)
+    for lote in ([_filme(1), _filme(2)], [_filme(3)], [_filme(4)]):
+        sink.escrever(lote)
+    sink.fechar()
+    sink = SinkSQLite(caminho)
+    sink.escrever([_filme(1), dict(_filme(2), Nota='3.5')])
+    sink.escrever([_filme(5)])
+    sink.fechar()
+    with sqlite3.connect(caminho) as conn:
+        cargas = conn.execute('SELECT inseridos, atualizados, ignorados FROM cargas ORDER BY id').fetchall()
+    assert cargas == [(4, 0, 0), (1, 1, 1)]
@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import pytest
+
+import saida
+
+
+def test_excel_recusa_linhas_alem_do_limite(tmp_path, monkeypatch):
+    monkeypatch.setattr(saida, 'EXCEL_MAX_LINHAS', 10)
+    caminho = tmp_path / 'grande.xlsx'
+    with pytest.raises(ValueError, match='não cabem'):
+        saida.gravar(pd.DataFrame({'a': range(10)}), str(caminho))
+    # nem o arquivo final nem o temporario ficam para trás
+    assert os.listdir(tmp_path) == []
+
+
+def test_excel_recusa_celula_grande_demais(tmp_path):
+    with pytest.raises(ValueError, match='xlsxwriter devolveu -2'):
+        saida.gravar(pd.DataFrame({'a': ['x' * 40_000]}), str(tmp_path / 'texto.xlsx'))
+
+
+def test_excel_ida_e_volta(tmp_path):
+    df = pd.DataFrame({'Cidade': ['Curitiba', None, 'Recife'], 'Valor': [1.5, 2.0, None]})
+    caminho = saida.gravar(df, str(tmp_path / 'dados.xlsx'))
+    pd.testing.assert_frame_equal(pd.read_excel(caminho), df, check_dtype=False)
+
+
+def test_carregar_prefere_colunar_com_o_nome_do_texto(tmp_path):
+    df = pd.DataFrame({'Cidade': ['Curitiba', 'Recife', 'Curitiba'], 'Valor': [1, 2, 3]})
+    csv = str(tmp_path / 'vendas.csv')
+    saida.gravar_varios(df, [str(tmp_path / 'vendas.parquet'), csv], categoricas=['Cidade'])
+    assert saida.colunar_atualizado(csv) == str(tmp_path / 'vendas.parquet')
+    assert saida.carregar(csv)['Cidade'].dtype == 'category'
+
+
+def test_carregar_ignora_colunar_mais_velho(tmp_path):
+    df = pd.DataFrame({'Valor': [1, 2]})
+    csv = str(tmp_path / 'vendas.csv')
+    saida.gravar(df, str(tmp_path / 'vendas.parquet'))
+    saida.gravar(df.assign(Valor=[3, 4]), csv)
+    os.utime(str(tmp_path / 'vendas.parquet'), (0, 0))
+    assert saida.colunar_atualizado(csv) is None
+    assert saida.carregar(csv)['Valor'].tolist() == [3, 4]
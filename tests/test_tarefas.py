@@ -0,0 +1,55 @@
+import os
+import time
+
+import banco
+import config
+import tarefas
+
+
+def _fila(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'DB_PATH', str(tmp_path / 'tarefas.db'))
+    return tarefas.FilaTarefas(max_workers=1)
+
+
+def _inserir(id_, chave, processo, identidade=None):
+    banco.escrever(lambda conn: conn.execute(
+        "INSERT INTO tarefas (id, tipo, chave, estado, processo, processo_identidade, criada_em)"
+        " VALUES (?, 'teste', ?, 'executando', ?, ?, 0)",
+        (id_, chave, processo, identidade)
+    ))
+
+
+def test_reaproveita_tarefa_da_mesma_chave(tmp_path, monkeypatch):
+    fila = _fila(tmp_path, monkeypatch)
+    tarefa_id = fila.enviar('teste', lambda: 1, chave='k')
+    assert fila.esperar(tarefa_id)['resultado'] == 1
+    assert fila.enviar('teste', lambda: 2, chave='k') == tarefa_id
+
+
+def test_tarefa_de_pid_reaproveitado_roda_de_novo(tmp_path, monkeypatch):
+    fila = _fila(tmp_path, monkeypatch)
+    fila._preparar()
+    # mesmo pid deste processo, mas de outro boot/inicio (container reiniciado)
+    _inserir('velha', 'k', os.getpid(), 'outro-boot:1')
+    nova = fila.enviar('teste', lambda: 3, chave='k')
+    assert nova != 'velha'
+    assert fila.obter('velha')['estado'] == 'erro'
+    assert fila.esperar(nova)['resultado'] == 3
+
+
+def test_tarefa_de_processo_morto_roda_de_novo(tmp_path, monkeypatch):
+    fila = _fila(tmp_path, monkeypatch)
+    fila._preparar()
+    _inserir('morta', 'k', 2 ** 22 + 1)
+    assert fila.enviar('teste', lambda: 4, chave='k') != 'morta'
+    assert fila.obter('morta')['estado'] == 'erro'
+
+
+def test_apaga_tarefas_terminadas_antigas(tmp_path, monkeypatch):
+    fila = _fila(tmp_path, monkeypatch)
+    antiga = fila.enviar('teste', lambda: 5)
+    fila.esperar(antiga)
+    limite = time.time() - (config.TAREFAS_RETENCAO_HORAS + 1) * 3600
+    banco.escrever(lambda conn: conn.execute('UPDATE tarefas SET concluida_em = ? WHERE id = ?', (limite, antiga)))
+    fila.esperar(fila.enviar('teste', lambda: 6))
+    assert fila.obter(antiga) is None